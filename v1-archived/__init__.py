@@ -9,13 +9,14 @@ __version__ = "1.1.1"
 
 # Small convenience re-exports so users can do:
 #   from awo import run, LocalEcho
-from .core.engine import run
+from .core.engine import run, RunPaused
 from .core.lockfile import snapshot
 from .models.local_backend import LocalEcho
 
 __all__ = [
     "__version__",
     "run",
+    "RunPaused",
     "snapshot",
     "LocalEcho",
 ]
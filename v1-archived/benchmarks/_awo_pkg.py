@@ -0,0 +1,19 @@
+"""Import helper: expose this checkout as the `awo` package (the directory name is not importable)."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_awo():
+    if "awo" in sys.modules:
+        return sys.modules["awo"]
+    spec = importlib.util.spec_from_file_location(
+        "awo", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["awo"] = mod
+    spec.loader.exec_module(mod)
+    return mod
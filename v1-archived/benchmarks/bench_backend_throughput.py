@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Throughput of a 1000-prompt synthetic workflow through core.engine.run,
+sync (generate per prompt) vs async (agenerate on one event loop).
+
+Usage (from repo root):
+
+    python benchmarks/bench_backend_throughput.py [--prompts 1000] [--latency-ms 2]
+
+Two backends are measured: LocalEcho (CPU-only, shows protocol overhead) and
+a simulated remote backend that waits --latency-ms per call (time.sleep in
+generate, asyncio.sleep in agenerate).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _awo_pkg import load_awo  # noqa: E402
+
+load_awo()
+from awo.core.engine import run  # noqa: E402
+from awo.models.base import ModelBackend  # noqa: E402
+from awo.models.local_backend import LocalEcho  # noqa: E402
+
+
+class SimulatedRemote(ModelBackend):
+    name = "simulated-remote"
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    def generate(self, prompt, *, params):
+        time.sleep(self.latency_s)
+        return {"text": prompt, "usage": {}, "meta": {"model": self.name, **params}}
+
+    async def agenerate(self, prompt, *, params):
+        await asyncio.sleep(self.latency_s)
+        return {"text": prompt, "usage": {}, "meta": {"model": self.name, **params}}
+
+
+def _bench(backend, wf_path: Path, mode: str, n: int) -> float:
+    t0 = time.perf_counter()
+    run(str(wf_path), backend=backend, batch_mode=mode)
+    return n / (time.perf_counter() - t0)
+
+
+def main(argv) -> int:
+    ap = argparse.ArgumentParser(description="core.engine sync vs async backend throughput")
+    ap.add_argument("--prompts", type=int, default=1000)
+    ap.add_argument("--latency-ms", type=float, default=2.0)
+    ap.add_argument("--max-concurrency", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        wf = {
+            "steps": [{
+                "id": "bulk",
+                "op": "llm_map",
+                "prompts": [f"Summarize item {i}: the battery lasts all day." for i in range(args.prompts)],
+                "params": {"seed": 7},
+                **({"max_concurrency": args.max_concurrency} if args.max_concurrency else {}),
+            }]
+        }
+        wf_path = Path(tmp) / "synthetic.json"
+        wf_path.write_text(json.dumps(wf), encoding="utf-8")
+
+        for backend in (LocalEcho(), SimulatedRemote(args.latency_ms / 1000.0)):
+            rates = {}
+            for mode in ("sync", "async"):
+                rates[mode] = _bench(backend, wf_path, mode, args.prompts)
+            print(f"{backend.name:18s} sync {rates['sync']:10.0f} prompts/s  "
+                  f"async {rates['async']:10.0f} prompts/s  x{rates['async'] / rates['sync']:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Per-step dispatch overhead of the shared op registry (core/op_registry.py).
+
+Usage (from repo root):
+
+    python benchmarks/bench_op_dispatch.py [--steps 200000]
+
+Measures, for a handler that does nothing:
+
+  if-chain        the `if op == ... elif ...` lookup both engines used,
+                  op at the end of an 8-way chain
+  dict            a plain dict of handlers (awo_run's former _OPS)
+  registry        OpRegistry.dispatch, untimed and timed (the default hook)
+  awo_run step    awo_run._run_step: step record, _StepEffects, dispatch
+  core.engine     core.engine.run per step, including its JSONL step log
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.append(str(ROOT / "core"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from op_registry import OpRegistry  # noqa: E402
+
+OPS = ["scope_validate", "assert_contains", "fanout_generate", "sweep_generate",
+       "consensus_vote", "write_text", "dedupe_against_history", "noop"]
+
+
+def _noop(*args):
+    return None
+
+
+def _chain(op, *args):
+    if op == "scope_validate":
+        return _noop(*args)
+    elif op == "assert_contains":
+        return _noop(*args)
+    elif op == "fanout_generate":
+        return _noop(*args)
+    elif op == "sweep_generate":
+        return _noop(*args)
+    elif op == "consensus_vote":
+        return _noop(*args)
+    elif op == "write_text":
+        return _noop(*args)
+    elif op == "dedupe_against_history":
+        return _noop(*args)
+    elif op == "noop":
+        return _noop(*args)
+    raise KeyError(op)
+
+
+def _per_call_ns(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def main(argv) -> int:
+    ap = argparse.ArgumentParser(description="op registry dispatch overhead per step")
+    ap.add_argument("--steps", type=int, default=200_000)
+    args = ap.parse_args(argv)
+    n = args.steps
+
+    table = {op: _noop for op in OPS}
+    timed, untimed = OpRegistry(), OpRegistry()
+    for op in OPS:
+        timed.register(op, _noop)
+        untimed.register(op, _noop, timed=False)
+    a = (1, 2, 3, 4, 5, 6)
+
+    rows = [
+        ("if-chain", _per_call_ns(lambda: _chain("noop", *a), n)),
+        ("dict", _per_call_ns(lambda: table["noop"](*a), n)),
+        ("registry (untimed)", _per_call_ns(lambda: untimed.dispatch("noop", *a), n)),
+        ("registry (timed)", _per_call_ns(lambda: timed.dispatch("noop", *a), n)),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # awo_run and core.engine resolve runs/ from the cwd
+        import awo_run
+
+        awo_run.OPS.register("bench_noop", _noop)
+        st = awo_run._RunState(
+            run_dir=Path(tmp), manifest={"run_id": "bench"}, provenance=None, report=[], ctx={},
+            backends={}, cache=None, started_at=awo_run.ts_rfc3339(),
+        )
+        step = {"id": "s", "op": "bench_noop"}
+        rows.append(("awo_run step", _per_call_ns(lambda: awo_run._run_step(st, 4, step), n)))
+
+        from _awo_pkg import load_awo
+
+        load_awo()
+        from awo.core import engine
+        from awo.models.local_backend import LocalEcho
+
+        engine.OPS.register("bench_noop", _noop)
+        k = max(1, n // 20)
+        wf_path = Path(tmp) / "noop.json"
+        wf_path.write_text(json.dumps({"steps": [{"id": f"s{i}", "op": "bench_noop"} for i in range(k)]}), encoding="utf-8")
+        t0 = time.perf_counter()
+        engine.run(str(wf_path), backend=LocalEcho())
+        rows.append((f"core.engine step ({k})", (time.perf_counter() - t0) / k * 1e9))
+        os.chdir(ROOT)
+
+    for name, ns in rows:
+        print(f"{name:24s} {ns / 1000:9.3f} us/step")
+    print(f"timed registry hook adds {(rows[3][1] - rows[2][1]):.0f} ns/step over untimed dispatch")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: run-directory writes, direct vs scripts/run_writer.py.
+
+Usage (from repo root):
+
+    python benchmarks/bench_run_writer.py [--steps 500] [--dir /mnt/nfs/tmp]
+
+Each simulated step does what a runner step used to do on disk: write its
+step record, rewrite run_manifest.json (op appended, then status), rewrite
+index.json and report.md. "direct" issues a mkdir(parents=True) and a full
+write per call; "buffered" goes through RunWriter and flushes once per step.
+Point --dir at a network mount to see the effect CI sees.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from run_writer import RunWriter, encode_json  # noqa: E402
+
+
+def _step_writes(run_dir: Path, i: int, manifest: dict, report: list):
+    manifest["ops"].append({"idx": i, "id": f"step_{i}", "op": "fanout_generate"})
+    report.append(f"## {i}. fanout_generate — step_{i}\n- ok: True\n")
+    yield run_dir / "steps" / f"{i:02d}_step_{i}.json", encode_json({"id": f"step_{i}", "outputs": ["x" * 200] * 3})
+    yield run_dir / "run_manifest.json", encode_json(manifest)
+    manifest["status"] = "running"
+    yield run_dir / "run_manifest.json", encode_json(manifest)
+    yield run_dir / "index.json", encode_json({"run_id": run_dir.name, "status": "running", "step": i})
+    yield run_dir / "report.md", "\n".join(report).encode("utf-8")
+
+
+def direct(run_dir: Path, steps: int) -> dict:
+    manifest, report = {"run_id": run_dir.name, "status": "running", "ops": []}, []
+    calls = nbytes = 0
+    for i in range(steps):
+        for path, data in _step_writes(run_dir, i, manifest, report):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            calls += 1
+            nbytes += len(data)
+    # mkdir + open + write + close per call
+    return {"files": calls, "syscalls": 4 * calls, "bytes": nbytes}
+
+
+def buffered(run_dir: Path, steps: int) -> dict:
+    manifest, report = {"run_id": run_dir.name, "status": "running", "ops": []}, []
+    w = RunWriter(run_dir)
+    for i in range(steps):
+        for path, data in _step_writes(run_dir, i, manifest, report):
+            w.write_bytes(path, data)
+        w.flush()
+    s = w.stats()
+    return {"files": s["files"], "syscalls": s["syscalls"], "bytes": s["bytes"], "coalesced": s["coalesced"]}
+
+
+def main(argv) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--steps", type=int, default=500)
+    ap.add_argument("--dir", default=None, help="Parent directory for the scratch run dirs")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for name, fn in (("direct", direct), ("buffered", buffered)):
+            rd = Path(tmp) / f"run_{name}"
+            t0 = time.perf_counter()
+            stats = fn(rd, args.steps)
+            dt = time.perf_counter() - t0
+            print(f"{name:9s} {dt * 1000:8.1f} ms  {json.dumps(stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: schema validation throughput, before/after schema_registry.
+
+Usage (from repo root):
+
+    python benchmarks/bench_schema_validation.py [--n 2000]
+
+"before" is what the runner used to do on every manifest/provenance write
+(jsonschema.validate, which re-checks the schema and builds a validator each
+call); "after" reuses the compiled validator from scripts/schema_registry.py.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import jsonschema  # noqa: E402
+import schema_registry  # noqa: E402
+
+PROV = {
+    "run_id": "run_2025-10-31T00-00-42Z",
+    "role": "Proposer",
+    "model": {"name": "echo", "provider": "local", "version": "fallback"},
+    "prompt_id": "sha256:" + "0" * 64,
+    "seed": 123,
+    "tools": {},
+    "artifacts": [],
+    "hashes": {},
+    "started": "2025-10-31T00:00:42Z",
+    "ended": "2025-10-31T00:00:42Z",
+    "notes": "fanout_generate",
+}
+
+MANIFEST = {
+    "run_id": "run_2025-10-31T00-00-42Z",
+    "workflow": "workflows/multimodel.json",
+    "started_at": "2025-10-31T00:00:42Z",
+    "finished_at": None,
+    "status": "running",
+    "ops": [{"idx": i, "id": f"step_{i}", "op": "fanout_generate"} for i in range(1, 21)],
+    "notes": ["env:environment.json"],
+    "env_ref": "environment.json",
+}
+
+
+def _rate(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - t0)
+
+
+def main(argv) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--n", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    for name, obj in (("provenance.schema.json", PROV), ("run_manifest.schema.json", MANIFEST)):
+        schema = schema_registry.load_schema(name)
+        before = _rate(lambda: jsonschema.validate(obj, schema), args.n)
+        v = schema_registry.get_validator(name)
+        after = _rate(lambda: v.validate(obj), args.n)
+        lookup = _rate(lambda: schema_registry.get_validator(name).validate(obj), args.n)
+        print(f"{name:28s} before {before:10.0f}/s  after {after:10.0f}/s  "
+              f"after+lookup {lookup:10.0f}/s  x{after / before:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: invariants volatility scan on a large step record.
+
+Usage (from repo root):
+
+    python benchmarks/bench_volatility_scan.py [--mb 100] [--dir /tmp]
+
+Writes a synthetic fanout_generate step record of about --mb megabytes (many
+outputs with timestamps, usage blocks and a few volatile keys) and times:
+
+  recursive   the scan() awo_validate.py used to define inline (json.load +
+              recursion, f-string path per key/element, list concatenation)
+  iterative   scripts/volatility_scan.py on the parsed document
+  scan_file   scripts/volatility_scan.py straight from the file (streams
+              through ijson when installed; json.load + iterative otherwise)
+
+All three must report the same problems.
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import volatility_scan  # noqa: E402
+from volatility_scan import VolatilityScanner  # noqa: E402
+
+TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?Z$")
+VOL_KEYS = {"pid", "hostname", "container_id", "pod_uid", "instance_id"}
+
+
+def legacy_scan(obj: Any, path: str = "") -> List[str]:
+    out: List[str] = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            p = f"{path}.{k}" if path else k
+            if k in VOL_KEYS and v not in (None, ""):
+                out.append(f"volatile:{p}")
+            if isinstance(v, str) and k.lower().endswith(("time", "timestamp", "at", "started", "finished")):
+                if not TS_RE.match(v):
+                    out.append(f"bad_ts:{p}={v}")
+            out.extend(legacy_scan(v, p))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            out.extend(legacy_scan(v, f"{path}[{i}]"))
+    return out
+
+
+def write_step(path: Path, mb: int) -> int:
+    """Stream a fanout-like step record of roughly `mb` MB; returns the output count."""
+    target = mb * 1024 * 1024
+    text = "lorem ipsum dolor sit amet " * 8
+    n = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write('{"id": "fan", "op": "fanout_generate", "started_at": "2025-01-01T00:00:00Z", "outputs": [')
+        while f.tell() < target:
+            o = {
+                "model": f"m{n % 7}",
+                "text": text,
+                "tokens": [n, n + 1, n + 2, n + 3],
+                "usage": {"prompt": 12, "completion": 40, "total": 52},
+                "meta": {"started": "2025-01-01T00:00:00Z", "finished": "2025-01-01T00:00:01.5Z", "cached": False},
+            }
+            if n % 5000 == 0:
+                o["meta"]["pid"] = 4242
+                o["meta"]["created_at"] = "yesterday"
+            f.write(("," if n else "") + json.dumps(o))
+            n += 1
+        f.write("]}")
+    return n
+
+
+def _time(fn):
+    t0 = time.perf_counter()
+    res = fn()
+    return time.perf_counter() - t0, res
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mb", type=int, default=100)
+    ap.add_argument("--dir", default=None)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as d:
+        path = Path(d) / "04_fan.json"
+        n = write_step(path, args.mb)
+        size = path.stat().st_size
+        print(f"step file: {size / 1e6:.1f} MB, {n} outputs; ijson: {'yes' if volatility_scan.ijson else 'no'}")
+
+        t_load, doc = _time(lambda: json.loads(path.read_text(encoding="utf-8")))
+        scanner = VolatilityScanner()
+        t_old, old = _time(lambda: legacy_scan(doc))
+        t_new, new = _time(lambda: list(scanner.scan(doc)))
+        del doc
+        t_file, streamed = _time(lambda: list(scanner.scan_file(path)))
+
+    if not (old == new == streamed):
+        print("MISMATCH between scanners", file=sys.stderr)
+        return 1
+    print(f"json.load         {t_load:8.2f} s")
+    print(f"recursive scan    {t_old:8.2f} s   ({len(old)} problems)")
+    print(f"iterative scan    {t_new:8.2f} s   ({t_old / max(t_new, 1e-9):.1f}x)")
+    print(f"scan_file (total) {t_file:8.2f} s   vs load+recursive {t_load + t_old:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,7 +5,7 @@ import argparse
 from pathlib import Path
 
 from awo.models.local_backend import LocalEcho
-from awo.core.engine import run as run_workflow
+from awo.core.engine import run as run_workflow, RunPaused
 
 # If you set __version__ in awo/__init__.py this will show in --version
 try:
@@ -13,6 +13,17 @@ try:
 except Exception:
     __version__ = "1.1.1"
 
+# Exit status of a run paused at an audit gate (awaiting human approval)
+GATE_EXIT_CODE = 78
+
+_SERVE_COMMANDS = {
+    "serve": "Run the runner daemon over the local job queue (runs/.queue.sqlite)",
+    "submit": "Queue a workflow for the daemon",
+    "poll": "Show a queued job (--wait blocks until it ends)",
+    "cancel": "Cancel a queued job",
+    "list": "List recent queued/finished jobs",
+}
+
 def _parse_args(argv=None):
     p = argparse.ArgumentParser(
         prog="python -m awo.cli",
@@ -31,6 +42,30 @@ def _parse_args(argv=None):
         choices=["local"],
         help="Model backend to use (default: local echo backend)",
     )
+    prun.add_argument(
+        "--runner",
+        default="core",
+        choices=["core", "ci"],
+        help="core: awo.core.engine with --backend (default); ci: scripts/awo_run.py in-process "
+             "(run manifest, provenance, cache, --jobs; no llm_map)",
+    )
+    prun.add_argument("--jobs", type=int, default=1, help="Step concurrency for --runner ci")
+    prun.add_argument(
+        "--fsync",
+        default="none",
+        choices=["none", "per-step", "per-run"],
+        help="Durability of the core runner's steps.jsonl (default: none)",
+    )
+    prun.add_argument(
+        "--step-files",
+        action="store_true",
+        help="Core runner: also write one steps/NNN_<id>.jsonl file per step",
+    )
+
+    # awo serve | submit | poll | cancel | list: listed for --help; main()
+    # hands their arguments to scripts/awo_serve.py unparsed
+    for name, text in _SERVE_COMMANDS.items():
+        sub.add_parser(name, help=text)
     return p.parse_args(argv)
 
 def _make_backend(name: str):
@@ -39,7 +74,30 @@ def _make_backend(name: str):
         return LocalEcho()
     raise ValueError(f"Unsupported backend: {name!r}")
 
+def _use_scripts():
+    # the scripts import each other as top-level modules
+    scripts = str(Path(__file__).resolve().parent / "scripts")
+    if scripts not in sys.path:
+        sys.path.insert(0, scripts)
+
+def _run_ci(wf_path: Path, jobs: int) -> int:
+    # Same op registry and dispatch path as `python scripts/awo_run.py`
+    _use_scripts()
+    import awo_run
+
+    # errors are recorded in the run directory this run claimed
+    _, code, error = awo_run.run_guarded(str(wf_path), jobs=jobs)
+    if error is not None:
+        print(f"[AWO] Run failed: {error}", file=sys.stderr)
+    return code
+
 def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in _SERVE_COMMANDS:
+        _use_scripts()
+        import awo_serve
+        return awo_serve.main(argv)
+
     args = _parse_args(argv)
 
     if args.cmd == "run":
@@ -48,24 +106,28 @@ def main(argv=None):
             print(f"[AWO] Workflow not found: {wf_path}", file=sys.stderr)
             return 2
 
+        if args.runner == "ci":
+            return _run_ci(wf_path, args.jobs)
+
         backend = _make_backend(args.backend)
 
         try:
-            run_dir = run_workflow(str(wf_path), backend=backend)
+            run_dir = run_workflow(str(wf_path), backend=backend, fsync=args.fsync, step_files=args.step_files)
             # If engine returns normally (no audit gate), confirm success:
             print(f"[AWO] Run completed.\n[AWO] Artifacts: {run_dir}")
             return 0
 
+        except RunPaused as e:
+            # Engine intentionally pauses at audit gate; the CLI exits 78
+            print(
+                f"[AWO] Audit gate '{e.gate['gate_id']}' reached — run paused for human approval.\n"
+                f"      See report.md and gate_pending.json in {e.run_dir}.",
+                file=sys.stderr,
+            )
+            return GATE_EXIT_CODE
+
         except SystemExit as e:
-            # Engine intentionally pauses at audit gate with exit code 78
-            code = int(e.code) if isinstance(e.code, int) else 1
-            if code == 78:
-                print(
-                    "[AWO] Audit gate reached — run paused for human approval.\n"
-                    "      See report.md and gate_decision.yml in the run directory.",
-                    file=sys.stderr,
-                )
-            return code
+            return int(e.code) if isinstance(e.code, int) else 1
 
         except Exception as e:
             print(f"[AWO] Run failed: {e}", file=sys.stderr)
@@ -0,0 +1,49 @@
+"""
+Async calls into model backends, shared by every engine.
+
+models/base.py (ModelBackend.agenerate, core.engine's llm_map), and the
+scripts' fanout_generate and sweep_generate all await a backend through
+agenerate() here. A backend with its own agenerate() is awaited directly.
+One that only has a blocking generate() (the ModelBackend default, or a
+duck-typed backend) runs it on a worker thread, so concurrent calls overlap
+and asyncio.wait_for timeouts can fire while generate() is still running.
+
+The threads come from a pool owned by this module, not the loop's default
+executor: asyncio.run() waits for the default executor on exit, which would
+hold a timed-out fanout until the hung call returned. Like op_registry, the
+module is dependency-free: the package imports it as
+`awo.core.backend_calls`, the scripts as `backend_calls`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(thread_name_prefix="awo-agenerate")
+        return _POOL
+
+
+async def generate_in_thread(backend: Any, prompt: str, *, params: Dict[str, Any]) -> Dict[str, Any]:
+    """backend.generate() on a worker thread, awaitable (and cancellable) from the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_pool(), functools.partial(backend.generate, prompt, params=params))
+
+
+async def agenerate(backend: Any, prompt: str, *, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Async call for any backend: its agenerate() if it has one, else generate() on a thread."""
+    fn = getattr(backend, "agenerate", None)
+    if fn is not None:
+        return await fn(prompt, params=params)
+    return await generate_in_thread(backend, prompt, params=params)
@@ -0,0 +1,84 @@
+"""
+Ops shared by the AWO execution engines: one implementation of each.
+
+`write_text` and `audit_gate` mean the same thing in core/engine.py and
+scripts/awo_run.py; only where files go and what a pause does differ. The
+handlers here take (io, step, rec), where `io` is the engine's view of the
+current step:
+
+  source(step_id)         the recorded output of an earlier step, or None
+  write_artifact(rel, s)  write runs/<id>/artifacts/<rel>; returns its path
+  record(rec)             the step record is complete
+  pause(gate)             stop the run for human review at this gate
+
+register(registry, bind) adds them to an engine's OpRegistry with their
+hooks; bind(*dispatch_args) turns that engine's handler arguments into
+(io, step, rec). Like op_registry, the module is dependency-free: the
+package imports it as `awo.core.common_ops`, the scripts as `common_ops`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_CHECKLIST = "templates/audit-checklist.md"
+
+
+class StepFailed(Exception):
+    """Raised by an op handler; the step is committed, then the run takes the fatal path."""
+
+    def __init__(self, msg: str, extra_payload: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(msg)
+        self.msg = msg
+        self.extra_payload = extra_payload
+
+
+def _ts() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def write_text_resource(step: Dict[str, Any]) -> Optional[str]:
+    path = (step.get("args") or {}).get("path")
+    return f"artifacts/{path}" if path else None
+
+
+def write_text(io: Any, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    args = step.get("args", {})
+    path = args["path"]
+    text: Optional[str] = args.get("text")
+    from_step = args.get("from_step")
+    field = args.get("field", "consensus_text")
+
+    if text is None and from_step:
+        source = io.source(from_step)
+        if source is None:
+            raise StepFailed(
+                f"write_text: source step '{from_step}' not found",
+                {"error": "missing_source", "args": args},
+            )
+        if isinstance(source, list):
+            text = "\n\n".join([str(o.get("text", "")) for o in source])
+        elif isinstance(source, dict) and field in source:
+            text = str(source[field])
+        else:
+            text = json.dumps(source, indent=2, ensure_ascii=False)
+
+    out_path = io.write_artifact(path, text if text is not None else "")
+    rec.update({"wrote": str(out_path), "from_step": from_step, "field": field if from_step else None})
+    io.record(rec)
+
+
+def audit_gate(io: Any, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    checklist = step.get("args", {}).get("checklist", DEFAULT_CHECKLIST)
+    gate = {"status": "pending", "checklist": checklist, "ts": _ts()}
+    rec.update({"gate": gate})
+    io.record(rec)
+    io.pause(gate)
+
+
+def register(registry: Any, bind: Callable[..., Tuple[Any, Dict[str, Any], Dict[str, Any]]]) -> None:
+    """Register the shared ops on `registry`; bind maps its dispatch arguments to (io, step, rec)."""
+    registry.register("write_text", lambda *a: write_text(*bind(*a)), resource=write_text_resource)
+    registry.register("audit_gate", lambda *a: audit_gate(*bind(*a)), barrier=True)
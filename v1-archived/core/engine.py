@@ -1,68 +1,200 @@
-import os, json, time, pathlib
+import os, json, time, pathlib, threading
 from .lockfile import snapshot
+from ..models.base import generate_batch
+from . import common_ops
+from .op_registry import OpRegistry
 
 def _write_jsonl(path, rec):
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "a", encoding="utf-8") as f:
         f.write(json.dumps(rec, ensure_ascii=False) + "\n")
 
+FSYNC_POLICIES = ("none", "per-step", "per-run")
+
+class RunPaused(Exception):
+    """
+    Raised by run() at an audit_gate once the gate, step log and report are
+    on disk. An ordinary exception: library callers catch it and go on, and
+    only the CLI turns it into the process exit code (78).
+    """
+
+    def __init__(self, run_dir, gate):
+        super().__init__(run_dir, gate)
+        self.run_dir = str(run_dir)
+        self.gate = gate
+
+    def __str__(self):
+        return f"run {pathlib.Path(self.run_dir).name} paused at audit gate '{self.gate['gate_id']}'"
+
+class _StepLog:
+    """
+    One buffered append handle per run for steps.jsonl.
+
+    fsync: "none" leaves durability to the OS (the handle is flushed at
+    close), "per-step" flushes and fsyncs after every record, "per-run"
+    fsyncs once at close. step_files=True also writes the old
+    steps/NNN_<id>.jsonl files (one open/close per record).
+    """
+
+    def __init__(self, run_dir, *, fsync="none", step_files=False):
+        self.run_dir = run_dir
+        self.fsync = fsync
+        self.step_files = step_files
+        self.count = 0
+        self._f = open(run_dir / "steps.jsonl", "a", encoding="utf-8")
+        if step_files:
+            (run_dir / "steps").mkdir(exist_ok=True)
+
+    def write(self, i, sid, rec):
+        line = json.dumps({"idx": i, **rec}, ensure_ascii=False) + "\n"
+        self._f.write(line)
+        if self.fsync == "per-step":
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        if self.step_files:
+            _write_jsonl(self.run_dir / "steps" / f"{i:03d}_{sid}.jsonl", rec)
+        self.count += 1
+
+    def close(self):
+        if self._f.closed:
+            return
+        self._f.flush()
+        if self.fsync != "none":
+            os.fsync(self._f.fileno())
+        self._f.close()
+
 def _read_json(path):
     return json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
 
-def run(workflow_path: str, backend):
+_RUN_ID_LOCK = threading.Lock()
+_last_run_stamp = ("", -1)
+
+def _new_run_dir(root):
+    # exclusive mkdir: concurrent runs never share a directory; runs started in
+    # the same second get -001, -002, ... suffixes and still sort by time
+    global _last_run_stamp
+    root.mkdir(parents=True, exist_ok=True)
+    with _RUN_ID_LOCK:
+        stamp = time.strftime("%Y-%m-%dT%H-%M-%SZ", time.gmtime())
+        n = _last_run_stamp[1] + 1 if _last_run_stamp[0] == stamp else 0
+        while True:
+            run_dir = root / (f"{stamp}-{n:03d}" if n else stamp)
+            try:
+                run_dir.mkdir()
+                break
+            except FileExistsError:
+                n += 1
+        _last_run_stamp = (stamp, n)
+    return run_dir
+
+class _Run:
+    """What op handlers see: the run directory, backend and collected outputs."""
+
+    def __init__(self, run_dir, workflow_path, backend, batch_mode, log):
+        self.run_dir = run_dir
+        self.run_id = run_dir.name
+        self.workflow_path = workflow_path
+        self.backend = backend
+        self.batch_mode = batch_mode
+        self.log = log
+        self.outputs = []
+        self.ctx = {}  # step id -> [output, ...], read by write_text's from_step
+
+# Handlers take (run, i, sid, step, rec) and fill rec; register more with
+# @OPS.register("name", ...) (hooks: see op_registry.py).
+OPS = OpRegistry()
+
+@OPS.register("llm_map")
+def _op_llm_map(r, i, sid, step, rec):
+    params = step.get("params", {})
+    if "prompts" in step:
+        # many prompts in one step: "sync" loops generate(), "async" drives
+        # them all on one event loop (no thread per call)
+        prompts = step["prompts"]
+        outs = generate_batch(
+            r.backend, prompts, params=params,
+            mode=step.get("batch_mode", r.batch_mode),
+            max_concurrency=step.get("max_concurrency"),
+        )
+        rec.update({"prompts": prompts, "outputs": outs})
+        r.outputs.extend(o["text"] for o in outs)
+        r.ctx[sid] = outs
+    else:
+        prompt = step["prompt"]
+        out = r.backend.generate(prompt, params=params)
+        rec.update({"prompt": prompt, "output": out})
+        r.outputs.append(out["text"])
+        r.ctx[sid] = [out]
+
+class _StepIO:
+    """The step as common_ops sees it (write_text, audit_gate)."""
+
+    def __init__(self, r, i, sid):
+        self.r = r
+        self.i = i
+        self.sid = sid
+        self.rec = None
+
+    def source(self, step_id):
+        return self.r.ctx.get(step_id)
+
+    def write_artifact(self, rel_path, text):
+        out_path = self.r.run_dir / "artifacts" / rel_path
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(text, encoding="utf-8")
+        return out_path
+
+    def record(self, rec):
+        self.rec = rec  # run() logs it after dispatch; pause() logs it itself
+
+    def pause(self, gate):
+        # mark pending gate & stop the run; the CLI turns this into exit code 78
+        r = self.r
+        gate_info = {
+            "run_id": r.run_id,
+            "gate_id": self.sid,
+            "status": gate["status"],
+            "checklist": gate["checklist"],
+        }
+        (r.run_dir / "gate_pending.json").write_text(json.dumps(gate_info, indent=2), encoding="utf-8")
+        r.log.write(self.i, self.sid, self.rec)
+        r.log.close()
+        _write_report(r.run_dir, r.workflow_path, r.backend.name, r.outputs, r.log.count, pending_gate=gate_info)
+        raise RunPaused(r.run_dir, gate_info)  # signals 'needs human review'
+
+# write_text and audit_gate: the implementations scripts/awo_run.py uses too
+common_ops.register(OPS, lambda r, i, sid, step, rec: (_StepIO(r, i, sid), step, rec))
+
+def run(workflow_path: str, backend, *, batch_mode: str = "sync", fsync: str = "none", step_files: bool = False):
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unsupported fsync policy: {fsync!r} (expected one of {FSYNC_POLICIES})")
     wf = _read_json(workflow_path)
-    run_id = time.strftime("%Y-%m-%dT%H-%M-%SZ")
-    run_dir = pathlib.Path("runs") / run_id
-    (run_dir / "steps").mkdir(parents=True, exist_ok=True)
+    run_dir = _new_run_dir(pathlib.Path("runs"))
     snapshot(run_dir, workflow_path, wf)
 
-    outputs = []
-    for i, step in enumerate(wf.get("steps", [])):
-        sid = step.get("id", f"step_{i:03d}")
-        op  = step.get("op")
-        rec = {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "id": sid, "op": op}
-
-        if op == "llm_map":
-            prompt = step["prompt"]
-            params = step.get("params", {})
-            out = backend.generate(prompt, params=params)
-            rec.update({"prompt": prompt, "output": out})
-            outputs.append(out["text"])
-
-        elif op == "write_text":
-            path = step["args"]["path"]
-            text = step["args"]["text"]
-            out_path = run_dir / "artifacts" / path
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            out_path.write_text(text, encoding="utf-8")
-            rec.update({"wrote": str(out_path)})
-
-        elif op == "audit_gate":
-            # mark pending gate & exit with a special non-zero code
-            gate_id = step.get("id", "gate")
-            gate_info = {
-                "run_id": run_id,
-                "gate_id": gate_id,
-                "status": "pending",
-                "checklist": step.get("args", {}).get("checklist", "")
-            }
-            (run_dir / "gate_pending.json").write_text(json.dumps(gate_info, indent=2), encoding="utf-8")
-            _write_jsonl(run_dir / "steps" / f"{i:03d}_{sid}.jsonl", {**rec, "gate": gate_info})
-            _write_report(run_dir, workflow_path, backend.name, outputs, pending_gate=gate_info)
-            os._exit(78)  # signals 'needs human review'
-
-        _write_jsonl(run_dir / "steps" / f"{i:03d}_{sid}.jsonl", rec)
-
-    _write_report(run_dir, workflow_path, backend.name, outputs, pending_gate=None)
+    log = _StepLog(run_dir, fsync=fsync, step_files=step_files)
+    r = _Run(run_dir, workflow_path, backend, batch_mode, log)
+    try:
+        for i, step in enumerate(wf.get("steps", [])):
+            sid = step.get("id", f"step_{i:03d}")
+            op  = step.get("op")
+            rec = {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "id": sid, "op": op}
+            if op in OPS:  # unknown ops are logged as-is, as they always were
+                OPS.dispatch(op, r, i, sid, step, rec)
+            log.write(i, sid, rec)
+    finally:
+        log.close()
+
+    _write_report(run_dir, workflow_path, backend.name, r.outputs, log.count, pending_gate=None)
     return str(run_dir)
 
-def _write_report(run_dir, workflow_path, backend_name, outputs, pending_gate):
+def _write_report(run_dir, workflow_path, backend_name, outputs, steps_executed, pending_gate):
     report = [
         f"# Run Report — {run_dir.name}",
         "",
         f"- Workflow: {workflow_path}",
         f"- Backend: {backend_name}",
-        f"- Steps executed: {len(list((run_dir/'steps').glob('*.jsonl')))}",
+        f"- Steps executed: {steps_executed}",
     ]
     if pending_gate:
         report += [
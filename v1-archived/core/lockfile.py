@@ -14,6 +14,9 @@ def snapshot(run_dir: pathlib.Path, workflow_path: str, wf_dict: dict):
         if "prompt" in step:
             pid = step.get("id", "prompt")
             prompts[pid] = _sha256_text(step["prompt"])
+        for i, p in enumerate(step.get("prompts", [])):
+            pid = step.get("id", "prompt")
+            prompts[f"{pid}[{i}]"] = _sha256_text(p)
     lock = {
         "frozen_at": time.strftime("%Y-%m-%dT%H-%M-%SZ"),
         "prompts": prompts
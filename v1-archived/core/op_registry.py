@@ -0,0 +1,157 @@
+"""
+Op registry shared by the AWO execution engines.
+
+scripts/awo_run.py and core/engine.py both look ops up in an OpRegistry
+instead of an if/elif chain on `op`, so a new op is one registered handler
+and the hooks below are read from one place. The module is dependency-free
+and lives in the package's core/: the package imports it as
+`awo.core.op_registry`, the scripts put core/ on sys.path and import it as
+`op_registry`, so core never depends on scripts/.
+
+Per-op hooks (keyword arguments to register()):
+
+  cached    the op reads/writes the generation cache; runs without a cached
+            op skip cache maintenance
+  parallel  may run concurrently with other steps of its dependency level
+            (awo_run --jobs); False runs it on the committing thread
+  barrier   ordered after every earlier step and before every later one
+  resource  step -> run-relative path the op writes, or None; steps sharing a
+            resource keep list order
+  timed     dispatch() adds the call's wall time to the per-op stats
+
+Each registry is independent: the handler signature is whatever its engine
+passes to dispatch().
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_perf_counter = time.perf_counter
+
+Resource = Callable[[Dict[str, Any]], Optional[str]]
+
+
+class UnknownOp(KeyError):
+    def __init__(self, op: Any) -> None:
+        super().__init__(op)
+        self.op = op
+
+    def __str__(self) -> str:
+        return f"Unknown op: {self.op}"
+
+
+class OpSpec:
+    __slots__ = ("name", "handler", "cached", "parallel", "barrier", "resource", "timed", "stats")
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[..., Any],
+        *,
+        cached: bool = False,
+        parallel: bool = True,
+        barrier: bool = False,
+        resource: Optional[Resource] = None,
+        timed: bool = True,
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.cached = cached
+        self.parallel = parallel and not barrier
+        self.barrier = barrier
+        self.resource = resource
+        self.timed = timed
+        self.stats = [0, 0.0, 0.0]  # calls, total_s, max_s
+
+
+class OpRegistry:
+    def __init__(self) -> None:
+        self._specs: Dict[str, OpSpec] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------ registration -----------------------------
+    def register(
+        self,
+        name: str,
+        handler: Optional[Callable[..., Any]] = None,
+        *,
+        replace: bool = False,
+        **hooks: Any,
+    ) -> Callable[..., Any]:
+        """Register handler for op `name`; without handler, returns a decorator."""
+
+        def _add(fn: Callable[..., Any]) -> Callable[..., Any]:
+            if name in self._specs and not replace:
+                raise ValueError(f"op '{name}' is already registered")
+            self._specs[name] = OpSpec(name, fn, **hooks)
+            return fn
+
+        return _add(handler) if handler is not None else _add
+
+    def spec(self, op: Any) -> Optional[OpSpec]:
+        return self._specs.get(op) if isinstance(op, str) else None
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def __contains__(self, op: Any) -> bool:
+        return self.spec(op) is not None
+
+    # --------------------------------- hooks ---------------------------------
+    def is_barrier(self, step: Dict[str, Any]) -> bool:
+        spec = self.spec(step.get("op"))
+        return spec is not None and spec.barrier
+
+    def is_parallel(self, step: Dict[str, Any]) -> bool:
+        spec = self.spec(step.get("op"))
+        return spec is None or spec.parallel  # unknown ops fail fast wherever they run
+
+    def resource(self, step: Dict[str, Any]) -> Optional[str]:
+        spec = self.spec(step.get("op"))
+        return spec.resource(step) if spec is not None and spec.resource is not None else None
+
+    def uses_cache(self, steps: Iterable[Dict[str, Any]]) -> bool:
+        for s in steps:
+            spec = self.spec(s.get("op"))
+            if spec is not None and spec.cached:
+                return True
+        return False
+
+    # -------------------------------- dispatch -------------------------------
+    def dispatch(self, op: Any, *args: Any) -> Any:
+        """Call op's handler with the engine's arguments; UnknownOp if unregistered."""
+        try:
+            spec = self._specs[op]
+        except (KeyError, TypeError):
+            raise UnknownOp(op) from None
+        if not spec.timed:
+            return spec.handler(*args)
+        t0 = _perf_counter()
+        try:
+            return spec.handler(*args)
+        finally:
+            dt = _perf_counter() - t0
+            s = spec.stats
+            with self._lock:
+                s[0] += 1
+                s[1] += dt
+                if dt > s[2]:
+                    s[2] = dt
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """Per-op {calls, total_ms, max_ms} since the last reset (process-wide)."""
+        out: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for op, spec in self._specs.items():
+                calls, total, longest = spec.stats
+                if calls:
+                    out[op] = {"calls": calls, "total_ms": round(total * 1000, 3), "max_ms": round(longest * 1000, 3)}
+        return out
+
+    def reset_timings(self) -> None:
+        with self._lock:
+            for spec in self._specs.values():
+                spec.stats = [0, 0.0, 0.0]
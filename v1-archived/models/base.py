@@ -1,7 +1,59 @@
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional, Sequence
+
+from ..core.backend_calls import agenerate, generate_in_thread
+
 
 class ModelBackend:
     name: str = "base"
 
     def generate(self, prompt: str, *, params: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
+
+    async def agenerate(self, prompt: str, *, params: Dict[str, Any]) -> Dict[str, Any]:
+        # The default runs generate() on a worker thread so concurrent calls
+        # overlap and timeouts fire; network backends should override with a
+        # real await.
+        return await generate_in_thread(self, prompt, params=params)
+
+    def generate_batch(self, prompts: Sequence[str], *, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [self.generate(p, params=params) for p in prompts]
+
+
+async def agenerate_batch(
+    backend: Any,
+    prompts: Sequence[str],
+    *,
+    params: Dict[str, Any],
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Drive many prompts on one event loop; results are returned in input order."""
+    if not max_concurrency or max_concurrency >= len(prompts):
+        return list(await asyncio.gather(*(agenerate(backend, p, params=params) for p in prompts)))
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(p: str) -> Dict[str, Any]:
+        async with sem:
+            return await agenerate(backend, p, params=params)
+
+    return list(await asyncio.gather(*(_one(p) for p in prompts)))
+
+
+def generate_batch(
+    backend: Any,
+    prompts: Sequence[str],
+    *,
+    params: Dict[str, Any],
+    mode: str = "sync",
+    max_concurrency: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Batch entry point for engines: mode "sync" loops generate(), "async" uses one event loop."""
+    if mode == "async":
+        return asyncio.run(agenerate_batch(backend, prompts, params=params, max_concurrency=max_concurrency))
+    if mode != "sync":
+        raise ValueError(f"Unsupported batch mode: {mode!r}")
+    fn = getattr(backend, "generate_batch", None)
+    if fn is not None:
+        return fn(prompts, params=params)
+    return [backend.generate(p, params=params) for p in prompts]
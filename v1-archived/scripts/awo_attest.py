@@ -4,15 +4,23 @@ AWO v3.0 attestation helper.
 
 Usage (from repo root):
 
-    python scripts/awo_attest.py --run-id RUN_ID
+    python scripts/awo_attest.py --run-id RUN_ID [--jobs N] [--hash-index]
 
 Responsibilities:
-  - Generate SHA256SUMS.txt with exact coverage for runs/<RUN_ID>/ (excluding SHA256SUMS.txt itself).
+  - Generate SHA256SUMS.txt with exact coverage for runs/<RUN_ID>/ (excluding SHA256SUMS.txt itself
+    and audit/.hashindex).
   - Enforce:
       * scope/ included when scope_validate op is present in index.json.
       * GNU coreutils format: "<sha256>  ./relative/path".
       * Every file under run dir (except sums itself) is listed; no extras.
       * sqrt(n) re-hash sample, deterministic via RUN_ID.
+  - The run dir is walked once; files are hashed on a thread pool (hashlib
+    releases the GIL) and the same file list feeds the coverage check and
+    the manifest digest.
+  - With --hash-index, digests are kept in runs/<RUN_ID>/audit/.hashindex keyed
+    by path with (size, mtime_ns, inode); unchanged files reuse their digest.
+    The √n re-hash sample
+    still reads files from disk, so a stale index cannot go unnoticed.
   - Write governance/attestations/<RUN_ID>/ATTESTATION.txt and ATTESTATION.json
     (the workflow is responsible for calling cosign sign-blob on these).
 """
@@ -25,11 +33,19 @@ import os
 import random
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Tuple, Dict, Any
 
+import env_capture
+
 REPO_ROOT = Path(os.getenv("GITHUB_WORKSPACE", Path.cwd())).resolve()
+SUMS_NAME = "SHA256SUMS.txt"
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
+HASH_INDEX_PATH = "audit/.hashindex"
 
 
 def _ts() -> str:
@@ -37,43 +53,123 @@ def _ts() -> str:
 
 
 def _relfmt(run_dir: Path, p: Path) -> str:
-    rp = p.resolve().relative_to(run_dir.resolve())
-    return "./" + str(rp).replace("\\", "/")
+    # p comes from walking run_dir, so no resolve() (one stat per file) is needed
+    return "./" + p.relative_to(run_dir).as_posix()
+
+
+def _sha256_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
 
 def _walk_files(run_dir: Path, exclude: List[Path]) -> List[Path]:
-    excl_abs = {e.resolve() for e in exclude}
+    excl = set(exclude)
     out: List[Path] = []
     for root, _, files in os.walk(run_dir):
         for fn in files:
             fp = Path(root) / fn
-            if fp.resolve() in excl_abs:
+            if fp in excl:
                 continue
             out.append(fp)
     return sorted(out)
 
 
-def generate_sums(run_id: str) -> Tuple[Path, List[Tuple[str, Path]]]:
+class HashIndex:
+    """
+    Persistent path -> (size, mtime_ns, inode, sha256) map for one run dir.
+
+    An entry is trusted only if size, mtime_ns and inode all match and the
+    file was last modified before the index was written (a file touched in
+    the same clock tick as the previous pass is re-hashed).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.written_ns = 0
+        self.entries: Dict[str, List[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == 1:
+                self.written_ns = int(data["written_ns"])
+                self.entries = dict(data["entries"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # missing or unreadable index: start empty
+        self._next: Dict[str, List[Any]] = {}
+
+    def lookup(self, rel: str, st: os.stat_result) -> str | None:
+        e = self.entries.get(rel)
+        if e and e[:3] == [st.st_size, st.st_mtime_ns, st.st_ino] and st.st_mtime_ns < self.written_ns:
+            self.hits += 1
+            return e[3]
+        self.misses += 1
+        return None
+
+    def record(self, rel: str, st: os.stat_result, digest: str) -> None:
+        self._next[rel] = [st.st_size, st.st_mtime_ns, st.st_ino, digest]
+
+    def save(self, written_ns: int) -> None:
+        """Replace the index with this pass's entries (files that vanished drop out)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"version": 1, "written_ns": written_ns, "entries": self._next}, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def discard(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def generate_sums(
+    run_id: str, *, jobs: int = DEFAULT_JOBS, index: HashIndex | None = None
+) -> Tuple[Path, List[Tuple[str, Path]], str]:
+    """Write SHA256SUMS.txt; returns its path, (digest, path) entries in file order, and its own digest."""
     rd = REPO_ROOT / "runs" / run_id
     if not rd.is_dir():
         raise SystemExit(f"run dir not found: {rd}")
 
-    sums_path = rd / "SHA256SUMS.txt"
-    files = _walk_files(rd, exclude=[sums_path])
-    entries: List[Tuple[str, Path]] = []
-
-    lines: List[str] = []
-    for fp in files:
-        h = hashlib.sha256()
-        with fp.open("rb") as f:
-            for chunk in iter(lambda: f.read(1 << 20), b""):
-                h.update(chunk)
-        digest = h.hexdigest()
-        entries.append((digest, fp))
-        lines.append(f"{digest}  {_relfmt(rd, fp)}\n")
-
-    sums_path.write_text("".join(lines), encoding="utf-8")
-    return sums_path, entries
+    sums_path = rd / SUMS_NAME
+    # the hash index is attestation bookkeeping, like the sums file itself
+    files = _walk_files(rd, exclude=[sums_path, rd / HASH_INDEX_PATH])
+    started_ns = time.time_ns()
+    digests: List[str | None] = [None] * len(files)
+    stats: List[os.stat_result | None] = [None] * len(files)
+    if index is not None:
+        for i, fp in enumerate(files):
+            stats[i] = st = fp.stat()
+            digests[i] = index.lookup(_relfmt(rd, fp), st)
+
+    todo = [i for i, d in enumerate(digests) if d is None]
+    if jobs > 1 and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            fresh = list(pool.map(_sha256_file, [files[i] for i in todo]))
+    else:
+        fresh = [_sha256_file(files[i]) for i in todo]
+    for i, d in zip(todo, fresh):
+        digests[i] = d
+
+    if index is not None:
+        for fp, st, d in zip(files, stats, digests):
+            index.record(_relfmt(rd, fp), st, d)
+        index.save(started_ns)
+    entries: List[Tuple[str, Path]] = list(zip(digests, files))
+
+    data = "".join(f"{digest}  {_relfmt(rd, fp)}\n" for digest, fp in entries).encode("utf-8")
+    sums_path.write_bytes(data)
+    return sums_path, entries, hashlib.sha256(data).hexdigest()
 
 
 def verify_exact_coverage(run_id: str, sums_path: Path, entries: List[Tuple[str, Path]]) -> None:
@@ -110,14 +206,8 @@ def verify_exact_coverage(run_id: str, sums_path: Path, entries: List[Tuple[str,
     if has_scope and not (rd / "scope").is_dir():
         raise SystemExit("scope_missing_but_required")
 
-    # Enumerate ALL files except SHA256SUMS.txt
-    all_files = set()
-    for root, _, files in os.walk(rd):
-        for fn in files:
-            fp = Path(root) / fn
-            if fp.resolve() == sums_path.resolve():
-                continue
-            all_files.add(_relfmt(rd, fp))
+    # ALL files except SHA256SUMS.txt, as enumerated by generate_sums
+    all_files = {_relfmt(rd, fp) for _, fp in entries}
 
     missing = sorted(all_files - paths_in_sums)
     extra = sorted(paths_in_sums - all_files)
@@ -138,12 +228,7 @@ def verify_exact_coverage(run_id: str, sums_path: Path, entries: List[Tuple[str,
 
     for i in indices:
         expected, path = entries[i]
-        h = hashlib.sha256()
-        with path.open("rb") as f:
-            for chunk in iter(lambda: f.read(1 << 20), b""):
-                h.update(chunk)
-        got = h.hexdigest()
-        if got != expected:
+        if _sha256_file(path) != expected:
             rel = _relfmt(rd, path)
             raise SystemExit(f"rehash_mismatch:{rel}")
 
@@ -158,13 +243,8 @@ def write_attestation(run_id: str, manifest_sha: str, sums_sha: str) -> Tuple[Pa
     if repo and os.getenv("GITHUB_RUN_ID"):
         run_url = f"https://github.com/{repo}/actions/runs/{os.getenv('GITHUB_RUN_ID')}"
 
-    try:
-        git_sha = (
-            (REPO_ROOT / ".git" / "HEAD").read_text().strip()
-            if (REPO_ROOT / ".git" / "HEAD").exists()
-            else ""
-        )
-    except Exception:
+    git_sha = env_capture.git_info(REPO_ROOT)["commit"]
+    if git_sha == "unknown":
         git_sha = ""
 
     now = _ts()
@@ -212,6 +292,9 @@ Statement:
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser(description="AWO v3.0 attestation helper")
     ap.add_argument("--run-id", required=True)
+    ap.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"Hashing threads (default: {DEFAULT_JOBS})")
+    ap.add_argument("--hash-index", action="store_true",
+                    help=f"Reuse digests of unchanged files via runs/<RUN_ID>/{HASH_INDEX_PATH}")
     args = ap.parse_args(argv)
 
     run_id = args.run_id
@@ -226,19 +309,17 @@ def main(argv: list[str]) -> int:
         return 1
 
     # 1) Generate sums and enforce coverage
-    sums_path, entries = generate_sums(run_id)
-    verify_exact_coverage(run_id, sums_path, entries)
-
-    # 2) Compute manifest + sums digests for attestation
-    def sha256_file(p: Path) -> str:
-        h = hashlib.sha256()
-        with p.open("rb") as f:
-            for chunk in iter(lambda: f.read(1 << 20), b""):
-                h.update(chunk)
-        return h.hexdigest()
+    index = HashIndex(rd / HASH_INDEX_PATH) if args.hash_index else None
+    sums_path, entries, sums_sha = generate_sums(run_id, jobs=args.jobs, index=index)
+    try:
+        verify_exact_coverage(run_id, sums_path, entries)
+    except SystemExit:
+        if index is not None:
+            index.discard()  # never reuse an index that produced a bad attestation
+        raise
 
-    manifest_sha = sha256_file(mf)
-    sums_sha = sha256_file(sums_path)
+    # 2) Manifest + sums digests for attestation (already computed above)
+    manifest_sha = next(d for d, fp in entries if fp == mf)
 
     # 3) Write attestation artifacts
     txt_path, json_path = write_attestation(run_id, manifest_sha, sums_sha)
@@ -248,6 +329,8 @@ def main(argv: list[str]) -> int:
     print("  sums         :", sums_path)
     print("  manifest_sha :", manifest_sha)
     print("  sums_sha     :", sums_sha)
+    if index is not None:
+        print(f"  hash_index   : {index.hits}/{index.hits + index.misses} reused ({index.hit_rate():.1%})")
     print("  attestation  :", txt_path)
     print("  attestationJ :", json_path)
 
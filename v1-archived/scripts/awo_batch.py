@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+AWO batch runner: many workflows, or one workflow over a parameter matrix,
+in one invocation.
+
+Members run in a process pool. Each worker imports the runner, compiles the
+schemas and builds the model backends once, then executes member runs back
+to back; all workers share the on-disk generation cache, which is pruned
+once at the end of the batch instead of after every run.
+
+Every member is an ordinary run: its own runs/<run_id>/ with manifest,
+provenance, report and workflow_frozen.json, attestable on its own with
+`python scripts/awo_attest.py --run-id <run_id>`. Run directories are
+claimed up front, in member order, before any member starts, so run ids sort
+like the members and are known even for members still queued. Matrix members
+get their expanded workflow written to runs/batches/<batch_id>/<NNN>.json,
+which is the workflow their manifest points at.
+
+Usage (from repo root):
+
+    python scripts/awo_batch.py workflows/a.json workflows/b.json [--workers N] [--jobs N]
+    python scripts/awo_batch.py workflows/a.json --matrix matrix.json [--workers N]
+
+matrix.json maps a parameter to its values; members are the Cartesian
+product, in key order:
+
+    {"seed": [1, 2, 3], "models": [["echo"], ["echo", "upper"]]}
+
+`seed`, `models` and `prompt` apply to every fanout_generate step
+(`seed` sets params.seed); any other key is "<step_id>.<dotted.path>".
+
+Writes runs/batches/<batch_id>.jsonl: one line per member, in input order.
+Exit code: 2 if any member failed, else 78 if any paused at a gate, else 0.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import awo_run
+from awo_run import REPO_ROOT, RUNS_ROOT, ExitCode
+from generation_cache import GenerationCache
+
+BATCHES_DIR = "batches"
+FANOUT_SHORTHANDS = {"seed": ("params", "seed"), "models": ("models",), "prompt": ("prompt",)}
+
+# (member index, workflow path relative to the repo root, matrix values or None)
+Member = Tuple[int, str, Optional[Dict[str, Any]]]
+
+
+# ------------------------------ matrix expansion ------------------------------
+def _set_path(obj: Dict[str, Any], path: Tuple[str, ...], value: Any) -> None:
+    for k in path[:-1]:
+        nxt = obj.get(k)
+        if not isinstance(nxt, dict):
+            nxt = obj[k] = {}
+        obj = nxt
+    obj[path[-1]] = copy.deepcopy(value)
+
+
+def apply_params(wf: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of wf with one matrix combination applied."""
+    out = copy.deepcopy(wf)
+    steps = out.get("steps", [])
+    by_id = {s.get("id"): s for s in steps if isinstance(s, dict)}
+    for key, value in params.items():
+        if key in FANOUT_SHORTHANDS:
+            targets = [s for s in steps if isinstance(s, dict) and s.get("op") == "fanout_generate"]
+            if not targets:
+                raise ValueError(f"matrix key {key!r}: workflow has no fanout_generate step")
+            for s in targets:
+                _set_path(s, FANOUT_SHORTHANDS[key], value)
+            continue
+        sid, _, path = key.partition(".")
+        if sid not in by_id or not path:
+            raise ValueError(f"matrix key {key!r}: expected seed/models/prompt or '<step_id>.<path>'")
+        _set_path(by_id[sid], tuple(path.split(".")), value)
+    return out
+
+
+def expand_matrix(matrix: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    for k, v in matrix.items():
+        if not isinstance(v, list) or not v:
+            raise ValueError(f"matrix key {k!r}: expected a non-empty list of values")
+    keys = list(matrix)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(matrix[k] for k in keys))]
+
+
+def _new_batch_dir() -> Tuple[str, Path]:
+    root = RUNS_ROOT / BATCHES_DIR
+    root.mkdir(parents=True, exist_ok=True)
+    stamp, n = awo_run.ts_for_dirname(), 0
+    while True:
+        batch_id = f"batch_{stamp}-{n:03d}" if n else f"batch_{stamp}"
+        try:
+            (root / batch_id).mkdir()  # exclusive: concurrent batches never share an id
+            return batch_id, root / batch_id
+        except FileExistsError:
+            n += 1
+
+
+def plan_members(workflows: List[str], matrix_path: Optional[str], batch_dir: Path) -> List[Member]:
+    if matrix_path is None:
+        return [(i, wf, None) for i, wf in enumerate(workflows)]
+    if len(workflows) != 1:
+        raise ValueError("--matrix takes exactly one workflow")
+    wf = json.loads((REPO_ROOT / workflows[0]).read_text(encoding="utf-8"))
+    matrix = json.loads(Path(matrix_path).read_text(encoding="utf-8"))
+    members: List[Member] = []
+    for i, params in enumerate(expand_matrix(matrix)):
+        p = batch_dir / f"{i:03d}.json"
+        p.write_text(json.dumps(apply_params(wf, params), indent=2, ensure_ascii=False), encoding="utf-8")
+        members.append((i, p.relative_to(REPO_ROOT).as_posix(), params))
+    return members
+
+
+# --------------------------------- workers -----------------------------------
+def _run_member(member: Member, run_dir: Path, cache_mode: str, jobs: int) -> Dict[str, Any]:
+    idx, workflow, params = member
+    t0 = time.perf_counter()
+    run_dir, code, error = awo_run.run_guarded(
+        workflow, cache_mode=cache_mode, jobs=jobs, run_dir=run_dir, prune_cache=False
+    )
+    status = awo_run.run_status(run_dir)
+    return {
+        "member": idx,
+        "workflow": workflow,
+        **({"params": params} if params is not None else {}),
+        "run_id": run_dir.name,
+        "exit_code": code,
+        "status": status,
+        "duration_s": round(time.perf_counter() - t0, 3),
+        **({"error": error} if error else {}),
+    }
+
+
+def run_batch(
+    members: List[Member],
+    *,
+    batch_id: str,
+    out: Path,
+    workers: Optional[int] = None,
+    cache_mode: str = "use",
+    jobs: int = 1,
+) -> int:
+    workers = max(1, min(workers or os.cpu_count() or 1, len(members) or 1))
+    run_dirs = [awo_run.ensure_run_dir() for _ in members]
+    codes: List[int] = []
+    with out.open("w", encoding="utf-8") as f:
+        if workers == 1:
+            awo_run.warm_up()
+            results: Iterator[Dict[str, Any]] = (
+                _run_member(m, rd, cache_mode, jobs) for m, rd in zip(members, run_dirs)
+            )
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=awo_run.warm_up)
+            results = pool.map(
+                _run_member, members, run_dirs, itertools.repeat(cache_mode), itertools.repeat(jobs)
+            )
+        try:
+            for rec in results:
+                codes.append(rec["exit_code"])
+                f.write(json.dumps({"batch_id": batch_id, **rec}, ensure_ascii=False) + "\n")
+                f.flush()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    GenerationCache(RUNS_ROOT / ".cache", mode=cache_mode).prune()
+    failed = sum(c not in (ExitCode.OK, ExitCode.PENDING) for c in codes)
+    pending = codes.count(ExitCode.PENDING)
+    print(
+        f"[AWO] batch {batch_id}: {len(codes)} run(s), {failed} failed, {pending} pending review -> {out}",
+        file=sys.stderr,
+    )
+    if failed:
+        return int(ExitCode.ERROR)
+    return int(ExitCode.PENDING) if pending else int(ExitCode.OK)
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(prog="python scripts/awo_batch.py", description="Run many AWO workflows in one process pool")
+    ap.add_argument("workflows", nargs="+", help="Workflow JSON paths, relative to the repo root")
+    ap.add_argument("--matrix", help="JSON object of parameter -> list of values (one workflow only)")
+    ap.add_argument("--workers", type=int, default=None, help="Member runs in flight (default: CPU count)")
+    ap.add_argument("--jobs", type=int, default=1, help="Per-run step concurrency, as in awo_run.py --jobs")
+    cache = ap.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", dest="cache_mode", action="store_const", const="off")
+    cache.add_argument("--cache-only", dest="cache_mode", action="store_const", const="only")
+    ap.set_defaults(cache_mode="use")
+    args = ap.parse_args(argv)
+
+    batch_id, batch_dir = _new_batch_dir()
+    try:
+        members = plan_members(args.workflows, args.matrix, batch_dir)
+    except (OSError, ValueError) as e:
+        print(f"[AWO] batch: {e}", file=sys.stderr)
+        return int(ExitCode.ERROR)
+    return run_batch(
+        members,
+        batch_id=batch_id,
+        out=batch_dir.with_suffix(".jsonl"),
+        workers=args.workers,
+        cache_mode=args.cache_mode,
+        jobs=args.jobs,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
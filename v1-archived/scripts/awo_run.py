@@ -11,25 +11,31 @@ North Star (echo):
 
 This runner:
 - Emits schema-compliant run_manifest.json (start/update/finalize)
-- Emits schema-compliant provenance.json (per step + artifacts)
+- Emits schema-compliant provenance.json (appended per step to provenance.jsonl,
+  compacted once when the run finalizes, pauses or fails)
 - Validates with jsonschema (fail-fast)
 - Uses deterministic local backends (echo/upper/reverse) by default
+- Reuses generations from the content-addressed cache under runs/.cache/
+  (--no-cache to bypass, --cache-only to forbid backend calls)
+- Schedules steps by their data dependencies (--plan to print the levels,
+  --jobs N to run independent steps of a level concurrently)
 """
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import functools
 import hashlib
 import json
 import os
-import platform
-import re
-import subprocess
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 # ---------- required for schema validation (install in CI: pip install jsonschema)
 try:
@@ -38,6 +44,27 @@ except Exception:
     print("[AWO] FATAL: jsonschema not installed. Add `pip install jsonschema` in CI.", file=sys.stderr)
     raise
 
+# op_registry is shared with the package (core/op_registry.py)
+_CORE = str(Path(__file__).resolve().parents[1] / "core")
+if _CORE not in sys.path:
+    sys.path.append(_CORE)
+
+import backend_calls
+import common_ops
+import consensus_engine
+import deadline_pool
+import env_capture
+import history_index
+import op_registry
+import run_catalog
+import schema_registry
+import scope_engine
+import step_scheduler
+import sweep_engine
+from generation_cache import GenerationCache, generation_key
+from provenance_store import ProvenanceStore, recover as _recover_provenance
+from run_writer import RunWriter, encode_json
+
 
 class ExitCode(IntEnum):
     OK = 0
@@ -51,7 +78,6 @@ RUNS_ROOT = (REPO_ROOT / "runs").resolve()
 SCHEMAS_ROOT = (REPO_ROOT / "schemas").resolve()
 
 RUN_MANIFEST_PATH = "run_manifest.json"
-PROVENANCE_PATH = "provenance.json"
 
 
 def _debug(msg: str) -> None:
@@ -70,17 +96,30 @@ def ts_for_dirname() -> str:
 
 
 # --------------------------- deterministic local backends --------------------
-class _Echo:
+class _Fallback:
+    """Same async/batch surface as awo.models.base.ModelBackend (stdlib-only copy)."""
+
+    def generate(self, prompt: str, params=None):
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, *, params=None):
+        return await backend_calls.generate_in_thread(self, prompt, params=params)
+
+    def generate_batch(self, prompts: List[str], *, params=None):
+        return [self.generate(p, params=params) for p in prompts]
+
+
+class _Echo(_Fallback):
     def generate(self, prompt: str, params=None):
         return {"text": prompt, "meta": {"engine": "fallback:echo", "seed": (params or {}).get("seed", 0)}}
 
 
-class _Upper:
+class _Upper(_Fallback):
     def generate(self, prompt: str, params=None):
         return {"text": (prompt or "").upper(), "meta": {"engine": "fallback:upper", "seed": (params or {}).get("seed", 0)}}
 
 
-class _Reverse:
+class _Reverse(_Fallback):
     def generate(self, prompt: str, params=None):
         return {"text": (prompt or "")[::-1], "meta": {"engine": "fallback:reverse", "seed": (params or {}).get("seed", 0)}}
 
@@ -94,10 +133,6 @@ def sha256_hex_str(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
-def norm_text(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip().lower())
-
-
 def write_text(path: Path, content: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(content, encoding="utf-8")
@@ -108,28 +143,75 @@ def write_json(path: Path, obj: Any) -> None:
     path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
+# One buffered writer per run directory; flushed at step boundaries and exits.
+_WRITERS: Dict[Path, RunWriter] = {}
+
+
+def _writer(run_dir: Path) -> RunWriter:
+    w = _WRITERS.get(run_dir)
+    if w is None:
+        w = _WRITERS[run_dir] = RunWriter(run_dir)
+    return w
+
+
+def release_writer(run_dir: Path) -> None:
+    """Flush and drop a finished run's writer (long-lived processes such as batch workers)."""
+    w = _WRITERS.pop(run_dir, None)
+    if w is not None:
+        w.flush()
+
+
+def _flush(run_dir: Path) -> None:
+    w = _writer(run_dir)
+    w.flush()
+    _debug(f"Run writer: {w.stats()}")
+    _debug(f"Op timing: {OPS.timings()}")
+
+
+def _catalog(run_dir: Path) -> None:
+    """Mirror the run's manifest/provenance into runs/.catalog.sqlite (best effort)."""
+    try:
+        run_catalog.record_run(run_dir, RUNS_ROOT / run_catalog.CATALOG_NAME)
+    except Exception as e:
+        _debug(f"run catalog update skipped: {e}")
+
+
+_RUN_ID_LOCK = threading.Lock()
+_last_run_stamp: Tuple[str, int] = ("", -1)  # (second, last suffix) claimed by this process
+
+
 def ensure_run_dir() -> Path:
+    """
+    Claim a new runs/run_<UTC second>[-NNN] directory.
+
+    The run directory is created with an exclusive mkdir, so concurrent runs
+    (threads or processes) never share one. Runs started in the same second
+    get -001, -002, ... suffixes and still sort by start time.
+    """
+    global _last_run_stamp
     RUNS_ROOT.mkdir(parents=True, exist_ok=True)
-    rd = RUNS_ROOT / f"run_{ts_for_dirname()}"
-    (rd / "steps").mkdir(parents=True, exist_ok=True)
-    (rd / "artifacts").mkdir(parents=True, exist_ok=True)
-    if not rd.exists():
-        raise RuntimeError(f"Failed to create run dir: {rd}")
+    with _RUN_ID_LOCK:
+        stamp = ts_for_dirname()
+        n = _last_run_stamp[1] + 1 if _last_run_stamp[0] == stamp else 0
+        while True:
+            rd = RUNS_ROOT / (f"run_{stamp}-{n:03d}" if n else f"run_{stamp}")
+            try:
+                rd.mkdir()
+                break
+            except FileExistsError:
+                n += 1
+        _last_run_stamp = (stamp, n)
+    (rd / "steps").mkdir()
+    (rd / "artifacts").mkdir()
     return rd
 
 
 def breadcrumb(run_dir: Path) -> None:
-    """Write runs/LAST_RUN with verification."""
+    """Point runs/LAST_RUN at run_dir (atomic replace; the last finisher wins)."""
     last_run = RUNS_ROOT / "LAST_RUN"
-    write_text(last_run, run_dir.name)
-    for _ in range(3):
-        try:
-            if last_run.read_text(encoding="utf-8").strip() == run_dir.name:
-                return
-        except Exception:
-            pass
-        time.sleep(0.05)
-    raise RuntimeError(f"Breadcrumb verification failed: {last_run} != {run_dir.name}")
+    tmp = last_run.with_name(f".LAST_RUN.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(run_dir.name, encoding="utf-8")
+    os.replace(tmp, last_run)
 
 
 def init_report(run_dir: Path, workflow_path: str) -> List[str]:
@@ -145,11 +227,11 @@ def init_report(run_dir: Path, workflow_path: str) -> List[str]:
 
 
 def record_step(run_dir: Path, idx: int, step_id: str, payload: Dict[str, Any]) -> None:
-    write_json(run_dir / "steps" / f"{idx:02d}_{step_id}.json", payload)
+    _writer(run_dir).write_json(run_dir / "steps" / f"{idx:02d}_{step_id}.json", payload)
 
 
 def finalize_report(run_dir: Path, report_lines: List[str]) -> None:
-    write_text(run_dir / "report.md", "\n".join(report_lines))
+    _writer(run_dir).write_text(run_dir / "report.md", "\n".join(report_lines))
 
 
 def rel(p: Path) -> str:
@@ -160,79 +242,117 @@ def rel(p: Path) -> str:
         return str(p)
 
 
-def _git_sha() -> str:
-    try:
-        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT).decode().strip()
-    except Exception:
-        return "unknown"
-
-
 # ------------------------------ schema helpers -------------------------------
-def _load_schema(name: str) -> Dict[str, Any]:
-    p = (SCHEMAS_ROOT / name).resolve()
-    if not p.exists():
-        raise FileNotFoundError(f"Schema not found: {p}")
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception as e:
-        raise RuntimeError(f"Invalid JSON in schema {p}: {e}")
+# Validators are compiled once per process by schema_registry.
+RUN_MANIFEST_SCHEMA = "run_manifest.schema.json"
+PROVENANCE_SCHEMA = "provenance.schema.json"
 
 
-RUN_MANIFEST_SCHEMA: Dict[str, Any] | None = None
-PROVENANCE_SCHEMA: Dict[str, Any] | None = None
+def _ensure_schemas_loaded() -> None:
+    schema_registry.preload(RUN_MANIFEST_SCHEMA, PROVENANCE_SCHEMA, root=SCHEMAS_ROOT)
 
 
-def _ensure_schemas_loaded() -> None:
-    global RUN_MANIFEST_SCHEMA, PROVENANCE_SCHEMA
-    if RUN_MANIFEST_SCHEMA is None:
-        RUN_MANIFEST_SCHEMA = _load_schema("run_manifest.schema.json")
-    if PROVENANCE_SCHEMA is None:
-        PROVENANCE_SCHEMA = _load_schema("provenance.schema.json")
+def warm_up() -> None:
+    """Compile the schemas, build the backends and capture the environment now (batch worker initializer)."""
+    _ensure_schemas_loaded()
+    _load_backends()
+    env_capture.snapshot(REPO_ROOT)
 
 
-def _validate_or_die(obj: Dict[str, Any], schema: Dict[str, Any], label: str) -> None:
+def _validate_or_die(obj: Dict[str, Any], schema: str, label: str) -> None:
     try:
-        jsonschema.validate(obj, schema)
+        schema_registry.get_validator(schema, root=SCHEMAS_ROOT).validate(obj)
     except jsonschema.ValidationError as e:
         raise RuntimeError(f"{label} failed schema validation: {e.message}")
 
 
-# --------------------------- scope validation helpers ------------------------
-REQUIRED_CLAIM_FIELDS = ["id", "statement"]
-
-
-def _problems_for_claim(claim: Dict[str, Any]) -> List[str]:
-    probs: List[str] = []
-    for f in REQUIRED_CLAIM_FIELDS:
-        if f not in claim or claim[f] in (None, "", []):
-            probs.append(f"missing field: {f}")
-    preds = claim.get("predictions", [])
-    tests = claim.get("falsification_tests", [])
-    if not preds and not tests:
-        probs.append("claim is not testable: no predictions and no falsification_tests")
-    for i, p in enumerate(preds or []):
-        tol = (p or {}).get("tolerance")
-        if not tol:
-            probs.append(f"prediction[{i}] missing tolerance")
-    for i, t in enumerate(tests or []):
-        if not isinstance(t, dict) or not any(k in t for k in ("must_pass", "fail_if")):
-            probs.append(f"falsification_tests[{i}] missing must_pass/fail_if")
-    return probs
-
-
-def _load_claims(args: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
-    loaded: List[Dict[str, Any]] = []
-    notes: List[str] = []
-    if "claim" in args and isinstance(args["claim"], dict):
-        loaded.append(args["claim"])
-    glob = args.get("claims_glob")
-    if glob:
-        for p in REPO_ROOT.glob(glob):
+# ------------------------------ fanout dispatch ------------------------------
+class FanoutTimeout(RuntimeError):
+    def __init__(self, model: str, timeout_s: float) -> None:
+        super().__init__(f"model '{model}' timed out after {timeout_s}s")
+        self.model = model
+        self.timeout_s = timeout_s
+
+
+def _timed_generate(backend: Any, prompt: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], str, str]:
+    started = ts_rfc3339()
+    out = backend.generate(prompt, params=params)
+    return out, started, ts_rfc3339()
+
+
+async def _fanout_async(
+    backends: Dict[str, Any],
+    models: List[str],
+    prompt: str,
+    params: Dict[str, Any],
+    *,
+    max_concurrency: int,
+    timeout_for: Any,
+) -> List[Tuple[Dict[str, Any], str, str]]:
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(m: str) -> Tuple[Dict[str, Any], str, str]:
+        async with sem:
+            started = ts_rfc3339()
+            t = timeout_for(m)
             try:
-                loaded.append(json.loads(Path(p).read_text(encoding="utf-8")))
-            except Exception as e:
-                notes.append(f"failed to parse {p}: {e}")
-    return loaded, notes
+                out = await asyncio.wait_for(backend_calls.agenerate(backends[m], prompt, params=params), t)
+            except asyncio.TimeoutError:
+                raise FanoutTimeout(m, t)
+            return out, started, ts_rfc3339()
+
+    return list(await asyncio.gather(*(_one(m) for m in models)))
+
+
+def _fanout_dispatch(
+    backends: Dict[str, Any],
+    models: List[str],
+    prompt: str,
+    params: Dict[str, Any],
+    *,
+    max_concurrency: int,
+    timeout_s: Union[float, Dict[str, float], None] = None,
+    executor: str = "thread",
+) -> List[Tuple[Dict[str, Any], str, str]]:
+    """
+    Run backend.generate for every model on a bounded thread pool.
+
+    Results come back in `models` order regardless of completion order, each
+    with that model's own started/ended timestamps, so step records,
+    provenance and the report are identical to a sequential run.
+    A per-model timeout runs from the moment a worker starts that model, so a
+    model is never charged for time it spent queued behind the pool, and a
+    hung model fails the step as soon as its own deadline passes.
+
+    executor="async" awaits backend.agenerate() for all models on one event
+    loop instead (a semaphore bounds concurrency; timeouts via wait_for).
+    """
+    def _timeout_for(m: str) -> float | None:
+        if isinstance(timeout_s, dict):
+            return timeout_s.get(m)
+        return timeout_s
+
+    if executor == "async":
+        return asyncio.run(
+            _fanout_async(backends, models, prompt, params, max_concurrency=max_concurrency, timeout_for=_timeout_for)
+        )
+    if executor != "thread":
+        raise ValueError(f"Unsupported fanout executor: {executor!r}")
+
+    if timeout_s is None and (max_concurrency <= 1 or len(models) <= 1):
+        # No pool needed: same behavior as the historical sequential runner.
+        return [_timed_generate(backends[m], prompt, params) for m in models]
+
+    try:
+        return deadline_pool.map_with_deadlines(
+            lambda m: _timed_generate(backends[m], prompt, params),
+            models,
+            max_workers=min(max_concurrency, len(models)),
+            timeout_for=lambda i: _timeout_for(models[i]),
+            thread_name_prefix="awo-fanout",
+        )
+    except deadline_pool.DeadlineExceeded as e:
+        raise FanoutTimeout(models[e.index], e.timeout_s)
 
 
 # --------------------------- manifest/provenance ------------------------------
@@ -243,16 +363,10 @@ def _init_run_manifest(run_dir: Path, workflow_path: str, started_at: str) -> Di
       - env_ref: string pointing to environment snapshot
       - started_at/finished_at: RFC3339 strings
     """
-    # Create environment snapshot
-    env = {
-        "python": sys.version.split()[0],
-        "platform": platform.platform(),
-        "git_sha": _git_sha(),
-        "github_run_id": os.getenv("GITHUB_RUN_ID"),
-        "github_sha": os.getenv("GITHUB_SHA"),
-    }
+    # Environment snapshot: memoized per process, git re-read only when HEAD/refs change
+    env = env_capture.snapshot(REPO_ROOT)
     env_path = run_dir / "environment.json"
-    write_json(env_path, env)
+    _writer(run_dir).write_json(env_path, env)
 
     m = {
         "run_id": run_dir.name,
@@ -266,32 +380,36 @@ def _init_run_manifest(run_dir: Path, workflow_path: str, started_at: str) -> Di
     }
     _ensure_schemas_loaded()
     _validate_or_die(m, RUN_MANIFEST_SCHEMA, "run_manifest")
-    write_json(run_dir / RUN_MANIFEST_PATH, m)
+    _writer(run_dir).write_json(run_dir / RUN_MANIFEST_PATH, m)
     return m
 
 
 def _append_manifest_op(run_dir: Path, manifest: Dict[str, Any], idx: int, step_id: str, op: str) -> None:
     manifest["ops"].append({"idx": idx, "id": step_id, "op": op})
     _validate_or_die(manifest, RUN_MANIFEST_SCHEMA, "run_manifest")
-    write_json(run_dir / RUN_MANIFEST_PATH, manifest)
+    _writer(run_dir).write_json(run_dir / RUN_MANIFEST_PATH, manifest)
 
 
 def _finalize_manifest(run_dir: Path, manifest: Dict[str, Any], status: str) -> None:
     manifest["status"] = status
     manifest["finished_at"] = ts_rfc3339()
     _validate_or_die(manifest, RUN_MANIFEST_SCHEMA, "run_manifest")
-    write_json(run_dir / RUN_MANIFEST_PATH, manifest)
+    _writer(run_dir).write_json(run_dir / RUN_MANIFEST_PATH, manifest)
 
 
-def _init_provenance(run_dir: Path) -> List[Dict[str, Any]]:
-    return []
+def _validate_provenance(rec: Dict[str, Any]) -> None:
+    _validate_or_die(rec, PROVENANCE_SCHEMA, "provenance")
 
 
-def _write_provenance(run_dir: Path, prov: List[Dict[str, Any]]) -> None:
+def _init_provenance(run_dir: Path) -> ProvenanceStore:
+    """Open the append-only provenance log (each record validated on append)."""
     _ensure_schemas_loaded()
-    for rec in prov:
-        _validate_or_die(rec, PROVENANCE_SCHEMA, "provenance")
-    write_json(run_dir / PROVENANCE_PATH, prov)
+    return ProvenanceStore(run_dir, validate=_validate_provenance)
+
+
+def _write_provenance(run_dir: Path, prov: ProvenanceStore) -> None:
+    """Compact the provenance log into the schema-compliant provenance.json array."""
+    prov.compact()
 
 
 def _prov_record_template(
@@ -344,6 +462,8 @@ def _fatal(
 ) -> int:
     """Single, consistent fatal path (records step, report, manifest, index)."""
     _append_manifest_op(run_dir, manifest, step_idx, step_id, "fatal_error")
+    # Rebuild provenance.json from whatever reached the log before the failure.
+    _recover_provenance(run_dir)
     payload = {"error": "fatal", "message": msg, "ts": ts_rfc3339()}
     if extra_payload:
         payload.update(extra_payload)
@@ -353,363 +473,733 @@ def _fatal(
     _finalize_manifest(run_dir, manifest, "error")
     # Index file mirrors the manifest lifecycle
     idx = {"run_id": run_dir.name, "started_at": started_at, "status": "error", "finished_at": ts_rfc3339()}
-    write_json(run_dir / "index.json", idx)
+    _writer(run_dir).write_json(run_dir / "index.json", idx)
+    _flush(run_dir)
+    _catalog(run_dir)
     print(f"[AWO] {msg}", file=sys.stderr)
     return int(exit_code)
 
 
-# --------------------------------- main --------------------------------------
-def update_index(run_dir: Path, *, started_at: str, status: str, finished_at: str | None = None) -> None:
-    idx = {"run_id": run_dir.name, "started_at": started_at, "status": status}
-    if finished_at:
-        idx["finished_at"] = finished_at
-    write_json(run_dir / "index.json", idx)
+# ---------------------------- gate checkpoint/resume --------------------------
+GATE_CHECKPOINT_PATH = "gate_checkpoint.json"
 
+# ops whose step record feeds ctx, and which part of the record ctx holds;
+# sweep_generate's ctx is read back from its artifact (see _sweep_artifact)
+_CTX_FIELDS: Dict[str, str | None] = {"fanout_generate": "outputs", "consensus_vote": None}
 
-def run(workflow_path: str) -> int:
-    # 1) Create run dir + breadcrumb FIRST so CI can always find it.
-    run_dir = ensure_run_dir()
-    breadcrumb(run_dir)
-    started_at = ts_rfc3339()
 
-    # Initialize manifest + provenance
-    manifest = _init_run_manifest(run_dir, workflow_path, started_at)
-    provenance: List[Dict[str, Any]] = _init_provenance(run_dir)
+def _sweep_artifact(run_dir: Path, step_id: str) -> Path:
+    return run_dir / "artifacts" / "sweeps" / f"{step_id}.jsonl"
+
 
-    _debug(f"Repo root: {REPO_ROOT}")
-    _debug(f"Runs root: {RUNS_ROOT}")
-    _debug(f"Run dir : {run_dir}")
-    _debug(f"Breadcrumb: {(RUNS_ROOT / 'LAST_RUN')}")
+def _file_sha256(p: Path) -> str:
+    return sha256_hex_bytes(p.read_bytes())
 
-    report = init_report(run_dir, workflow_path)
+
+def _write_gate_checkpoint(run_dir: Path, step_idx: int, step_id: str, started_at: str) -> None:
+    """Pin everything a resume will trust: the frozen workflow and every step record so far."""
+    steps_dir = run_dir / "steps"
+    ckpt = {
+        "run_id": run_dir.name,
+        "gate": {"idx": step_idx, "id": step_id},
+        "started_at": started_at,
+        "workflow_frozen": f"sha256:{_file_sha256(run_dir / 'workflow_frozen.json')}",
+        "steps": {p.name: f"sha256:{_file_sha256(p)}" for p in sorted(steps_dir.glob("*.json"))},
+        "created_at": ts_rfc3339(),
+    }
+    _writer(run_dir).write_json(run_dir / GATE_CHECKPOINT_PATH, ckpt)
+
+
+def _read_gate_decision(path: Path) -> Dict[str, str]:
+    """Flat `key: value` reader for gate_decision.yml (keeps the runner stdlib-only)."""
+    out: Dict[str, str] = {}
+    if not path.is_file():
+        return out
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].rstrip()
+        if ":" not in line or line.startswith((" ", "\t")):
+            continue
+        k, v = line.split(":", 1)
+        out[k.strip()] = v.strip().strip("'\"")
+    return out
+
+
+def _verify_gate_checkpoint(run_dir: Path, ckpt: Dict[str, Any]) -> List[str]:
+    problems: List[str] = []
+    pinned = dict(ckpt.get("steps", {}))
+    pinned_paths = {f"steps/{k}": v for k, v in pinned.items()}
+    pinned_paths["workflow_frozen.json"] = ckpt.get("workflow_frozen", "")
+    for relp, want in pinned_paths.items():
+        p = run_dir / relp
+        if not p.is_file():
+            problems.append(f"missing:{relp}")
+        elif f"sha256:{_file_sha256(p)}" != want:
+            problems.append(f"hash_mismatch:{relp}")
+    extra = sorted(p.name for p in (run_dir / "steps").glob("*.json") if p.name not in pinned)
+    problems.extend(f"unexpected:steps/{n}" for n in extra)
+    if problems:
+        return problems
+    # sweep outputs live in their artifact; its hash is in the (pinned) step record
+    for name in sorted(pinned):
+        rec = json.loads((run_dir / "steps" / name).read_text(encoding="utf-8"))
+        if rec.get("op") != "sweep_generate" or "id" not in rec:
+            continue
+        art = _sweep_artifact(run_dir, rec["id"])
+        relp = str(art.relative_to(run_dir))
+        if not art.is_file():
+            problems.append(f"missing:{relp}")
+        elif f"sha256:{_file_sha256(art)}" != rec.get("sha256"):
+            problems.append(f"hash_mismatch:{relp}")
+    return problems
+
+
+def _restore_ctx(run_dir: Path, ckpt: Dict[str, Any]) -> Dict[str, Any]:
     ctx: Dict[str, Any] = {}
+    for name in sorted(ckpt.get("steps", {})):
+        rec = json.loads((run_dir / "steps" / name).read_text(encoding="utf-8"))
+        op = rec.get("op")
+        if op in _CTX_FIELDS and "id" in rec:
+            field = _CTX_FIELDS[op]
+            ctx[rec["id"]] = rec[field] if field else rec
+        elif op == "sweep_generate" and "id" in rec:
+            with _sweep_artifact(run_dir, rec["id"]).open(encoding="utf-8") as f:
+                ctx[rec["id"]] = sweep_engine.read_outputs(f)
+    return ctx
+
+
+def resume(run_id: str, *, cache_mode: str = "use", jobs: int = 1) -> int:
+    """
+    Continue a run paused at an audit_gate, in place.
 
-    # 2) Optional local overrides; keep fallbacks if imports fail.
-    BACKENDS = {"echo": _Echo(), "upper": _Upper(), "reverse": _Reverse()}
-    try:
-        from awo.models.local_backend import LocalEcho  # type: ignore
-        from awo.models.alt_backend import LocalUpper  # type: ignore
-        BACKENDS.update({"echo": LocalEcho(), "upper": LocalUpper()})
-    except Exception as e:
-        step_idx = 1
-        step_id = "backend_info"
-        _append_manifest_op(run_dir, manifest, step_idx, step_id, "backend_info")
-        record_step(run_dir, step_idx, step_id, {"note": "using_fallback_backends", "detail": str(e), "ts": ts_rfc3339()})
+    Steps before the gate are not re-executed: ctx is rebuilt from their
+    recorded steps/*.json after checking them against gate_checkpoint.json.
+    gate_decision.yml decides: approved → run the remaining steps;
+    rejected → finalize as error; pending → stay paused.
+    """
+    run_dir = RUNS_ROOT / run_id
+    ckpt_path = run_dir / GATE_CHECKPOINT_PATH
+    if not ckpt_path.is_file():
+        print(f"[AWO] resume: no {GATE_CHECKPOINT_PATH} in {run_dir} (not paused at a gate?)", file=sys.stderr)
+        return int(ExitCode.ERROR)
+    ckpt = json.loads(ckpt_path.read_text(encoding="utf-8"))
+    manifest = json.loads((run_dir / RUN_MANIFEST_PATH).read_text(encoding="utf-8"))
+    if manifest.get("status") != "pending_review":
+        print(f"[AWO] resume: {run_id} is not paused (status={manifest.get('status')})", file=sys.stderr)
+        return int(ExitCode.ERROR)
+    decision = _read_gate_decision(run_dir / "gate_decision.yml")
+    status = decision.get("status", "pending").lower()
+    if status == "pending":
+        _debug(f"resume: gate '{ckpt['gate']['id']}' still pending in {run_dir}")
+        return int(ExitCode.PENDING)
+
+    problems = _verify_gate_checkpoint(run_dir, ckpt)
+    if problems:
+        print(f"[AWO] resume: run directory changed since the gate: {problems}", file=sys.stderr)
+        return int(ExitCode.ERROR)
+
+    with _init_provenance(run_dir) as provenance:
+        report = (run_dir / "report.md").read_text(encoding="utf-8").split("\n")
+        started_at = ckpt["started_at"]
+        gate_idx, gate_id = ckpt["gate"]["idx"], ckpt["gate"]["id"]
+        reviewer = decision.get("reviewer") or decision.get("approved_by") or ""
+        breadcrumb(run_dir)
+        OPS.reset_timings()
+
+        provenance.append(
+            _prov_record_template(
+                manifest["run_id"],
+                role="Auditor",
+                model_name="human-gate",
+                provider="local",
+                notes=f"gate={gate_id}; decision={status}" + (f"; reviewer={reviewer}" if reviewer else ""),
+            )
+        )
+        report += [f"> Gate decision: {status}" + (f" ({reviewer})" if reviewer else ""), ""]
 
-    # 3) Load workflow (safe).
-    wf_path = (REPO_ROOT / workflow_path).resolve()
-    if not wf_path.exists():
-        return _fatal(
+        if status != "approved":
+            _write_provenance(run_dir, provenance)
+            report += ["## Error", "", f"audit_gate '{gate_id}' decision: {status}", ""]
+            finalize_report(run_dir, report)
+            _finalize_manifest(run_dir, manifest, "error")
+            update_index(run_dir, started_at=started_at, status="error", finished_at=ts_rfc3339())
+            _flush(run_dir)
+            _catalog(run_dir)
+            return int(ExitCode.ERROR)
+
+        manifest["status"] = "running"
+        _validate_or_die(manifest, RUN_MANIFEST_SCHEMA, "run_manifest")
+        _writer(run_dir).write_json(run_dir / RUN_MANIFEST_PATH, manifest)
+
+        wf = json.loads((run_dir / "workflow_frozen.json").read_text(encoding="utf-8"))
+        remaining = [(i, st) for i, st in enumerate(wf.get("steps", []), start=4) if i > gate_idx]
+        backends, _ = _load_backends()
+        cache = GenerationCache(RUNS_ROOT / ".cache", mode=cache_mode)
+        _debug(f"Resuming {run_dir} after gate '{gate_id}' ({len(remaining)} step(s) left)")
+
+        code = _execute_steps(
             run_dir=run_dir,
             manifest=manifest,
+            provenance=provenance,
             report=report,
-            step_idx=2,
-            step_id="init_error",
-            msg=f"Workflow file not found: {wf_path}",
+            ctx=_restore_ctx(run_dir, ckpt),
+            backends=backends,
+            cache=cache,
             started_at=started_at,
+            steps=remaining,
+            jobs=jobs,
         )
+        if code is not None:
+            return code
+        return _complete_run(
+            run_dir, manifest, provenance, report, cache, started_at,
+            prune_cache=OPS.uses_cache(step for _, step in remaining),
+        )
+
 
+# --------------------------------- main --------------------------------------
+def update_index(run_dir: Path, *, started_at: str, status: str, finished_at: str | None = None) -> None:
+    idx = {"run_id": run_dir.name, "started_at": started_at, "status": status}
+    if finished_at:
+        idx["finished_at"] = finished_at
+    _writer(run_dir).write_json(run_dir / "index.json", idx)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_backends() -> Tuple[Dict[str, Any], str | None]:
+    """
+    Model backends by alias, plus the import error if we fell back to the
+    stdlib ones. Built once per process (batch workers reuse them across runs);
+    callers must not mutate the mapping.
+    """
+    backends: Dict[str, Any] = {"echo": _Echo(), "upper": _Upper(), "reverse": _Reverse()}
     try:
-        wf = json.loads(wf_path.read_text(encoding="utf-8"))
+        from awo.models.local_backend import LocalEcho  # type: ignore
+        from awo.models.alt_backend import LocalUpper  # type: ignore
+        backends.update({"echo": LocalEcho(), "upper": LocalUpper()})
     except Exception as e:
-        return _fatal(
-            run_dir=run_dir,
-            manifest=manifest,
-            report=report,
-            step_idx=3,
-            step_id="init_error",
-            msg=f"Failed to parse workflow JSON: {e}",
-            started_at=started_at,
-            extra_payload={"error": "json_parse"},
+        return backends, str(e)
+    return backends, None
+
+
+_StepFailed = common_ops.StepFailed  # shared with core/engine.py
+
+
+class _RunState:
+    """Shared state of one run; op handlers only read it (writes go through _StepEffects)."""
+
+    def __init__(
+        self,
+        *,
+        run_dir: Path,
+        manifest: Dict[str, Any],
+        provenance: ProvenanceStore,
+        report: List[str],
+        ctx: Dict[str, Any],
+        backends: Dict[str, Any],
+        cache: GenerationCache,
+        started_at: str,
+    ) -> None:
+        self.run_dir = run_dir
+        self.manifest = manifest
+        self.provenance = provenance
+        self.report = report
+        self.ctx = ctx
+        self.backends = backends
+        self.cache = cache
+        self.started_at = started_at
+        self.uses_cache = True  # cleared by _execute_steps when no step is a cached op
+
+
+class _StepEffects:
+    """
+    What a step contributes to the run, applied in step order by _commit_step.
+
+    Op handlers write run-directory files through write_*/record_step/clone_file
+    here, never to disk or the run writer: under --jobs a step may run ahead of
+    one that fails, and dropping its _StepEffects must leave no trace of it.
+    """
+
+    def __init__(self, run_dir: Path) -> None:
+        self.run_dir = run_dir
+        self.report: List[str] = []
+        self.provenance: List[Dict[str, Any]] = []
+        self.ctx: Dict[str, Any] = {}
+        self.gate: Dict[str, Any] | None = None
+        self.files: Dict[Path, bytes] = {}  # handed to the run writer at commit
+        self.clones: List[Tuple[Path, Path]] = []  # (source, destination) copied at commit
+        self.on_commit: List[Callable[[], None]] = []  # side effects outside the run dir
+
+    def write_bytes(self, path: Path, data: bytes) -> bytes:
+        self.files.pop(path, None)  # keep write order = order of last write
+        self.files[path] = data
+        return data
+
+    def write_text(self, path: Path, content: str) -> bytes:
+        return self.write_bytes(path, content.encode("utf-8"))
+
+    def write_json(self, path: Path, obj: Any) -> bytes:
+        return self.write_bytes(path, encode_json(obj))
+
+    def record_step(self, idx: int, step_id: str, payload: Dict[str, Any]) -> None:
+        self.write_json(self.run_dir / "steps" / f"{idx:02d}_{step_id}.json", payload)
+
+    def clone_file(self, src: Path, dst: Path) -> None:
+        self.clones.append((src, dst))
+
+    def apply(self) -> None:
+        """Write this step's files (committing it)."""
+        w = _writer(self.run_dir)
+        for path, data in self.files.items():
+            w.write_bytes(path, data)
+        for src, dst in self.clones:
+            scope_engine.clone_file(src, dst)
+
+
+# ---------------------------------- ops --------------------------------------
+# Handlers take (st, fx, step_idx, step_id, step, rec); hooks: see op_registry.
+OPS = op_registry.OpRegistry()
+
+
+def _sweep_resource(step: Dict[str, Any]) -> str | None:
+    sid = step.get("id")
+    return f"artifacts/sweeps/{sid}.jsonl" if sid else None
+
+
+@OPS.register("scope_validate", parallel=False, resource=lambda step: "scope/summary.json")  # own process pool
+def _op_scope_validate(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    args = step.get("args", {})
+    scope_dir = st.run_dir / "scope"
+    summary, summary_sha = scope_engine.validate_claims(
+        args,
+        repo_root=REPO_ROOT,
+        scope_dir=scope_dir,
+        schemas_root=SCHEMAS_ROOT,
+        write_json=fx.write_json,
+        copy_claim=fx.clone_file,
+        index_path=RUNS_ROOT / ".scope_index",
+    )
+    idx_info = summary.get("scope_index")
+
+    # Provenance (Auditor role)
+    summary_p = scope_dir / "summary.json"
+    fx.provenance.append(
+        _prov_record_template(
+            st.manifest["run_id"],
+            role="Auditor",
+            model_name="scope-validator",
+            provider="local",
+            artifacts=[rel(summary_p)],
+            hashes={rel(summary_p): f"sha256:{summary_sha}"},
+            notes="Scope/testability validation"
+            + (
+                f"; scope_index={idx_info['digest'] or 'new'}; cached={idx_info['cached']}/{idx_info['cached'] + idx_info['fresh']}"
+                if idx_info
+                else ""
+            ),
         )
+    )
+
+    rec.update({"args": args, "summary": summary})
+    fx.record_step(step_idx, step_id, rec)
+    fx.report += [
+        f"## {step_idx}. scope_validate — {step_id}",
+        f"- claims_checked: {summary['claims_checked']}",
+        f"- overall_ok: {summary['overall_ok']}",
+        "",
+    ]
 
-    # 4) Freeze workflow used for provenance.
-    write_text(run_dir / "workflow_frozen.json", json.dumps(wf, indent=2))
-
-    # 5) Execute steps.
-    for step_idx, step in enumerate(wf.get("steps", []), start=4):
-        op = step.get("op")
-        step_id = step.get("id", f"step_{step_idx}")
-        _append_manifest_op(run_dir, manifest, step_idx, step_id, op or "unknown")
-
-        rec: Dict[str, Any] = {"ts": ts_rfc3339(), "id": step_id, "op": op}
-
-        # ------------------------- scope_validate ----------------------------
-        if op == "scope_validate":
-            args = step.get("args", {})
-            claims, notes = _load_claims(args)
-            scope_dir = run_dir / "scope"
-            (scope_dir / "claims").mkdir(parents=True, exist_ok=True)
-
-            results: List[Dict[str, Any]] = []
-            overall_ok = True
-            for c in claims:
-                problems = _problems_for_claim(c)
-                ok = len(problems) == 0
-                overall_ok = overall_ok and ok
-                cid = c.get("id") or f"claim-{sha256_hex_str(json.dumps(c, ensure_ascii=False))[:12]}"
-                write_json(scope_dir / "claims" / f"{cid}.json", c)
-                results.append({"id": cid, "ok": ok, "problems": problems})
-
-            summary = {
-                "claims_checked": len(claims),
-                "overall_ok": overall_ok,
-                "details": results,
-                "notes": notes,
-                "ts": ts_rfc3339(),
-            }
-            write_json(scope_dir / "summary.json", summary)
 
-            # Provenance (Auditor role)
-            summary_p = scope_dir / "summary.json"
-            prov = _prov_record_template(
-                manifest["run_id"],
-                role="Auditor",
-                model_name="scope-validator",
-                provider="local",
-                artifacts=[rel(summary_p)],
-                hashes={rel(summary_p): f"sha256:{sha256_hex_bytes(summary_p.read_bytes())}"},
-                notes="Scope/testability validation",
-            )
-            provenance.append(prov)
-            _write_provenance(run_dir, provenance)
+@OPS.register("assert_contains")
+def _op_assert_contains(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    args = step.get("args", {})
+    src = args.get("from_step")
+    field = args.get("field", "consensus_text")
+    musts = [m for m in args.get("must_include", []) if isinstance(m, str)]
+    if not src:
+        raise _StepFailed("assert_contains: 'from_step' is required", {"error": "missing_from_step"})
+
+    source = st.ctx.get(src)
+    hay = ""
+    if isinstance(source, dict) and field in source:
+        hay = str(source[field])
+    elif isinstance(source, list):
+        hay = "\n".join([str(o.get("text", "")) for o in source])
+    elif source is not None:
+        hay = json.dumps(source, ensure_ascii=False)
+
+    missing = [m for m in musts if m.lower() not in hay.lower()]
+    ok = len(missing) == 0
+
+    rec.update(
+        {"from_step": src, "field": field, "must_include": musts, "missing": missing, "ok": ok, "sample": hay[:400]}
+    )
+    fx.record_step(step_idx, step_id, rec)
+
+    # Provenance (Auditor)
+    fx.provenance.append(
+        _prov_record_template(
+            st.manifest["run_id"],
+            role="Auditor",
+            model_name="assert-contains",
+            provider="local",
+            notes=f"must_include={musts}; missing={missing}",
+        )
+    )
 
-            rec.update({"args": args, "summary": summary})
-            record_step(run_dir, step_idx, step_id, rec)
-            report += [
-                f"## {step_idx}. scope_validate — {step_id}",
-                f"- claims_checked: {summary['claims_checked']}",
-                f"- overall_ok: {summary['overall_ok']}",
-                "",
-            ]
-            continue
+    if not ok:
+        raise _StepFailed(f"assert_contains failed; missing: {missing}")
 
-        # ------------------------- assert_contains ---------------------------
-        if op == "assert_contains":
-            args = step.get("args", {})
-            src = args.get("from_step")
-            field = args.get("field", "consensus_text")
-            musts = [m for m in args.get("must_include", []) if isinstance(m, str)]
-            if not src:
-                return _fatal(
-                    run_dir=run_dir,
-                    manifest=manifest,
-                    report=report,
-                    step_idx=step_idx,
-                    step_id=step_id,
-                    msg="assert_contains: 'from_step' is required",
-                    started_at=started_at,
-                    extra_payload={"error": "missing_from_step"},
-                )
-
-            source = ctx.get(src)
-            hay = ""
-            if isinstance(source, dict) and field in source:
-                hay = str(source[field])
-            elif isinstance(source, list):
-                hay = "\n".join([str(o.get("text", "")) for o in source])
-            elif source is not None:
-                hay = json.dumps(source, ensure_ascii=False)
-
-            missing = [m for m in musts if m.lower() not in hay.lower()]
-            ok = len(missing) == 0
-
-            rec.update(
-                {"from_step": src, "field": field, "must_include": musts, "missing": missing, "ok": ok, "sample": hay[:400]}
-            )
-            record_step(run_dir, step_idx, step_id, rec)
+    fx.report += [f"## {step_idx}. assert_contains — {step_id}", f"- ok: {ok}", ""]
 
-            # Provenance (Auditor)
-            prov = _prov_record_template(
-                manifest["run_id"],
-                role="Auditor",
-                model_name="assert-contains",
-                provider="local",
-                notes=f"must_include={musts}; missing={missing}",
-            )
-            provenance.append(prov)
-            _write_provenance(run_dir, provenance)
 
-            if not ok:
-                return _fatal(
-                    run_dir=run_dir,
-                    manifest=manifest,
-                    report=report,
-                    step_idx=step_idx,
-                    step_id=step_id,
-                    msg=f"assert_contains failed; missing: {missing}",
-                    started_at=started_at,
-                )
-
-            report += [f"## {step_idx}. assert_contains — {step_id}", f"- ok: {ok}", ""]
-            continue
+@OPS.register("fanout_generate", cached=True)
+def _op_fanout_generate(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    prompt = step["prompt"]
+    models = step.get("models", ["echo", "upper", "reverse"])
+    params = step.get("params", {"seed": 0})
+    max_concurrency = int(step.get("max_concurrency", len(models)) or 1)
+    timeout_s = step.get("timeout_s")
+    executor = step.get("executor", "thread")
+    backends, cache = st.backends, st.cache
 
-        # ------------------------------ core ops -----------------------------
-        if op == "fanout_generate":
-            prompt = step["prompt"]
-            models = step.get("models", ["echo", "upper", "reverse"])
-            params = step.get("params", {"seed": 0})
-
-            outs: List[Dict[str, Any]] = []
-            for m in models:
-                if m not in BACKENDS:
-                    return _fatal(
-                        run_dir=run_dir,
-                        manifest=manifest,
-                        report=report,
-                        step_idx=step_idx,
-                        step_id=step_id,
-                        msg=f"Unknown model backend: {m}",
-                        started_at=started_at,
-                        extra_payload={"error": "unknown_backend"},
-                    )
-                step_started = ts_rfc3339()
-                out = BACKENDS[m].generate(prompt, params=params)
-                step_ended = ts_rfc3339()
-                outs.append({"model": m, "text": out["text"], "meta": out["meta"]})
-
-                # Provenance per model generation (Proposer)
-                prov = _prov_record_template(
-                    manifest["run_id"],
-                    role="Proposer",
-                    model_name=m,
-                    provider="local",
-                    version="fallback",
-                    prompt_id=f"sha256:{sha256_hex_str(prompt)}",
-                    params=params,
-                    started=step_started,
-                    ended=step_ended,
-                    notes="fanout_generate",
-                )
-                provenance.append(prov)
+    if executor not in ("thread", "async"):
+        raise _StepFailed(
+            f"fanout_generate: unsupported executor '{executor}' (expected 'thread' or 'async')",
+            {"error": "bad_executor"},
+        )
 
-            _write_provenance(run_dir, provenance)
+    unknown = [m for m in models if m not in backends]
+    if unknown:
+        raise _StepFailed(f"Unknown model backend: {unknown[0]}", {"error": "unknown_backend"})
+
+    # Cache lookup first; only misses reach the backends.
+    keys = [generation_key(m, backends[m], prompt, params) for m in models]
+    generated: List[Any] = [None] * len(models)
+    for i, (digest, _) in enumerate(keys):
+        hit = cache.get(digest)
+        if hit is not None:
+            now = ts_rfc3339()
+            generated[i] = (hit, now, now)
+    todo = [i for i, g in enumerate(generated) if g is None]
+    hit_idx = set(range(len(models))) - set(todo)
+    if todo and cache.mode == "only":
+        raise _StepFailed(
+            f"fanout_generate: --cache-only and no cached output for: {[models[i] for i in todo]}",
+            {"error": "cache_miss"},
+        )
 
-            rec.update({"prompt": prompt, "models": models, "params": params, "outputs": outs})
-            ctx[step_id] = outs
-            record_step(run_dir, step_idx, step_id, rec)
+    try:
+        fresh = _fanout_dispatch(
+            backends, [models[i] for i in todo], prompt, params,
+            max_concurrency=max_concurrency, timeout_s=timeout_s, executor=executor,
+        )
+    except FanoutTimeout as e:
+        raise _StepFailed(
+            f"fanout_generate: {e}",
+            {"error": "timeout", "model": e.model, "timeout_s": e.timeout_s},
+        )
 
-            # ----------- report rendering (no backslashes inside f-expr) -----
-            report += [
-                f"## {step_idx}. fanout_generate — {step_id}",
-                f"Prompt (sha256={sha256_hex_str(prompt)}):",
-                "",
-                "```",
-                prompt,
-                "```",
-                "",
-                "Outputs:",
-            ]
-            for o in outs:
-                cleaned_text = o["text"].replace("\n", " ")[:200]
-                report.append(f"- **{o['model']}** → {cleaned_text}")
-            report.append("")
-
-        elif op == "consensus_vote":
-            src = step["inputs_from"]
-            items = ctx.get(src, [])
-            if not items:
-                return _fatal(
-                    run_dir=run_dir,
-                    manifest=manifest,
-                    report=report,
-                    step_idx=step_idx,
-                    step_id=step_id,
-                    msg=f"consensus_vote: no inputs from '{src}'",
-                    started_at=started_at,
-                    extra_payload={"error": "missing_inputs"},
-                )
-
-            buckets: Dict[str, List[str]] = {}
-            for o in items:
-                k = norm_text(o["text"])
-                buckets.setdefault(k, []).append(o["model"])
-
-            ranked = sorted(buckets.items(), key=lambda kv: (len(kv[1]), len(kv[0])), reverse=True)
-            if ranked:
-                consensus_norm, voters = ranked[0]
-                representative = next(o for o in items if norm_text(o["text"]) == consensus_norm)["text"]
-            else:
-                consensus_norm, voters, representative = "", [], ""
-
-            rec.update(
-                {
-                    "inputs_from": src,
-                    "total_candidates": len(items),
-                    "voter_count": len(voters),
-                    "voters": voters,
-                    "consensus_norm": consensus_norm,
-                    "consensus_text": representative,
-                    "agreement_ratio": (len(voters) / max(1, len(items))),
-                }
+    for i, g in zip(todo, fresh):
+        generated[i] = g
+        cache.put(keys[i][0], keys[i][1], g[0])
+
+    outs: List[Dict[str, Any]] = []
+    for i, ((digest, _), m, (out, step_started, step_ended)) in enumerate(zip(keys, models, generated)):
+        outs.append({"model": m, "text": out["text"], "meta": out["meta"]})
+
+        # Provenance per model generation (Proposer)
+        fx.provenance.append(
+            _prov_record_template(
+                st.manifest["run_id"],
+                role="Proposer",
+                model_name=m,
+                provider="local",
+                version="fallback",
+                prompt_id=f"sha256:{sha256_hex_str(prompt)}",
+                params=params,
+                started=step_started,
+                ended=step_ended,
+                notes=f"fanout_generate; cache=hit:{digest[:16]}" if i in hit_idx else "fanout_generate",
             )
-            ctx[step_id] = rec
-            record_step(run_dir, step_idx, step_id, rec)
+        )
 
-            # Provenance (Consensus)
-            prov = _prov_record_template(
-                manifest["run_id"],
-                role="Consensus",
-                model_name="majority-vote",
+    rec.update({"prompt": prompt, "models": models, "params": params, "outputs": outs})
+    if cache.enabled:
+        rec["cache"] = {"mode": cache.mode, "hits": [models[i] for i in sorted(hit_idx)]}
+    fx.ctx[step_id] = outs
+    if step.get("history", True):
+        fx.on_commit.append(lambda: _index_history(st.manifest["run_id"], step_id, outs))
+    fx.record_step(step_idx, step_id, rec)
+
+    # ----------- report rendering (no backslashes inside f-expr) -------------
+    fx.report += [
+        f"## {step_idx}. fanout_generate — {step_id}",
+        f"Prompt (sha256={sha256_hex_str(prompt)}):",
+        "",
+        "```",
+        prompt,
+        "```",
+        "",
+        "Outputs:",
+    ]
+    for o in outs:
+        cleaned_text = o["text"].replace("\n", " ")[:200]
+        fx.report.append(f"- **{o['model']}** → {cleaned_text}")
+    fx.report.append("")
+
+
+@OPS.register("sweep_generate", cached=True, resource=_sweep_resource)
+def _op_sweep_generate(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    templates = step.get("templates") or ([step["prompt"]] if "prompt" in step else [])
+    variables = step.get("vars") or {}
+    models = step.get("models", ["echo", "upper", "reverse"])
+    base_params = step.get("params", {"seed": 0})
+    grid = step.get("grid") or {}
+    max_concurrency = int(step.get("max_concurrency", len(models)) or 1)
+    batch_size = int(step.get("batch_size", sweep_engine.DEFAULT_BATCH_SIZE) or 1)
+    timeout_s = step.get("timeout_s")
+    executor = step.get("executor", "thread")
+    backends, cache = st.backends, st.cache
+
+    if executor not in ("thread", "async"):
+        raise _StepFailed(
+            f"sweep_generate: unsupported executor '{executor}' (expected 'thread' or 'async')",
+            {"error": "bad_executor"},
+        )
+    unknown = [m for m in models if m not in backends]
+    if unknown:
+        raise _StepFailed(f"Unknown model backend: {unknown[0]}", {"error": "unknown_backend"})
+    try:
+        prompts = sweep_engine.render_prompts(templates, variables)
+        params_list = sweep_engine.param_grid(base_params, grid)
+    except sweep_engine.SweepError as e:
+        raise _StepFailed(f"sweep_generate: {e}", {"error": "bad_sweep"})
+    cells = sweep_engine.cells(len(prompts), len(models), len(params_list))
+
+    # Cache lookup per cell, exactly as fanout_generate; only misses are dispatched.
+    keys = [generation_key(models[m], backends[models[m]], prompts[p], params_list[q]) for p, m, q in cells]
+    generated: List[Any] = [None] * len(cells)
+    for i, (digest, _) in enumerate(keys):
+        hit = cache.get(digest)
+        if hit is not None:
+            now = ts_rfc3339()
+            generated[i] = (hit, now, now)
+    todo = [i for i, g in enumerate(generated) if g is None]
+    hit_idx = set(range(len(cells))) - set(todo)
+    if todo and cache.mode == "only":
+        raise _StepFailed(
+            f"sweep_generate: --cache-only and {len(todo)} of {len(cells)} generations not cached",
+            {"error": "cache_miss"},
+        )
+
+    calls = [(models[cells[i][1]], prompts[cells[i][0]], params_list[cells[i][2]]) for i in todo]
+    try:
+        fresh = sweep_engine.dispatch(
+            backends, calls,
+            batch_size=batch_size, max_concurrency=max_concurrency, executor=executor, timeout_s=timeout_s,
+        )
+    except sweep_engine.SweepTimeout as e:
+        raise _StepFailed(
+            f"sweep_generate: {e}",
+            {"error": "timeout", "model": e.model, "timeout_s": e.timeout_s},
+        )
+    except sweep_engine.SweepError as e:
+        raise _StepFailed(f"sweep_generate: {e}", {"error": "bad_sweep"})
+
+    for i, g in zip(todo, fresh):
+        generated[i] = g
+        cache.put(keys[i][0], keys[i][1], g[0])
+
+    # Columnar artifact instead of inlining every output in the step record.
+    out_path = _sweep_artifact(st.run_dir, step_id)
+    data = sweep_engine.encode_rows(
+        prompts, models, params_list, [(c, g[0], i in hit_idx) for i, (c, g) in enumerate(zip(cells, generated))]
+    )
+    file_hash = f"sha256:{sha256_hex_bytes(fx.write_bytes(out_path, data))}"
+
+    # Provenance per generation (Proposer), then the artifact itself (Editor)
+    prompt_ids = [f"sha256:{sha256_hex_str(p)}" for p in prompts]
+    outs: List[Dict[str, Any]] = []
+    for i, ((p, m, q), (digest, _), (out, started, ended)) in enumerate(zip(cells, keys, generated)):
+        outs.append({"model": models[m], "text": out["text"], "meta": out["meta"], "prompt_index": p, "params_index": q})
+        fx.provenance.append(
+            _prov_record_template(
+                st.manifest["run_id"],
+                role="Proposer",
+                model_name=models[m],
                 provider="local",
-                notes=f"voters={voters}, agreement_ratio={rec['agreement_ratio']:.2f}",
+                version="fallback",
+                prompt_id=prompt_ids[p],
+                params=params_list[q],
+                started=started,
+                ended=ended,
+                notes=f"sweep_generate; cell={i}" + (f"; cache=hit:{digest[:16]}" if i in hit_idx else ""),
             )
-            provenance.append(prov)
-            _write_provenance(run_dir, provenance)
+        )
+    fx.provenance.append(
+        _prov_record_template(
+            st.manifest["run_id"],
+            role="Editor",
+            model_name="sweep-writer",
+            provider="local",
+            artifacts=[rel(out_path)],
+            hashes={rel(out_path): file_hash},
+            notes=f"sweep_generate artifact; rows={len(cells)}",
+        )
+    )
+
+    rec.update(
+        {
+            "templates": templates,
+            "vars": variables,
+            "models": models,
+            "params": base_params,
+            "grid": grid,
+            "generations": len(cells),
+            "artifact": rel(out_path),
+            "sha256": file_hash,
+        }
+    )
+    if cache.enabled:
+        rec["cache"] = {"mode": cache.mode, "hits": len(hit_idx)}
+    fx.ctx[step_id] = outs
+    fx.record_step(step_idx, step_id, rec)
+
+    fx.report += [
+        f"## {step_idx}. sweep_generate — {step_id}",
+        f"- grid: {len(prompts)} prompt(s) × {len(models)} model(s) × {len(params_list)} param set(s) = {len(cells)} generations",
+        f"- artifact: {rel(out_path)} ({file_hash})",
+    ]
+    if cache.enabled:
+        fx.report.append(f"- cache hits: {len(hit_idx)}/{len(cells)}")
+    fx.report.append("")
+
+
+@OPS.register("consensus_vote")
+def _op_consensus_vote(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    src = step["inputs_from"]
+    items = st.ctx.get(src, [])
+    if not items:
+        raise _StepFailed(f"consensus_vote: no inputs from '{src}'", {"error": "missing_inputs"})
+
+    scorer = step.get("scorer", "exact")
+    if scorer not in consensus_engine.SCORERS:
+        raise _StepFailed(
+            f"consensus_vote: unknown scorer '{scorer}' (expected one of {sorted(consensus_engine.SCORERS)})",
+            {"error": "bad_scorer"},
+        )
+    rec.update({"inputs_from": src, **consensus_engine.vote(items, scorer=scorer, threshold=step.get("threshold"))})
+    voters, representative = rec["voters"], rec["consensus_text"]
+    fx.ctx[step_id] = rec
+    fx.record_step(step_idx, step_id, rec)
+
+    # Provenance (Consensus)
+    fx.provenance.append(
+        _prov_record_template(
+            st.manifest["run_id"],
+            role="Consensus",
+            model_name="majority-vote",
+            provider="local",
+            notes=f"voters={voters}, agreement_ratio={rec['agreement_ratio']:.2f}"
+            + (f", scorer={scorer}@{rec['threshold']:g}" if scorer != "exact" else ""),
+        )
+    )
 
-            report += [
-                f"## {step_idx}. consensus_vote — {step_id}",
-                f"- inputs_from: {src}",
-                f"- voters: {', '.join(voters) if voters else '(none)'}",
-                f"- agreement_ratio: {rec['agreement_ratio']:.2f}",
-                "",
-                "```",
-                representative[:300],
-                "```",
-                "",
-            ]
-
-        elif op == "write_text":
-            args = step.get("args", {})
-            path = args["path"]
-            text: Union[str, None] = args.get("text")
-            from_step = args.get("from_step")
-            field = args.get("field", "consensus_text")
-
-            if text is None and from_step:
-                source = ctx.get(from_step)
-                if source is None:
-                    return _fatal(
-                        run_dir=run_dir,
-                        manifest=manifest,
-                        report=report,
-                        step_idx=step_idx,
-                        step_id=step_id,
-                        msg=f"write_text: source step '{from_step}' not found",
-                        started_at=started_at,
-                        extra_payload={"error": "missing_source", "args": args},
-                    )
-                if isinstance(source, list):
-                    text = "\n\n".join([str(o.get("text", "")) for o in source])
-                elif isinstance(source, dict) and field in source:
-                    text = str(source[field])
-                else:
-                    text = json.dumps(source, indent=2, ensure_ascii=False)
-
-            if text is None:
-                text = ""
-
-            out_path = run_dir / "artifacts" / path
-            write_text(out_path, text)
-            file_hash = f"sha256:{sha256_hex_bytes(out_path.read_bytes())}"
-
-            rec.update({"wrote": str(out_path), "from_step": from_step, "field": field if from_step else None})
-            record_step(run_dir, step_idx, step_id, rec)
-            report += [f"## {step_idx}. write_text — {step_id}", f"- wrote: {out_path}", ""]
-
-            # Provenance (Editor)
-            prov = _prov_record_template(
-                manifest["run_id"],
+    fx.report += [
+        f"## {step_idx}. consensus_vote — {step_id}",
+        f"- inputs_from: {src}",
+        f"- voters: {', '.join(voters) if voters else '(none)'}",
+        f"- agreement_ratio: {rec['agreement_ratio']:.2f}",
+        "",
+        "```",
+        representative[:300],
+        "```",
+        "",
+    ]
+
+
+def _index_history(run_id: str, step_id: str, outs: List[Dict[str, Any]]) -> None:
+    """Add fanout outputs to the cross-run near-duplicate index (best effort)."""
+    try:
+        with history_index.HistoryIndex(RUNS_ROOT / history_index.INDEX_NAME) as idx:
+            idx.add(run_id, step_id, outs)
+    except Exception as e:
+        _debug(f"history index update skipped: {e}")
+
+
+@OPS.register("dedupe_against_history")
+def _op_dedupe_against_history(st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, step: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    args = step.get("args", {})
+    src = args.get("from_step")
+    threshold = float(args.get("threshold", 0.8))
+    k = int(args.get("k", 5))
+    if not src:
+        raise _StepFailed("dedupe_against_history: 'from_step' is required", {"error": "missing_from_step"})
+    outs = st.ctx.get(src)
+    if not isinstance(outs, list):
+        raise _StepFailed(f"dedupe_against_history: no fanout outputs from '{src}'", {"error": "missing_inputs"})
+
+    with history_index.HistoryIndex(RUNS_ROOT / history_index.INDEX_NAME) as idx:
+        results = [
+            {
+                "model": o["model"],
+                "matches": idx.query(o["text"], k=k, threshold=threshold, exclude_run=st.manifest["run_id"]),
+            }
+            for o in outs
+        ]
+    for r in results:
+        r["duplicate"] = bool(r["matches"])
+    dups = [r["model"] for r in results if r["duplicate"]]
+
+    rec.update({"from_step": src, "threshold": threshold, "k": k, "results": results, "duplicates": dups})
+    fx.record_step(step_idx, step_id, rec)
+
+    # Provenance (Auditor)
+    fx.provenance.append(
+        _prov_record_template(
+            st.manifest["run_id"],
+            role="Auditor",
+            model_name="history-dedupe",
+            provider="local",
+            notes=f"from_step={src}; threshold={threshold:g}; duplicates={dups}",
+        )
+    )
+
+    if dups and args.get("fail_on_duplicate", False):
+        raise _StepFailed(f"dedupe_against_history: near-duplicates of earlier runs: {dups}")
+
+    fx.report += [f"## {step_idx}. dedupe_against_history — {step_id}", f"- from_step: {src}"]
+    for r in results:
+        best = r["matches"][0] if r["matches"] else None
+        fx.report.append(
+            f"- **{r['model']}** → "
+            + (f"{best['similarity']:.2f} vs {best['run_id']}/{best['step_id']} ({best['model']})" if best else "no prior match")
+        )
+    fx.report.append("")
+
+
+class _StepIO:
+    """The step as common_ops sees it (write_text, audit_gate): files and records go through _StepEffects."""
+
+    def __init__(self, st: _RunState, fx: _StepEffects, step_idx: int, step_id: str, op: str) -> None:
+        self.st = st
+        self.fx = fx
+        self.step_idx = step_idx
+        self.step_id = step_id
+        self.op = op
+
+    def source(self, step_id: str) -> Any:
+        return self.st.ctx.get(step_id)
+
+    def write_artifact(self, rel_path: str, text: str) -> Path:
+        out_path = self.st.run_dir / "artifacts" / rel_path
+        file_hash = f"sha256:{sha256_hex_bytes(self.fx.write_text(out_path, text))}"
+        self.fx.report += [f"## {self.step_idx}. {self.op} — {self.step_id}", f"- wrote: {out_path}", ""]
+
+        # Provenance (Editor)
+        self.fx.provenance.append(
+            _prov_record_template(
+                self.st.manifest["run_id"],
                 role="Editor",
                 model_name="write-text",
                 provider="local",
@@ -717,112 +1207,437 @@ def run(workflow_path: str) -> int:
                 hashes={rel(out_path): file_hash},
                 notes="emit artifact",
             )
-            provenance.append(prov)
-            _write_provenance(run_dir, provenance)
+        )
+        return out_path
 
-        elif op == "audit_gate":
-            checklist = step.get("args", {}).get("checklist", "templates/audit-checklist.md")
-            rec.update({"gate": {"status": "pending", "checklist": checklist, "ts": ts_rfc3339()}})
-            record_step(run_dir, step_idx, step_id, rec)
+    def record(self, rec: Dict[str, Any]) -> None:
+        self.fx.record_step(self.step_idx, self.step_id, rec)
 
-            write_text(
-                run_dir / "gate_decision.yml",
-                f"status: pending\nchecklist: {checklist}\ncreated_at: {ts_rfc3339()}\n",
-            )
+    def pause(self, gate: Dict[str, Any]) -> None:
+        checklist = gate["checklist"]
+        self.fx.write_text(
+            self.st.run_dir / "gate_decision.yml",
+            f"status: pending\nchecklist: {checklist}\ncreated_at: {ts_rfc3339()}\n",
+        )
 
-            # Provenance (Auditor placeholder)
-            prov = _prov_record_template(
-                manifest["run_id"],
+        # Provenance (Auditor placeholder)
+        self.fx.provenance.append(
+            _prov_record_template(
+                self.st.manifest["run_id"],
                 role="Auditor",
                 model_name="human-gate",
                 provider="local",
                 notes=f"checklist={checklist}",
             )
-            provenance.append(prov)
-            _write_provenance(run_dir, provenance)
+        )
+        self.fx.gate = {"checklist": checklist}
+
+
+common_ops.register(
+    OPS,
+    lambda st, fx, step_idx, step_id, step, rec: (_StepIO(st, fx, step_idx, step_id, step["op"]), step, rec),
+)
 
-            # Mark manifest as pending_review BUT DO NOT finalize (no finished_at here)
-            manifest["status"] = "pending_review"
-            _validate_or_die(manifest, RUN_MANIFEST_SCHEMA, "run_manifest")
-            write_json(run_dir / RUN_MANIFEST_PATH, manifest)
-            update_index(run_dir, started_at=started_at, status="pending_review")
-            finalize_report(
-                run_dir,
-                report
-                + [
-                    f"## {step_idx}. audit_gate — {step_id}",
-                    f"- checklist: {checklist}",
-                    "",
-                    "> Run halted for human review.",
-                    "",
-                ],
+
+# ------------------------------ step execution -------------------------------
+def _run_step(st: _RunState, step_idx: int, step: Dict[str, Any]) -> Tuple[_StepEffects, _StepFailed | None]:
+    op = step.get("op")
+    step_id = step_scheduler.step_id(step_idx, step)
+    rec: Dict[str, Any] = {"ts": ts_rfc3339(), "id": step_id, "op": op}
+    fx = _StepEffects(st.run_dir)
+    try:
+        OPS.dispatch(op, st, fx, step_idx, step_id, step, rec)
+    except op_registry.UnknownOp as e:
+        return fx, _StepFailed(str(e), {"error": "unknown_op"})
+    except _StepFailed as failure:
+        return fx, failure
+    return fx, None
+
+
+def _commit_step(
+    st: _RunState,
+    step_idx: int,
+    step: Dict[str, Any],
+    fx: _StepEffects,
+    failure: _StepFailed | None,
+) -> int | None:
+    """Apply a finished step to manifest/provenance/report/ctx; returns an exit code if the run stops."""
+    step_id = step_scheduler.step_id(step_idx, step)
+    fx.apply()
+    _append_manifest_op(st.run_dir, st.manifest, step_idx, step_id, step.get("op") or "unknown")
+    st.provenance.extend(fx.provenance)
+    st.report += fx.report
+    st.ctx.update(fx.ctx)
+    for fn in fx.on_commit:
+        fn()
+
+    if failure is not None:
+        return _fatal(
+            run_dir=st.run_dir,
+            manifest=st.manifest,
+            report=st.report,
+            step_idx=step_idx,
+            step_id=step_id,
+            msg=failure.msg,
+            started_at=st.started_at,
+            extra_payload=failure.extra_payload,
+        )
+
+    if fx.gate is not None:
+        _write_provenance(st.run_dir, st.provenance)
+        if st.uses_cache:
+            st.cache.prune()
+        _writer(st.run_dir).flush()  # the checkpoint hashes step records on disk
+        _write_gate_checkpoint(st.run_dir, step_idx, step_id, st.started_at)
+
+        # Mark manifest as pending_review BUT DO NOT finalize (no finished_at here)
+        st.manifest["status"] = "pending_review"
+        _validate_or_die(st.manifest, RUN_MANIFEST_SCHEMA, "run_manifest")
+        _writer(st.run_dir).write_json(st.run_dir / RUN_MANIFEST_PATH, st.manifest)
+        update_index(st.run_dir, started_at=st.started_at, status="pending_review")
+        finalize_report(
+            st.run_dir,
+            st.report
+            + [
+                f"## {step_idx}. audit_gate — {step_id}",
+                f"- checklist: {fx.gate['checklist']}",
+                "",
+                "> Run halted for human review.",
+                "",
+            ],
+        )
+        _flush(st.run_dir)
+        _catalog(st.run_dir)
+        breadcrumb(st.run_dir)
+        _debug(f"Run created at: {st.run_dir}")
+        return int(ExitCode.PENDING)
+
+    _writer(st.run_dir).flush()  # step boundary
+    return None
+
+
+def _execute_steps(
+    *,
+    run_dir: Path,
+    manifest: Dict[str, Any],
+    provenance: ProvenanceStore,
+    report: List[str],
+    ctx: Dict[str, Any],
+    backends: Dict[str, Any],
+    cache: GenerationCache,
+    started_at: str,
+    steps: List[Tuple[int, Dict[str, Any]]],
+    jobs: int = 1,
+) -> int | None:
+    """
+    Execute (step_idx, step) pairs.
+
+    jobs=1 runs them one at a time in list order. With jobs>1, steps are
+    grouped into dependency levels (step_scheduler) and each level runs on a
+    thread pool. Either way, finished steps are committed strictly in step
+    order, so manifest ops, provenance, files and the report come out as in a
+    sequential run. A finished step's ctx is visible to later levels as soon
+    as its own level ends. Steps that ran ahead of a failure are dropped with
+    everything they would have written (see _StepEffects).
+
+    Returns an exit code when the run stops early (fatal error or audit gate),
+    or None when every step completed and the caller should finalize.
+    """
+    st = _RunState(
+        run_dir=run_dir,
+        manifest=manifest,
+        provenance=provenance,
+        report=report,
+        ctx=ctx,
+        backends=backends,
+        cache=cache,
+        started_at=started_at,
+    )
+    st.uses_cache = OPS.uses_cache(step for _, step in steps)
+    batches = step_scheduler.levels(steps, ops=OPS) if jobs > 1 else [[s] for s in steps]
+    order = [idx for idx, _ in steps]
+    done: Dict[int, Tuple[Dict[str, Any], _StepEffects, _StepFailed | None]] = {}
+    pos = 0
+
+    for batch in batches:
+        # ops registered with parallel=False run on this thread after the pooled ones
+        pooled = [s for s in batch if OPS.is_parallel(s[1])] if len(batch) > 1 else []
+        if len(pooled) > 1:
+            with ThreadPoolExecutor(max_workers=min(jobs, len(pooled)), thread_name_prefix="awo-step") as pool:
+                for (idx, step), (fx, failure) in zip(pooled, pool.map(lambda s: _run_step(st, *s), pooled)):
+                    done[idx] = (step, fx, failure)
+        for idx, step in batch:
+            if idx not in done:
+                done[idx] = (step, *_run_step(st, idx, step))
+        # Later levels may read these steps before they are committed (an
+        # earlier step can still be running); ctx is in-memory only, so a
+        # step dropped after a failure leaves nothing behind.
+        for idx, _ in batch:
+            st.ctx.update(done[idx][1].ctx)
+
+        while pos < len(order) and order[pos] in done:
+            step, fx, failure = done.pop(order[pos])
+            code = _commit_step(st, order[pos], step, fx, failure)
+            pos += 1
+            if code is not None:
+                return code  # steps still in `done` are dropped uncommitted
+
+    return None
+
+
+def run(
+    workflow_path: str,
+    *,
+    cache_mode: str = "use",
+    jobs: int = 1,
+    run_dir: Path | None = None,
+    prune_cache: bool = True,
+) -> int:
+    """
+    Execute one workflow. run_dir is a directory already claimed with
+    ensure_run_dir() (the batch runner does this to know its run ids up
+    front); prune_cache=False leaves cache eviction to the caller.
+    """
+    # 1) Create run dir + breadcrumb FIRST so CI can always find it.
+    run_dir = run_dir or ensure_run_dir()
+    breadcrumb(run_dir)
+    OPS.reset_timings()  # per-run op timing, printed with the writer stats
+    started_at = ts_rfc3339()
+    cache = GenerationCache(RUNS_ROOT / ".cache", mode=cache_mode)
+
+    # Initialize manifest + provenance
+    manifest = _init_run_manifest(run_dir, workflow_path, started_at)
+    with _init_provenance(run_dir) as provenance:  # log handle closed on every exit path
+        _debug(f"Repo root: {REPO_ROOT}")
+        _debug(f"Runs root: {RUNS_ROOT}")
+        _debug(f"Run dir : {run_dir}")
+        _debug(f"Breadcrumb: {(RUNS_ROOT / 'LAST_RUN')}")
+
+        report = init_report(run_dir, workflow_path)
+        ctx: Dict[str, Any] = {}
+
+        # 2) Optional local overrides; keep fallbacks if imports fail.
+        backends, fallback_detail = _load_backends()
+        if fallback_detail is not None:
+            step_idx = 1
+            step_id = "backend_info"
+            _append_manifest_op(run_dir, manifest, step_idx, step_id, "backend_info")
+            record_step(run_dir, step_idx, step_id, {"note": "using_fallback_backends", "detail": fallback_detail, "ts": ts_rfc3339()})
+
+        # 3) Load workflow (safe).
+        wf_path = (REPO_ROOT / workflow_path).resolve()
+        if not wf_path.exists():
+            return _fatal(
+                run_dir=run_dir,
+                manifest=manifest,
+                report=report,
+                step_idx=2,
+                step_id="init_error",
+                msg=f"Workflow file not found: {wf_path}",
+                started_at=started_at,
             )
-            breadcrumb(run_dir)
-            _debug(f"Run created at: {run_dir}")
-            return int(ExitCode.PENDING)
 
-        else:
+        try:
+            wf = json.loads(wf_path.read_text(encoding="utf-8"))
+        except Exception as e:
             return _fatal(
                 run_dir=run_dir,
                 manifest=manifest,
                 report=report,
-                step_idx=step_idx,
-                step_id=step_id,
-                msg=f"Unknown op: {op}",
+                step_idx=3,
+                step_id="init_error",
+                msg=f"Failed to parse workflow JSON: {e}",
                 started_at=started_at,
-                extra_payload={"error": "unknown_op"},
+                extra_payload={"error": "json_parse"},
             )
 
-    # Finished without hitting the gate → success
+        # 4) Freeze workflow used for provenance.
+        _writer(run_dir).write_text(run_dir / "workflow_frozen.json", json.dumps(wf, indent=2))
+
+        # 5) Execute steps.
+        steps = list(enumerate(wf.get("steps", []), start=4))
+        code = _execute_steps(
+            run_dir=run_dir,
+            manifest=manifest,
+            provenance=provenance,
+            report=report,
+            ctx=ctx,
+            backends=backends,
+            cache=cache,
+            started_at=started_at,
+            steps=steps,
+            jobs=jobs,
+        )
+        if code is not None:
+            return code
+
+        # Finished without hitting the gate → success
+        return _complete_run(
+            run_dir, manifest, provenance, report, cache, started_at,
+            prune_cache=prune_cache and OPS.uses_cache(step for _, step in steps),
+        )
+
+
+def _complete_run(
+    run_dir: Path,
+    manifest: Dict[str, Any],
+    provenance: ProvenanceStore,
+    report: List[str],
+    cache: GenerationCache,
+    started_at: str,
+    *,
+    prune_cache: bool = True,
+) -> int:
+    _write_provenance(run_dir, provenance)
+    if prune_cache:
+        cache.prune()
     finalize_report(run_dir, report)
     _finalize_manifest(run_dir, manifest, "succeeded")
     update_index(run_dir, started_at=started_at, status="succeeded", finished_at=ts_rfc3339())
+    _flush(run_dir)
+    _catalog(run_dir)
     breadcrumb(run_dir)
     _debug(f"Run created at: {run_dir}")
     return int(ExitCode.OK)
 
 
 # --------------------------------- CLI ---------------------------------------
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python scripts/awo_run.py <workflow.json>", file=sys.stderr)
-        sys.exit(2)
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    if argv[:1] == ["resume"]:
+        ap = argparse.ArgumentParser(
+            prog="python scripts/awo_run.py resume",
+            description="Continue a run paused at an audit_gate once gate_decision.yml is approved",
+        )
+        ap.add_argument("--run-id", required=True)
+        argv = argv[1:]
+        ap.set_defaults(cmd="resume")
+    else:
+        ap = argparse.ArgumentParser(prog="python scripts/awo_run.py", description="AWO multi-model runner")
+        ap.add_argument("workflow", help="Path to a workflow JSON, relative to the repo root")
+        ap.add_argument("--plan", action="store_true",
+                        help="Print the step dependency levels and critical path, then exit (no run dir)")
+        ap.set_defaults(cmd="run")
+    cache = ap.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", dest="cache_mode", action="store_const", const="off",
+                       help="Always call backends; do not read or write runs/.cache/")
+    cache.add_argument("--cache-only", dest="cache_mode", action="store_const", const="only",
+                       help="Replay from runs/.cache/ only; a cache miss fails the step")
+    ap.set_defaults(cache_mode="use")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Run up to N independent steps of a dependency level at once (default: 1, list order)")
+    return ap.parse_args(argv)
+
+
+def plan(workflow_path: str) -> int:
+    """Dry run: show how the steps would be scheduled."""
+    wf_path = (REPO_ROOT / workflow_path).resolve()
     try:
-        sys.exit(run(sys.argv[1]))
+        wf = json.loads(wf_path.read_text(encoding="utf-8"))
     except Exception as e:
-        # Leave a breadcrumb + minimal artifacts so CI can still find and package the run
-        rd = ensure_run_dir()
+        print(f"[AWO] plan: cannot load {wf_path}: {e}", file=sys.stderr)
+        return int(ExitCode.ERROR)
+    print("\n".join(step_scheduler.format_plan(list(enumerate(wf.get("steps", []), start=4)), ops=OPS)))
+    return int(ExitCode.OK)
+
+
+def record_unhandled(e: BaseException, run_dir: Path | None = None) -> Path:
+    """
+    Leave minimal error artifacts after an unhandled exception so CI can
+    still find and package the run; returns the directory used (a new one
+    unless run_dir is given).
+    """
+    # Keep whatever the run had buffered before it died
+    for w in list(_WRITERS.values()):
         try:
-            breadcrumb(rd)
+            w.flush()
         except Exception:
             pass
 
-        write_json(
-            rd / "steps" / "00_unhandled_error.json",
-            {"error": "unhandled", "message": str(e), "ts": ts_rfc3339()},
-        )
-        write_text(
-            rd / "report.md",
-            f"# AWO Run Report — {rd.name}\n\n## Error\n\n{e}\n",
-        )
-
-        # Minimal manifest so downstream steps don’t break
+    # Leave a breadcrumb + minimal artifacts so CI can still find and package the run
+    rd = run_dir or ensure_run_dir()
+    try:
+        breadcrumb(rd)
+    except Exception:
+        pass
+
+    write_json(
+        rd / "steps" / "00_unhandled_error.json",
+        {"error": "unhandled", "message": str(e), "ts": ts_rfc3339()},
+    )
+    write_text(
+        rd / "report.md",
+        f"# AWO Run Report — {rd.name}\n\n## Error\n\n{e}\n",
+    )
+
+    # Salvage any provenance the run logged before it died
+    if (rd / "provenance.jsonl").is_file():
         try:
-            _ensure_schemas_loaded()
-            m = {
-                "run_id": rd.name,
-                "workflow": "(unknown)",
-                "started_at": ts_rfc3339(),
-                "finished_at": ts_rfc3339(),
-                "status": "error",
-                "ops": [],
-                "notes": [],
-            }
-            _validate_or_die(m, RUN_MANIFEST_SCHEMA, "run_manifest")
-            write_json(rd / RUN_MANIFEST_PATH, m)
+            _recover_provenance(rd)
         except Exception:
             pass
 
-        update_index(rd, started_at=ts_rfc3339(), status="error", finished_at=ts_rfc3339())
+    # Minimal manifest so downstream steps don’t break
+    try:
+        _ensure_schemas_loaded()
+        m = {
+            "run_id": rd.name,
+            "workflow": "(unknown)",
+            "started_at": ts_rfc3339(),
+            "finished_at": ts_rfc3339(),
+            "status": "error",
+            "ops": [],
+            "notes": [],
+        }
+        _validate_or_die(m, RUN_MANIFEST_SCHEMA, "run_manifest")
+        write_json(rd / RUN_MANIFEST_PATH, m)
+    except Exception:
+        pass
+
+    update_index(rd, started_at=ts_rfc3339(), status="error", finished_at=ts_rfc3339())
+    return rd
+
+
+def run_guarded(
+    workflow_path: str,
+    *,
+    cache_mode: str = "use",
+    jobs: int = 1,
+    run_dir: Path | None = None,
+    prune_cache: bool = True,
+) -> Tuple[Path, int, str | None]:
+    """
+    run() for long-lived processes (batch workers, the daemon): an unhandled
+    exception is recorded in the run directory instead of propagating, and
+    the run's writer is released. Returns (run_dir, exit code, error).
+    """
+    run_dir = run_dir or ensure_run_dir()
+    try:
+        code, error = run(workflow_path, cache_mode=cache_mode, jobs=jobs, run_dir=run_dir, prune_cache=prune_cache), None
+    except Exception as e:
+        record_unhandled(e, run_dir)
+        code, error = 1, str(e)
+    finally:
+        release_writer(run_dir)
+    return run_dir, code, error
+
+
+def run_status(run_dir: Path) -> str | None:
+    """The status in a run's manifest (succeeded, pending_review, error, running), if readable."""
+    try:
+        return json.loads((run_dir / RUN_MANIFEST_PATH).read_text(encoding="utf-8")).get("status")
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == "__main__":
+    args = _parse_args(sys.argv[1:])
+    try:
+        if args.cmd == "resume":
+            sys.exit(resume(args.run_id, cache_mode=args.cache_mode, jobs=args.jobs))
+        if args.plan:
+            sys.exit(plan(args.workflow))
+        sys.exit(run(args.workflow, cache_mode=args.cache_mode, jobs=args.jobs))
+    except Exception as e:
+        record_unhandled(e)
         print(f"[AWO] ERROR: {e}", file=sys.stderr)
         sys.exit(1)
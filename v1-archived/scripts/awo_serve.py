@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+AWO runner daemon: a long-lived process that executes queued workflows.
+
+The queue is a SQLite table in runs/.queue.sqlite (WAL), so submitting,
+polling and cancelling are plain database writes from any process in the
+same repo. The daemon claims queued jobs in submission order and runs them
+in a process pool whose workers import the runner, compile the schemas and
+build the model backends once, then execute runs back to back.
+
+Every job is an ordinary `awo_run.run()` of the workflow, exactly as
+`python scripts/awo_run.py <workflow>` would do it: its own runs/<run_id>/
+(manifest, provenance, report, cache use and pruning), attestable on its
+own. The daemon claims the run directory when the job starts, so `poll`
+shows the run id while the job is still running.
+
+Usage (from repo root):
+
+    python scripts/awo_serve.py serve [--workers N] [--poll 0.2] [--drain]
+    python scripts/awo_serve.py submit workflows/x.json [--jobs N] [--no-cache|--cache-only] [--wait]
+    python scripts/awo_serve.py poll <job_id> [--wait]
+    python scripts/awo_serve.py cancel <job_id>
+    python scripts/awo_serve.py list [--status queued] [--limit 50]
+
+Job status: queued -> running -> succeeded | pending_review | error, or
+cancelled (queued jobs only; a running job finishes its run). SIGINT/SIGTERM
+stop the daemon after in-flight jobs finish. A claimed job records its
+daemon as `owner` (host:pid); when a daemon starts it marks `error` only the
+running jobs whose owner on this host is gone, so several daemons can share
+one queue. A worker process that dies breaks the pool: its in-flight jobs
+are marked `error` and the daemon starts a new pool. `submit --wait` and
+`poll --wait` exit with the run's exit code (0, 2 or 78).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import awo_run
+from awo_run import REPO_ROOT, RUNS_ROOT, ExitCode, ts_rfc3339
+
+QUEUE_NAME = ".queue.sqlite"
+TERMINAL = ("succeeded", "pending_review", "error", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    workflow TEXT NOT NULL,
+    cache_mode TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    run_id TEXT,
+    exit_code INTEGER,
+    error TEXT,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, job_id);
+"""
+
+
+def owner_id() -> str:
+    """This daemon as a job owner: host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """False only for an owner known to be gone: a dead pid on this host, or this process's own pid (a restart)."""
+    if not owner:
+        return False  # claimed before owners were recorded
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True  # another machine's daemon; cannot tell from here
+    try:
+        pid_n = int(pid)
+    except ValueError:
+        return False
+    if pid_n == os.getpid():
+        return False
+    try:
+        os.kill(pid_n, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+def connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    path = path or RUNS_ROOT / QUEUE_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(_SCHEMA)
+    if "owner" not in {r["name"] for r in db.execute("PRAGMA table_info(jobs)")}:
+        db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")  # queues created before owners were recorded
+    return db
+
+
+# ---------------------------------- queue ------------------------------------
+def submit(db: sqlite3.Connection, workflow: str, *, cache_mode: str = "use", jobs: int = 1) -> int:
+    if not (REPO_ROOT / workflow).is_file():
+        raise FileNotFoundError(f"Workflow file not found: {REPO_ROOT / workflow}")
+    cur = db.execute(
+        "INSERT INTO jobs (workflow, cache_mode, jobs, status, submitted_at) VALUES (?,?,?,'queued',?)",
+        (workflow, cache_mode, jobs, ts_rfc3339()),
+    )
+    return int(cur.lastrowid)
+
+
+def get(db: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    row = db.execute("SELECT * FROM jobs WHERE job_id=?", (job_id,)).fetchone()
+    return dict(row) if row is not None else None
+
+
+def list_jobs(db: sqlite3.Connection, *, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    if status:
+        rows = db.execute("SELECT * FROM jobs WHERE status=? ORDER BY job_id DESC LIMIT ?", (status, limit))
+    else:
+        rows = db.execute("SELECT * FROM jobs ORDER BY job_id DESC LIMIT ?", (limit,))
+    return [dict(r) for r in rows]
+
+
+def cancel(db: sqlite3.Connection, job_id: int) -> bool:
+    """Cancel a queued job; False if it does not exist or has already started."""
+    cur = db.execute(
+        "UPDATE jobs SET status='cancelled', finished_at=? WHERE job_id=? AND status='queued'",
+        (ts_rfc3339(), job_id),
+    )
+    return cur.rowcount == 1
+
+
+def _claim(db: sqlite3.Connection, owner: str) -> Optional[Dict[str, Any]]:
+    """Atomically move the oldest queued job to running, owned by `owner`."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        row = db.execute("SELECT * FROM jobs WHERE status='queued' ORDER BY job_id LIMIT 1").fetchone()
+        if row is not None:
+            db.execute(
+                "UPDATE jobs SET status='running', started_at=?, owner=? WHERE job_id=?",
+                (ts_rfc3339(), owner, row["job_id"]),
+            )
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return dict(row) if row is not None else None
+
+
+def _finish(db: sqlite3.Connection, job_id: int, status: str, exit_code: int, error: Optional[str]) -> None:
+    db.execute(
+        "UPDATE jobs SET status=?, exit_code=?, error=?, finished_at=? WHERE job_id=?",
+        (status, exit_code, error, ts_rfc3339(), job_id),
+    )
+
+
+def _recover(db: sqlite3.Connection) -> int:
+    """Mark running jobs whose owning daemon is gone as error; jobs of live daemons are left alone."""
+    lost = 0
+    for row in db.execute("SELECT job_id, owner FROM jobs WHERE status='running'").fetchall():
+        if _owner_alive(row["owner"]):
+            continue
+        cur = db.execute(
+            "UPDATE jobs SET status='error', error='interrupted: daemon stopped during the run', finished_at=? "
+            "WHERE job_id=? AND status='running'",
+            (ts_rfc3339(), row["job_id"]),
+        )
+        lost += cur.rowcount
+    return lost
+
+
+# --------------------------------- workers -----------------------------------
+def _init_worker() -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the daemon drains on Ctrl-C; workers finish their run
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    awo_run.warm_up()
+
+
+def _execute(workflow: str, cache_mode: str, jobs: int, run_dir: str) -> Tuple[int, str, Optional[str]]:
+    rd, code, error = awo_run.run_guarded(workflow, cache_mode=cache_mode, jobs=jobs, run_dir=Path(run_dir))
+    return code, awo_run.run_status(rd) or "error", error
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def serve(*, workers: Optional[int] = None, poll_s: float = 0.2, drain: bool = False) -> int:
+    workers = max(1, workers or os.cpu_count() or 1)
+    owner = owner_id()
+    db = connect()
+    lost = _recover(db)
+    if lost:
+        print(f"[AWO] serve: marked {lost} interrupted job(s) as error", file=sys.stderr)
+
+    stop = False
+
+    def _stop(signum: int, frame: Any) -> None:
+        nonlocal stop
+        stop = True
+
+    pool = _new_pool(workers)
+    prev = {s: signal.signal(s, _stop) for s in (signal.SIGINT, signal.SIGTERM)}
+    inflight: Dict[Future, Tuple[Dict[str, Any], ProcessPoolExecutor]] = {}
+    print(f"[AWO] serve: {workers} worker(s), queue {RUNS_ROOT / QUEUE_NAME}", file=sys.stderr)
+    try:
+        while True:
+            while not stop and len(inflight) < workers:
+                job = _claim(db, owner)
+                if job is None:
+                    break
+                run_dir = awo_run.ensure_run_dir()
+                db.execute("UPDATE jobs SET run_id=? WHERE job_id=?", (run_dir.name, job["job_id"]))
+                print(f"[AWO] serve: job {job['job_id']} -> {run_dir.name} ({job['workflow']})", file=sys.stderr)
+                args = (job["workflow"], job["cache_mode"], job["jobs"], str(run_dir))
+                try:
+                    fut = pool.submit(_execute, *args)
+                except BrokenProcessPool:
+                    pool.shutdown(wait=False)
+                    pool = _new_pool(workers)
+                    fut = pool.submit(_execute, *args)
+                inflight[fut] = (job, pool)
+
+            if not inflight:
+                if stop or drain:
+                    break
+                time.sleep(poll_s)
+                continue
+
+            done, _ = wait(list(inflight), timeout=poll_s, return_when=FIRST_COMPLETED)
+            for fut in done:
+                job, job_pool = inflight.pop(fut)
+                try:
+                    code, status, error = fut.result()
+                except BrokenProcessPool as e:
+                    # A worker died (killed, crashed); the pool terminated every
+                    # run it held. Later jobs get a fresh pool.
+                    code, status, error = int(ExitCode.ERROR), "error", f"worker process died: {e}"
+                    if job_pool is pool:
+                        pool.shutdown(wait=False)
+                        pool = _new_pool(workers)
+                        print("[AWO] serve: worker pool broke; started a new one", file=sys.stderr)
+                except Exception as e:
+                    code, status, error = int(ExitCode.ERROR), "error", f"worker failed: {e}"
+                _finish(db, job["job_id"], status, code, error)
+                print(f"[AWO] serve: job {job['job_id']} {status} (exit {code})", file=sys.stderr)
+    finally:
+        pool.shutdown(wait=True)
+        for s, h in prev.items():
+            signal.signal(s, h)
+        db.close()
+    return int(ExitCode.OK)
+
+
+# ----------------------------------- CLI -------------------------------------
+def _wait_for(db: sqlite3.Connection, job_id: int, poll_s: float = 0.2) -> Dict[str, Any]:
+    while True:
+        job = get(db, job_id)
+        if job is None or job["status"] in TERMINAL:
+            return job
+        time.sleep(poll_s)
+
+
+def _job_exit(job: Dict[str, Any]) -> int:
+    if job["status"] == "cancelled" or job["exit_code"] is None:
+        return int(ExitCode.ERROR)
+    return int(job["exit_code"])
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(prog="python scripts/awo_serve.py", description="AWO runner daemon and job queue")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("serve", help="Run queued jobs until SIGINT/SIGTERM")
+    p.add_argument("--workers", type=int, default=None, help="Runs in flight (default: CPU count)")
+    p.add_argument("--poll", type=float, default=0.2, help="Queue poll interval in seconds")
+    p.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+
+    p = sub.add_parser("submit", help="Queue a workflow; prints the job id")
+    p.add_argument("workflow", help="Path to a workflow JSON, relative to the repo root")
+    p.add_argument("--jobs", type=int, default=1, help="Per-run step concurrency, as in awo_run.py --jobs")
+    cache = p.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", dest="cache_mode", action="store_const", const="off")
+    cache.add_argument("--cache-only", dest="cache_mode", action="store_const", const="only")
+    p.set_defaults(cache_mode="use")
+    p.add_argument("--wait", action="store_true", help="Block until the run ends; exit with its exit code")
+
+    p = sub.add_parser("poll", help="Print a job as JSON")
+    p.add_argument("job_id", type=int)
+    p.add_argument("--wait", action="store_true", help="Block until the run ends; exit with its exit code")
+
+    p = sub.add_parser("cancel", help="Cancel a queued job")
+    p.add_argument("job_id", type=int)
+
+    p = sub.add_parser("list", help="Recent jobs as JSON lines")
+    p.add_argument("--status", choices=("queued", "running") + TERMINAL)
+    p.add_argument("--limit", type=int, default=50)
+
+    args = ap.parse_args(argv)
+    if args.cmd == "serve":
+        return serve(workers=args.workers, poll_s=args.poll, drain=args.drain)
+
+    db = connect()
+    try:
+        if args.cmd == "submit":
+            try:
+                job_id = submit(db, args.workflow, cache_mode=args.cache_mode, jobs=args.jobs)
+            except FileNotFoundError as e:
+                print(f"[AWO] submit: {e}", file=sys.stderr)
+                return int(ExitCode.ERROR)
+            if not args.wait:
+                print(job_id)
+                return int(ExitCode.OK)
+            job = _wait_for(db, job_id)
+            print(json.dumps(job, indent=2))
+            return _job_exit(job)
+
+        if args.cmd == "poll":
+            job = _wait_for(db, args.job_id) if args.wait else get(db, args.job_id)
+            if job is None:
+                print(f"[AWO] poll: no job {args.job_id}", file=sys.stderr)
+                return int(ExitCode.ERROR)
+            print(json.dumps(job, indent=2))
+            return _job_exit(job) if args.wait else int(ExitCode.OK)
+
+        if args.cmd == "cancel":
+            if cancel(db, args.job_id):
+                print(f"[AWO] cancel: job {args.job_id} cancelled", file=sys.stderr)
+                return int(ExitCode.OK)
+            job = get(db, args.job_id)
+            state = job["status"] if job else "unknown"
+            print(f"[AWO] cancel: job {args.job_id} not cancelled (status: {state})", file=sys.stderr)
+            return int(ExitCode.ERROR)
+
+        for job in list_jobs(db, status=args.status, limit=args.limit):
+            print(json.dumps(job, ensure_ascii=False))
+        return int(ExitCode.OK)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -5,6 +5,8 @@ AWO v3.0 validator.
 Usage (from repo root):
 
     python scripts/awo_validate.py invariants --run-id RUN_ID
+    python scripts/awo_validate.py invariants --all [--jobs N] [--out report.jsonl]
+    python scripts/awo_validate.py invariants --glob 'runs_legacy/*' [--jobs N] [--out report.jsonl]
     python scripts/awo_validate.py gate2 --run-id RUN_ID --orchestrator ORCH --reviewer REVIEWER --allow-self-approval {0,1}
 
 Writes:
@@ -18,9 +20,12 @@ import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from volatility_scan import default_scanner
 
 REPO_ROOT = Path(os.getenv("GITHUB_WORKSPACE", Path.cwd())).resolve()
 
@@ -35,11 +40,29 @@ def _load_json(path: Path) -> Any:
         return json.load(f)
 
 
-def validate_invariants(run_id: str) -> int:
-    rd = REPO_ROOT / "runs" / run_id
-    audit_dir = rd / "audit"
-    audit_dir.mkdir(parents=True, exist_ok=True)
+class _RunDocs:
+    """Parses each JSON file of a run at most once; a parse error is re-raised to every reader."""
+
+    def __init__(self) -> None:
+        self._cache: Dict[Path, Tuple[bool, Any]] = {}
 
+    def load(self, path: Path) -> Any:
+        hit = self._cache.get(path)
+        if hit is None:
+            try:
+                hit = (True, _load_json(path))
+            except Exception as e:
+                hit = (False, e)
+            self._cache[path] = hit
+        ok, val = hit
+        if not ok:
+            raise val
+        return val
+
+
+def check_invariants(rd: Path, run_id: str) -> Dict[str, Any]:
+    """Check one run directory; every JSON file is read and parsed once."""
+    docs = _RunDocs()
     reasons: List[str] = []
     ok = True
 
@@ -86,7 +109,7 @@ def validate_invariants(run_id: str) -> int:
             idx_path = rd / "index.json"
             if idx_path.is_file():
                 try:
-                    idx = _load_json(idx_path)
+                    idx = docs.load(idx_path)
                 except Exception as e:
                     reasons.append(f"index_json_error:{e}")
                     ok = False
@@ -147,7 +170,7 @@ def validate_invariants(run_id: str) -> int:
         idx_path = rd / "index.json"
         if idx_path.is_file():
             try:
-                idx = _load_json(idx_path)
+                idx = docs.load(idx_path)
                 has_scope = any(
                     isinstance(s, dict) and s.get("op") == "scope_validate"
                     for s in idx.get("steps", [])
@@ -180,7 +203,7 @@ def validate_invariants(run_id: str) -> int:
 
         if env_path.is_file():
             try:
-                env = _load_json(env_path)
+                env = docs.load(env_path)
                 for k in ("os", "python", "platform", "git", "runner", "tools"):
                     if k not in env:
                         reasons.append(f"environment.missing:{k}")
@@ -231,7 +254,7 @@ def validate_invariants(run_id: str) -> int:
 
         if prov_path.is_file():
             try:
-                prov = _load_json(prov_path)
+                prov = docs.load(prov_path)
                 for k in ("inputs_digest", "code_digest", "runtime", "started", "finished"):
                     if k not in prov:
                         reasons.append(f"provenance.missing:{k}")
@@ -277,40 +300,21 @@ def validate_invariants(run_id: str) -> int:
         else:
             reasons.append("provenance.json_missing"); ok = False
 
-        # Volatility / timestamp normalization scan
+        # Volatility / timestamp normalization scan. Top-level documents are
+        # already parsed; step records are streamed (see volatility_scan.py).
+        scanner = default_scanner()
         key_files = [
-            rd / "run_manifest.json",
-            rd / "provenance.json",
-            rd / "environment.json",
-            rd / "index.json",
+            (rd / name, True)
+            for name in ("run_manifest.json", "provenance.json", "environment.json", "index.json")
         ]
         if steps_dir.is_dir():
-            key_files.extend(sorted(p for p in steps_dir.glob("*.json")))
-
-        vol_keys = {"pid", "hostname", "container_id", "pod_uid", "instance_id"}
-
-        def scan(obj: Any, path: str = "") -> List[str]:
-            out: List[str] = []
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    p = f"{path}.{k}" if path else k
-                    if k in vol_keys and v not in (None, ""):
-                        out.append(f"volatile:{p}")
-                    if isinstance(v, str) and k.lower().endswith(("time", "timestamp", "at", "started", "finished")):
-                        if not ts_re.match(v):
-                            out.append(f"bad_ts:{p}={v}")
-                    out.extend(scan(v, p))
-            elif isinstance(obj, list):
-                for i, v in enumerate(obj):
-                    out.extend(scan(v, f"{path}[{i}]"))
-            return out
-
-        for fp in key_files:
+            key_files.extend((p, False) for p in step_files if p.suffix == ".json" and not p.name.startswith("."))
+
+        for fp, parsed in key_files:
             if not fp.is_file():
                 continue
             try:
-                doc = _load_json(fp)
-                problems = scan(doc)
+                problems = list(scanner.scan(docs.load(fp)) if parsed else scanner.scan_file(fp))
                 for p in problems:
                     reasons.append(f"{fp.relative_to(rd)}:{p}")
                     ok = False
@@ -318,21 +322,70 @@ def validate_invariants(run_id: str) -> int:
                 reasons.append(f"{fp.relative_to(rd)}:json_error:{e}")
                 ok = False
 
-    invariants = {
+    return {
         "run_id": run_id,
         "invariants_ok": ok,
         "reasons": reasons,
         "validated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
     }
+
+
+def _write_invariants(rd: Path, invariants: Dict[str, Any]) -> None:
     (rd / "audit").mkdir(parents=True, exist_ok=True)
     out_path = rd / "audit" / "invariants.json"
     out_path.write_text(json.dumps(invariants, indent=2), encoding="utf-8")
 
+
+def validate_invariants(run_id: str) -> int:
+    rd = REPO_ROOT / "runs" / run_id
+    audit_dir = rd / "audit"
+    audit_dir.mkdir(parents=True, exist_ok=True)
+
+    invariants = check_invariants(rd, run_id)
+    _write_invariants(rd, invariants)
+
     # Always exit 0 so artifacts are preserved; gate2 decides whether to halt.
     print(json.dumps(invariants, indent=2))
     return 0
 
 
+def _check_and_write(rd: str) -> Dict[str, Any]:
+    path = Path(rd)
+    invariants = check_invariants(path, path.name)
+    _write_invariants(path, invariants)
+    return invariants
+
+
+def validate_many(run_dirs: List[Path], *, jobs: Optional[int] = None, out: Optional[Path] = None) -> int:
+    """
+    Check many run directories in a process pool. Each run still gets its
+    audit/invariants.json; the combined report is one JSON line per run, in
+    input order, written to `out` (stdout when None).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    paths = [str(p) for p in run_dirs]
+    if jobs == 1 or len(paths) < 2:
+        results: Iterator[Dict[str, Any]] = map(_check_and_write, paths)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(_check_and_write, paths, chunksize=max(1, len(paths) // (jobs * 4)))
+    failed = 0
+    f = out.open("w", encoding="utf-8") if out is not None else sys.stdout
+    try:
+        for inv in results:
+            failed += not inv["invariants_ok"]
+            f.write(json.dumps(inv, ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            f.close()
+        if pool is not None:
+            pool.shutdown()
+    print(f"[awo_validate] {len(paths)} run(s) checked, {failed} with failed invariants", file=sys.stderr)
+    # Same contract as the single-run mode: report, don't halt.
+    return 0
+
+
 def gate2_decision(run_id: str, orchestrator: str, reviewer: str, allow_self: bool) -> int:
     rd = REPO_ROOT / "runs" / run_id
     audit_dir = rd / "audit"
@@ -406,7 +459,12 @@ def main(argv: list[str]) -> int:
     sub = parser.add_subparsers(dest="cmd", required=True)
 
     p_inv = sub.add_parser("invariants", help="Validate run invariants")
-    p_inv.add_argument("--run-id", required=True)
+    which = p_inv.add_mutually_exclusive_group(required=True)
+    which.add_argument("--run-id")
+    which.add_argument("--all", action="store_true", help="Every runs/run_* directory")
+    which.add_argument("--glob", help="Run directories matching this glob under the repo root, e.g. 'runs_legacy/*'")
+    p_inv.add_argument("--jobs", type=int, default=None, help="Worker processes for --all/--glob (default: CPU count)")
+    p_inv.add_argument("--out", default=None, help="Combined JSONL report for --all/--glob (default: stdout)")
 
     p_gate = sub.add_parser("gate2", help="Gate2 decision (independence + invariants)")
     p_gate.add_argument("--run-id", required=True)
@@ -417,7 +475,11 @@ def main(argv: list[str]) -> int:
     args = parser.parse_args(argv)
 
     if args.cmd == "invariants":
-        return validate_invariants(args.run_id)
+        if args.run_id:
+            return validate_invariants(args.run_id)
+        pattern = "runs/run_*" if args.all else args.glob
+        run_dirs = sorted(p for p in REPO_ROOT.glob(pattern) if p.is_dir())
+        return validate_many(run_dirs, jobs=args.jobs, out=Path(args.out) if args.out else None)
     if args.cmd == "gate2":
         allow_self = args.allow_self_approval == "1"
         return gate2_decision(args.run_id, args.orchestrator, args.reviewer, allow_self)
@@ -0,0 +1,217 @@
+"""
+Consensus engine for the consensus_vote op.
+
+Candidates ({"model", "text"}) are clustered in one streaming pass: each
+candidate joins the earliest cluster whose leader (first member) is similar
+enough, otherwise it starts a new cluster. The winning cluster is picked with
+a single top-1 selection — most voters, then longest normalized text, then
+earliest — which is the order the runner has always used, so the default
+"exact" scorer reproduces exact-match majority voting.
+
+Scorers (step field `scorer`, threshold via `threshold`):
+  exact    normalized text equality
+  jaccard  token-set Jaccard similarity
+  minhash  MinHash signatures + LSH banding (near-duplicate clustering)
+  cosine   character n-gram cosine similarity (vectorized with NumPy when
+           installed, pure Python otherwise)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # optional: vectorized cosine / MinHash
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+    np = None
+
+DEFAULT_THRESHOLDS: Dict[str, float] = {"exact": 1.0, "jaccard": 0.6, "minhash": 0.6, "cosine": 0.8}
+
+MINHASH_PERMS = 64
+MINHASH_BANDS = 16  # 16 bands x 4 rows: candidate pairs from roughly Jaccard >= 0.5
+NGRAM = 3
+_MERSENNE = (1 << 31) - 1  # a*h+b stays below 2**62, so NumPy can use uint64
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=8192)
+def norm_text(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").strip().lower())
+
+
+@lru_cache(maxsize=8192)
+def tokens(norm: str) -> frozenset:
+    return frozenset(_TOKEN_RE.findall(norm))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# --------------------------------- scorers -----------------------------------
+# A scorer takes the normalized texts and a threshold and returns, for each
+# candidate, the index of the cluster it joins (clusters numbered in order of
+# creation).
+
+
+def _cluster_exact(norms: Sequence[str], threshold: float) -> List[int]:
+    ids: Dict[str, int] = {}
+    return [ids.setdefault(n, len(ids)) for n in norms]
+
+
+def _cluster_leaders(norms: Sequence[str], similar: Callable[[int, int], bool]) -> List[int]:
+    leaders: List[int] = []
+    out: List[int] = []
+    for i in range(len(norms)):
+        for c, lead in enumerate(leaders):
+            if similar(lead, i):
+                out.append(c)
+                break
+        else:
+            out.append(len(leaders))
+            leaders.append(i)
+    return out
+
+
+def _cluster_jaccard(norms: Sequence[str], threshold: float) -> List[int]:
+    toks = [tokens(n) for n in norms]
+    return _cluster_leaders(norms, lambda a, b: jaccard(toks[a], toks[b]) >= threshold)
+
+
+def _minhash_params(perms: int) -> Tuple[List[int], List[int]]:
+    rnd = random.Random(0x5EED)  # fixed: signatures must be reproducible across runs
+    return [rnd.randrange(1, _MERSENNE) for _ in range(perms)], [rnd.randrange(0, _MERSENNE) for _ in range(perms)]
+
+
+_MH_A, _MH_B = _minhash_params(MINHASH_PERMS)
+_NP_A = np.array(_MH_A, dtype=np.uint64)[:, None] if np is not None else None
+_NP_B = np.array(_MH_B, dtype=np.uint64)[:, None] if np is not None else None
+
+
+def _token_hash(tok: str) -> int:
+    return int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=4).digest(), "big") % _MERSENNE
+
+
+def minhash_signature(toks: Iterable[str]) -> Tuple[int, ...]:
+    """Same values with or without NumPy (signatures may be persisted)."""
+    hs = [_token_hash(t) for t in toks]
+    if not hs:
+        return tuple([_MERSENNE] * MINHASH_PERMS)
+    if np is not None:
+        x = np.array(hs, dtype=np.uint64)[None, :]
+        return tuple(int(v) for v in ((_NP_A * x + _NP_B) % _MERSENNE).min(axis=1))
+    return tuple(min((a * h + b) % _MERSENNE for h in hs) for a, b in zip(_MH_A, _MH_B))
+
+
+def _cluster_minhash(norms: Sequence[str], threshold: float) -> List[int]:
+    rows = MINHASH_PERMS // MINHASH_BANDS
+    sigs = [minhash_signature(tokens(n)) for n in norms]
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}  # (band, slice) -> cluster ids
+    leader_of: List[int] = []
+    out: List[int] = []
+    for i, sig in enumerate(sigs):
+        bands = [(b, sig[b * rows:(b + 1) * rows]) for b in range(MINHASH_BANDS)]
+        candidates = sorted({c for key in bands for c in buckets.get(key, ())})
+        joined = None
+        for c in candidates:
+            lead = sigs[leader_of[c]]
+            if sum(x == y for x, y in zip(sig, lead)) / MINHASH_PERMS >= threshold:
+                joined = c
+                break
+        if joined is None:
+            joined = len(leader_of)
+            leader_of.append(i)
+            for key in bands:
+                buckets.setdefault(key, []).append(joined)
+        out.append(joined)
+    return out
+
+
+def _ngrams(norm: str) -> Dict[str, int]:
+    s = f" {norm} "
+    grams: Dict[str, int] = {}
+    for k in range(max(1, len(s) - NGRAM + 1)):
+        g = s[k:k + NGRAM]
+        grams[g] = grams.get(g, 0) + 1
+    return grams
+
+
+def _cluster_cosine(norms: Sequence[str], threshold: float) -> List[int]:
+    grams = [_ngrams(n) for n in norms]
+    if np is not None and norms:
+        vocab: Dict[str, int] = {}
+        for g in grams:
+            for k in g:
+                vocab.setdefault(k, len(vocab))
+        m = np.zeros((len(norms), len(vocab)), dtype=np.float64)
+        for i, g in enumerate(grams):
+            m[i, [vocab[k] for k in g]] = list(g.values())
+        m /= np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+        sims = m @ m.T
+        return _cluster_leaders(norms, lambda a, b: sims[a, b] >= threshold - 1e-12)
+
+    norms2 = [math.sqrt(sum(v * v for v in g.values())) or 1.0 for g in grams]
+
+    def _cos(a: int, b: int) -> float:
+        ga, gb = grams[a], grams[b]
+        if len(gb) < len(ga):
+            ga, gb = gb, ga
+        return sum(v * gb.get(k, 0) for k, v in ga.items()) / (norms2[a] * norms2[b])
+
+    return _cluster_leaders(norms, lambda a, b: _cos(a, b) >= threshold - 1e-12)
+
+
+SCORERS: Dict[str, Callable[[Sequence[str], float], List[int]]] = {
+    "exact": _cluster_exact,
+    "jaccard": _cluster_jaccard,
+    "minhash": _cluster_minhash,
+    "cosine": _cluster_cosine,
+}
+
+
+# --------------------------------- engine ------------------------------------
+def vote(
+    items: Sequence[Dict[str, Any]],
+    *,
+    scorer: str = "exact",
+    threshold: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Cluster candidates and return the consensus fields of a consensus_vote record."""
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown consensus scorer: {scorer!r} (expected one of {sorted(SCORERS)})")
+    thr = DEFAULT_THRESHOLDS[scorer] if threshold is None else float(threshold)
+    norms = [norm_text(o["text"]) for o in items]
+    assign = SCORERS[scorer](norms, thr)
+
+    members: Dict[int, List[int]] = {}
+    for i, c in enumerate(assign):
+        members.setdefault(c, []).append(i)
+
+    # top-1: most voters, then longest normalized leader text, then earliest cluster
+    best = max(members, key=lambda c: (len(members[c]), len(norms[members[c][0]]), -c), default=None)
+    if best is None:
+        voters: List[str] = []
+        consensus_norm, representative = "", ""
+    else:
+        lead = members[best][0]
+        voters = [items[i]["model"] for i in members[best]]
+        consensus_norm, representative = norms[lead], items[lead]["text"]
+
+    return {
+        "total_candidates": len(items),
+        "voter_count": len(voters),
+        "voters": voters,
+        "consensus_norm": consensus_norm,
+        "consensus_text": representative,
+        "agreement_ratio": (len(voters) / max(1, len(items))),
+        "scorer": scorer,
+        "threshold": thr,
+        "clusters": len(members),
+    }
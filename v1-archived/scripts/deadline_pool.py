@@ -0,0 +1,97 @@
+"""
+Bounded thread-pool map where every call gets its own deadline.
+
+A call's timeout runs from the moment a worker starts it, not from when it
+was submitted or when the caller gets round to collecting it: time spent
+queued behind the pool is free, and a hung call is reported when its own
+deadline passes even while earlier calls are still being collected.
+
+On the first failure (a deadline passed or a call raised) calls that have
+not started are cancelled, and calls already in flight are waited for
+until they finish or reach their own deadline. Only calls past their
+deadline are left behind; Python threads cannot be interrupted, so such a
+call finishes in the background and its result is discarded.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_POLL_S = 0.05  # re-check while a timed call is between "submitted" and "started"
+
+
+class DeadlineExceeded(RuntimeError):
+    def __init__(self, index: int, timeout_s: float) -> None:
+        super().__init__(f"call {index} did not finish within {timeout_s}s")
+        self.index = index
+        self.timeout_s = timeout_s
+
+
+def map_with_deadlines(
+    fn: Callable[[T], R],
+    items: Sequence[T],
+    *,
+    max_workers: int,
+    timeout_for: Callable[[int], Optional[float]],
+    thread_name_prefix: str = "awo-pool",
+) -> List[R]:
+    """
+    fn(item) for every item on up to max_workers threads; results in `items` order.
+
+    timeout_for(i) is call i's timeout in seconds (None: unbounded). Raises
+    DeadlineExceeded for the lowest-indexed overdue call, or the first
+    exception (in completion order) raised by a call.
+    """
+    started: List[Optional[float]] = [None] * len(items)
+
+    def _call(i: int) -> R:
+        started[i] = time.monotonic()
+        return fn(items[i])
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=thread_name_prefix)
+    futures = [pool.submit(_call, i) for i in range(len(items))]
+    index: Dict[Future, int] = {f: i for i, f in enumerate(futures)}
+    pending: Set[Future] = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            wake: Optional[float] = None
+            for f in sorted(pending, key=index.__getitem__):
+                i = index[f]
+                t = timeout_for(i)
+                if t is None:
+                    continue
+                left = _POLL_S if started[i] is None else started[i] + t - now
+                if left <= 0:
+                    raise DeadlineExceeded(i, t)
+                wake = left if wake is None else min(wake, left)
+            done, pending = wait(pending, timeout=wake, return_when=FIRST_COMPLETED)
+            for f in done:
+                f.result()  # surface a failure as soon as it happens
+        return [f.result() for f in futures]
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        _drain(futures, started, timeout_for)
+        raise
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _drain(futures: List[Future], started: List[Optional[float]], timeout_for: Callable[[int], Optional[float]]) -> None:
+    """Wait for in-flight calls until each finishes or reaches its own deadline."""
+    for i, f in enumerate(futures):
+        if f.done() or started[i] is None:
+            continue
+        t = timeout_for(i)
+        if t is None:
+            wait([f])
+        else:
+            left = started[i] + t - time.monotonic()
+            if left > 0:
+                wait([f], timeout=left)
@@ -0,0 +1,195 @@
+"""
+Environment snapshot for runs/<id>/environment.json, captured once per process.
+
+The interpreter, platform and tool versions cannot change while a process
+runs, so they are computed on first use and reused by every run the process
+executes (batch workers, the runner daemon). Git metadata is read straight
+from the repository files, without running `git`:
+
+  .git/HEAD                 "ref: refs/heads/<branch>" or a detached commit
+  .git/refs/heads/<branch>  the branch's commit (loose ref)
+  .git/packed-refs          fallback when the ref has been packed
+
+and is re-read only when the stat signature (mtime_ns, size) of HEAD, the
+branch ref or packed-refs changes: a checkout rewrites HEAD, a commit rewrites
+the branch ref. `.git` may be a file ("gitdir: ...", worktrees and submodules);
+refs then come from the worktree's commondir.
+
+Fields (the ones awo_validate.py invariants require, plus the earlier keys):
+
+  os, python, platform, git {commit, branch}, git_sha, runner {name, version},
+  tools [{name, version}], github_run_id, github_sha
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import platform
+import re
+import sys
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+RUNNER_NAME = "awo_run"
+TOOL_DISTRIBUTIONS = ("jsonschema", "ijson", "numpy")  # reported when installed
+
+_LOCK = threading.Lock()
+_STATIC: Optional[Dict[str, Any]] = None
+_GIT_DIRS: Dict[Path, Optional[Tuple[Path, Path]]] = {}
+_GIT_INFO: Dict[Path, Tuple[Tuple[Any, ...], str, Dict[str, str]]] = {}  # root -> (stat sigs, HEAD text, info)
+
+
+# ------------------------------ process-static -------------------------------
+def _package_version() -> str:
+    # the awo package's __version__, read as text: the scripts do not import the package
+    try:
+        src = (Path(__file__).resolve().parents[1] / "__init__.py").read_text(encoding="utf-8")
+    except OSError:
+        return "unknown"
+    m = re.search(r'^__version__\s*=\s*["\']([^"\']+)["\']', src, re.M)
+    return m.group(1) if m else "unknown"
+
+
+def _tools() -> List[Dict[str, str]]:
+    tools = [{"name": "python", "version": platform.python_version()}]
+    for dist in TOOL_DISTRIBUTIONS:
+        try:
+            tools.append({"name": dist, "version": metadata.version(dist)})
+        except metadata.PackageNotFoundError:
+            pass
+    return tools
+
+
+def _static() -> Dict[str, Any]:
+    global _STATIC
+    with _LOCK:
+        if _STATIC is None:
+            _STATIC = {
+                "os": f"{platform.system()} {platform.release()}".strip(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "runner": {"name": RUNNER_NAME, "version": _package_version()},
+                "tools": _tools(),
+            }
+        return _STATIC
+
+
+# ----------------------------------- git -------------------------------------
+def _find_git_dirs(repo_root: Path) -> Optional[Tuple[Path, Path]]:
+    """(git dir holding HEAD, common dir holding refs) for repo_root or its nearest parent with .git."""
+    for d in (repo_root, *repo_root.parents):
+        dot_git = d / ".git"
+        if dot_git.is_dir():
+            git_dir = dot_git
+        elif dot_git.is_file():
+            try:
+                line = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = (d / line[len("gitdir:"):].strip()).resolve()
+        else:
+            continue
+        common = git_dir
+        try:
+            common = (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+        except OSError:
+            pass
+        return git_dir, common
+    return None
+
+
+def _stat_sig(p: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_head(git_dir: Path) -> str:
+    try:
+        return (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+def _packed_ref(common: Path, ref: str) -> str:
+    try:
+        with (common / "packed-refs").open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.strip().partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return ""
+
+
+def _resolve(git_dir: Path, common: Path, head: str) -> Dict[str, str]:
+    if not head.startswith("ref:"):
+        return {"commit": head or "unknown", "branch": "HEAD"}  # detached
+    ref = head[len("ref:"):].strip()
+    branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    commit = ""
+    for base in (git_dir, common):
+        try:
+            commit = (base / ref).read_text(encoding="utf-8").strip()
+            break
+        except OSError:
+            continue
+    return {"commit": commit or _packed_ref(common, ref) or "unknown", "branch": branch}
+
+
+def git_info(repo_root: Path) -> Dict[str, str]:
+    """{"commit", "branch"} for repo_root; "unknown"/"" outside a git checkout."""
+    with _LOCK:
+        if repo_root not in _GIT_DIRS:
+            _GIT_DIRS[repo_root] = _find_git_dirs(repo_root.resolve())
+        dirs = _GIT_DIRS[repo_root]
+        cached = _GIT_INFO.get(repo_root)
+    if dirs is None:
+        return {"commit": "unknown", "branch": ""}
+    git_dir, common = dirs
+
+    # Hot path: three stats. HEAD is only re-read when its own signature moves.
+    head_sig = _stat_sig(git_dir / "HEAD")
+    if cached is not None and cached[0][0] == head_sig:
+        head = cached[1]
+    else:
+        head = _read_head(git_dir)
+    ref = head[len("ref:"):].strip() if head.startswith("ref:") else None
+    sig = (head_sig, _stat_sig(common / ref) if ref else None, _stat_sig(common / "packed-refs"))
+    if cached is not None and cached[0] == sig and cached[1] == head:
+        return dict(cached[2])
+    info = _resolve(git_dir, common, head)
+    with _LOCK:
+        _GIT_INFO[repo_root] = (sig, head, info)
+    return dict(info)
+
+
+# --------------------------------- snapshot ----------------------------------
+def snapshot(repo_root: Path) -> Dict[str, Any]:
+    """A fresh environment.json document; static parts are computed once per process."""
+    env = copy.deepcopy(_static())
+    git = git_info(repo_root)
+    env["git"] = git
+    env["git_sha"] = git["commit"]
+    env["github_run_id"] = os.getenv("GITHUB_RUN_ID")
+    env["github_sha"] = os.getenv("GITHUB_SHA")
+    return env
+
+
+def clear() -> None:
+    """Drop every memoized value (tests, or after changing the interpreter's environment)."""
+    global _STATIC
+    with _LOCK:
+        _STATIC = None
+        _GIT_DIRS.clear()
+        _GIT_INFO.clear()
@@ -0,0 +1,175 @@
+"""
+Content-addressed cache of model generations (runs/.cache/gen/).
+
+Backends are deterministic (prompt + seed), so a generation is fully described
+by (model alias, backend identity, prompt hash, canonical params). The SHA-256
+of that canonical key names the entry:
+
+    runs/.cache/gen/<key[:2]>/<key>.json   {"key": {...}, "output": {...}}
+
+Entries are written atomically (temp file + rename), so concurrent runs can
+share the cache. A hit refreshes the entry's mtime; prune() evicts
+least-recently-used entries once the cache exceeds its byte or entry budget.
+
+prune() does not walk the cache on every run. runs/.cache/gen/.usage holds
+the size and entry count from the last full scan, followed by one
+"<bytes> <entries>" line per run appended since then for what that run put
+(appends are atomic, so concurrent runs do not lose each other's lines).
+Only when that running total crosses a budget, or there is no usage file
+yet, does prune() glob and stat the entries, evict and rewrite the file
+with the exact figures.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_MODES = ("use", "off", "only")
+
+DEFAULT_MAX_BYTES = int(os.getenv("AWO_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("AWO_CACHE_MAX_ENTRIES", "100000"))
+USAGE_FILE = ".usage"
+
+
+def canonical_json(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def backend_identity(backend: Any) -> str:
+    """Stable name/version of a backend implementation (distinguishes fallbacks)."""
+    cls = type(backend)
+    return f"{cls.__module__}.{cls.__qualname__}:{getattr(backend, 'name', '')}"
+
+
+def generation_key(model: str, backend: Any, prompt: str, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    key = {
+        "model": model,
+        "backend": backend_identity(backend),
+        "prompt_id": "sha256:" + hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "params": params or {},
+    }
+    return hashlib.sha256(canonical_json(key).encode("utf-8")).hexdigest(), key
+
+
+class GenerationCache:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        mode: str = "use",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported cache mode: {mode!r} (expected one of {CACHE_MODES})")
+        self.root = root / "gen"
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # bytes/entries this instance added since its last prune()
+        self._added = [0, 0]
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        p = self._path(digest)
+        try:
+            output = json.loads(p.read_text(encoding="utf-8"))["output"]
+            os.utime(p)  # LRU: a hit counts as a use
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1  # missing, unreadable or malformed: regenerate
+            return None
+        self.hits += 1
+        return output
+
+    def put(self, digest: str, key: Dict[str, Any], output: Dict[str, Any]) -> None:
+        if self.mode != "use":
+            return
+        p = self._path(digest)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        data = canonical_json({"key": key, "output": output}).encode("utf-8")
+        tmp.write_bytes(data)
+        try:
+            old, new_entries = p.stat().st_size, 0
+        except OSError:
+            old, new_entries = 0, 1
+        os.replace(tmp, p)
+        with self._lock:
+            self._added[0] += len(data) - old
+            self._added[1] += new_entries
+
+    def _read_usage(self) -> Optional[Tuple[int, int]]:
+        try:
+            lines = (self.root / USAGE_FILE).read_text(encoding="utf-8").splitlines()
+            pairs = [tuple(int(x) for x in line.split()) for line in lines if line.strip()]
+            return sum(b for b, _ in pairs), sum(n for _, n in pairs)
+        except (OSError, ValueError):
+            return None
+
+    def _append_usage(self, added_bytes: int, added_entries: int) -> None:
+        with open(self.root / USAGE_FILE, "a", encoding="utf-8") as f:
+            f.write(f"{added_bytes} {added_entries}\n")
+
+    def _write_usage(self, total: int, count: int) -> None:
+        p = self.root / USAGE_FILE
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(f"{total} {count}\n", encoding="utf-8")
+        os.replace(tmp, p)
+
+    def prune(self) -> int:
+        """Evict least-recently-used entries until within budget; returns evicted count."""
+        if not self.root.is_dir():
+            return 0
+        with self._lock:
+            added_bytes, added_entries = self._added
+            self._added = [0, 0]
+        usage = self._read_usage()
+        if usage is not None:
+            total, count = usage[0] + added_bytes, usage[1] + added_entries
+            if total <= self.max_bytes and count <= self.max_entries:
+                if added_bytes or added_entries:
+                    self._append_usage(added_bytes, added_entries)
+                return 0
+        entries = []
+        total = 0
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        evicted = 0
+        count = len(entries)
+        for _, size, p in entries:
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+            evicted += 1
+        self._write_usage(total, count)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Persistent MinHash/LSH index of fanout_generate outputs across runs.
+
+Lives in runs/.history_index.sqlite (stdlib sqlite3, safe for concurrent
+runs). Every output is stored once, keyed by (run, step, position in the
+step's outputs) so a model listed twice keeps both, with its MinHash
+signature (same signatures as consensus_engine's minhash scorer) and one
+row per LSH band, so "nearest prior outputs" only compares against outputs
+that share at least one band instead of re-reading runs/*/steps/*.json.
+
+The runner adds outputs when a fanout_generate step is committed; the
+dedupe_against_history op and the CLI below query it.
+
+Usage (from repo root):
+
+    python scripts/history_index.py query "some output text" [--k 5] [--threshold 0.5]
+    python scripts/history_index.py rebuild      # (re)index every runs/*/steps/*.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from consensus_engine import MINHASH_BANDS, MINHASH_PERMS, tokens, minhash_signature, norm_text
+
+REPO_ROOT = Path(os.getenv("GITHUB_WORKSPACE", Path.cwd())).resolve()
+RUNS_ROOT = (REPO_ROOT / "runs").resolve()
+INDEX_NAME = ".history_index.sqlite"
+
+_ROWS = MINHASH_PERMS // MINHASH_BANDS
+_SIG = struct.Struct(f">{MINHASH_PERMS}I")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    step_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    text_sha256 TEXT NOT NULL,
+    sig BLOB NOT NULL,
+    preview TEXT NOT NULL,
+    UNIQUE (run_id, step_id, position)
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    key BLOB NOT NULL,
+    output_id INTEGER NOT NULL REFERENCES outputs(id)
+);
+CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, key);
+"""
+
+
+def signature(text: str) -> Tuple[int, ...]:
+    return minhash_signature(tokens(norm_text(text)))
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated token-set Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / MINHASH_PERMS
+
+
+def _band_keys(sig: Sequence[int]) -> List[Tuple[int, bytes]]:
+    raw = _SIG.pack(*sig)
+    step = _ROWS * 4
+    return [(b, raw[b * step:(b + 1) * step]) for b in range(MINHASH_BANDS)]
+
+
+class HistoryIndex:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(str(path), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self.db.executescript(_SCHEMA)
+
+    def _migrate(self) -> None:
+        """Re-key an index written when outputs were unique per (run, step, model)."""
+        cols = {r[1] for r in self.db.execute("PRAGMA table_info(outputs)")}
+        if not cols or "position" in cols:
+            return
+        with self.db:
+            self.db.execute("ALTER TABLE outputs RENAME TO outputs_v1")
+            self.db.executescript(_SCHEMA)
+            # kept rows were the first output of each model, inserted in output order
+            self.db.execute(
+                "INSERT INTO outputs (id, run_id, step_id, position, model, text_sha256, sig, preview) "
+                "SELECT id, run_id, step_id, ROW_NUMBER() OVER (PARTITION BY run_id, step_id ORDER BY id) - 1, "
+                "model, text_sha256, sig, preview FROM outputs_v1"
+            )
+            self.db.execute("DROP TABLE outputs_v1")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "HistoryIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def add(self, run_id: str, step_id: str, outputs: Iterable[Dict[str, Any]]) -> int:
+        """Index a step's outputs ({"model", "text"}) by position; already-indexed outputs are skipped."""
+        added = 0
+        with self.db:
+            for pos, o in enumerate(outputs):
+                text = str(o.get("text", ""))
+                sig = signature(text)
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO outputs (run_id, step_id, position, model, text_sha256, sig, preview) "
+                    "VALUES (?,?,?,?,?,?,?)",
+                    (run_id, step_id, pos, o["model"], hashlib.sha256(text.encode("utf-8")).hexdigest(),
+                     _SIG.pack(*sig), text[:200]),
+                )
+                if cur.rowcount:
+                    self.db.executemany(
+                        "INSERT INTO bands (band, key, output_id) VALUES (?,?,?)",
+                        [(b, k, cur.lastrowid) for b, k in _band_keys(sig)],
+                    )
+                    added += 1
+        return added
+
+    def query(
+        self,
+        text: str,
+        *,
+        k: int = 5,
+        threshold: float = 0.5,
+        exclude_run: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Nearest prior outputs by estimated Jaccard, best first (ties: oldest first)."""
+        sig = signature(text)
+        ids: set = set()
+        for b, key in _band_keys(sig):
+            ids.update(r[0] for r in self.db.execute("SELECT output_id FROM bands WHERE band=? AND key=?", (b, key)))
+        hits: List[Dict[str, Any]] = []
+        for oid in sorted(ids):
+            run_id, step_id, model, sha, blob, preview = self.db.execute(
+                "SELECT run_id, step_id, model, text_sha256, sig, preview FROM outputs WHERE id=?", (oid,)
+            ).fetchone()
+            if run_id == exclude_run:
+                continue
+            sim = similarity(sig, _SIG.unpack(blob))
+            if sim >= threshold:
+                hits.append(
+                    {"run_id": run_id, "step_id": step_id, "model": model, "similarity": round(sim, 4),
+                     "text_sha256": sha, "preview": preview}
+                )
+        hits.sort(key=lambda h: -h["similarity"])  # stable: keeps insertion order among ties
+        return hits[:k]
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+
+
+def rebuild(index: HistoryIndex, runs_root: Path) -> int:
+    """Index every fanout_generate step record under runs_root (idempotent)."""
+    added = 0
+    for p in sorted(runs_root.glob("run_*/steps/*.json")):
+        try:
+            rec = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(rec, dict) and rec.get("op") == "fanout_generate" and isinstance(rec.get("outputs"), list):
+            added += index.add(p.parent.parent.name, rec.get("id", p.stem), rec["outputs"])
+    return added
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description="Query or rebuild the fanout output history index")
+    ap.add_argument("--index", default=str(RUNS_ROOT / INDEX_NAME))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    q = sub.add_parser("query", help="Nearest prior outputs for a text")
+    q.add_argument("text")
+    q.add_argument("--k", type=int, default=5)
+    q.add_argument("--threshold", type=float, default=0.5)
+    q.add_argument("--exclude-run", default=None)
+    sub.add_parser("rebuild", help=f"Index all fanout_generate steps under {RUNS_ROOT}")
+    args = ap.parse_args(argv)
+
+    with HistoryIndex(Path(args.index)) as idx:
+        if args.cmd == "rebuild":
+            added = rebuild(idx, RUNS_ROOT)
+            print(f"[history_index] added {added} output(s); {idx.count()} indexed")
+            return 0
+        for h in idx.query(args.text, k=args.k, threshold=args.threshold, exclude_run=args.exclude_run):
+            print(json.dumps(h, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,153 @@
+"""
+Append-only provenance store for AWO runs.
+
+Records are appended to runs/<RUN_ID>/provenance.jsonl (one JSON object per
+line) as they are produced; only the new record is validated. The
+schema-compliant provenance.json array is written once, by compact(), when the
+run finalizes, pauses at a gate or fails.
+
+If a run dies before compaction, recover(run_dir) rebuilds provenance.json
+from the log. A torn trailing line (crash mid-write) is dropped; corruption
+anywhere else is an error.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+PROVENANCE_PATH = "provenance.json"
+PROVENANCE_LOG_PATH = "provenance.jsonl"
+
+Validator = Callable[[Dict[str, Any]], None]
+
+
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_log(log_path: Path) -> List[Dict[str, Any]]:
+    """Parse a provenance log, dropping a torn final line if present."""
+    if not log_path.is_file():
+        return []
+    data = log_path.read_text(encoding="utf-8")
+    lines = data.split("\n")
+    # A complete log ends with "\n", so the last element is "" unless the
+    # final write was interrupted.
+    tail = lines.pop()
+    records: List[Dict[str, Any]] = []
+    for ln, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"{log_path}:{ln}: corrupt provenance record: {e}")
+    if tail.strip():
+        try:
+            records.append(json.loads(tail))
+        except json.JSONDecodeError:
+            pass  # torn write; the record never completed
+    return records
+
+
+def _repair_tail(log_path: Path) -> None:
+    """Make the log end on a line boundary so new appends start clean.
+
+    A complete final record that only lost its newline is kept (read_log
+    accepts it); a torn one is cut off.
+    """
+    if not log_path.is_file():
+        return
+    data = log_path.read_bytes()
+    if not data or data.endswith(b"\n"):
+        return
+    cut = data.rfind(b"\n") + 1
+    try:
+        json.loads(data[cut:].decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        with log_path.open("r+b") as f:
+            f.truncate(cut)
+    else:
+        with log_path.open("ab") as f:
+            f.write(b"\n")
+
+
+class ProvenanceStore:
+    """
+    Append-only provenance log with a single compaction at finalize.
+
+    Holds the log open for the life of the run; use it as a context manager
+    (or call close()) so the handle is released on every exit path.
+    """
+
+    def __init__(self, run_dir: Path, *, validate: Optional[Validator] = None, fsync: bool = False) -> None:
+        self.run_dir = run_dir
+        self.log_path = run_dir / PROVENANCE_LOG_PATH
+        self.path = run_dir / PROVENANCE_PATH
+        self._validate = validate
+        self._fsync = fsync
+        # Picks up records from an earlier process writing into the same run.
+        self.records: List[Dict[str, Any]] = read_log(self.log_path)
+        _repair_tail(self.log_path)
+        self._fh = self.log_path.open("a", encoding="utf-8")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records)
+
+    def append(self, rec: Dict[str, Any]) -> None:
+        if self._validate is not None:
+            self._validate(rec)
+        self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        if self._fsync:
+            os.fsync(self._fh.fileno())
+        self.records.append(rec)
+
+    def extend(self, recs: List[Dict[str, Any]]) -> None:
+        for rec in recs:
+            self.append(rec)
+
+    def compact(self) -> Path:
+        """Write the schema-compliant provenance.json array."""
+        self._fh.flush()
+        _atomic_write_json(self.path, self.records)
+        return self.path
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+    def __enter__(self) -> "ProvenanceStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def recover(run_dir: Path, *, validate: Optional[Validator] = None) -> Path:
+    """Rebuild provenance.json from provenance.jsonl (crash recovery)."""
+    records = read_log(run_dir / PROVENANCE_LOG_PATH)
+    if validate is not None:
+        for rec in records:
+            validate(rec)
+    out = run_dir / PROVENANCE_PATH
+    _atomic_write_json(out, records)
+    return out
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python scripts/provenance_store.py <RUN_DIR>", file=sys.stderr)
+        sys.exit(2)
+    print(recover(Path(sys.argv[1]).resolve()))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+SQLite run catalog (runs/.catalog.sqlite).
+
+One row per run plus its manifest ops, provenance records and artifact
+hashes, so cross-run questions ("runs pending_review", "runs that used
+model X with seed Y") are indexed lookups instead of opening every
+runs/*/index.json, run_manifest.json and provenance.json.
+
+awo_run.py updates a run's rows whenever it finalizes, pauses at a gate or
+fails; the catalog is derived data and can always be rebuilt from disk.
+
+Usage (from repo root):
+
+    python scripts/run_catalog.py rebuild
+    python scripts/run_catalog.py query [--status pending_review] [--model echo] [--seed 0]
+                                        [--prompt-id sha256:...] [--since 2025-01-01T00:00:00Z] [--limit 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(os.getenv("GITHUB_WORKSPACE", Path.cwd())).resolve()
+RUNS_ROOT = (REPO_ROOT / "runs").resolve()
+CATALOG_NAME = ".catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    workflow TEXT,
+    status TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ops (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    idx INTEGER,
+    step_id TEXT,
+    op TEXT,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS provenance (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT,
+    model_name TEXT,
+    provider TEXT,
+    version TEXT,
+    prompt_id TEXT,
+    seed INTEGER,
+    started TEXT,
+    ended TEXT,
+    notes TEXT,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (run_id, path)
+);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, started_at);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_finished ON runs (finished_at);
+CREATE INDEX IF NOT EXISTS ops_op ON ops (op);
+CREATE INDEX IF NOT EXISTS prov_model_seed ON provenance (model_name, seed);
+CREATE INDEX IF NOT EXISTS prov_prompt ON provenance (prompt_id);
+CREATE INDEX IF NOT EXISTS prov_started ON provenance (started);
+CREATE INDEX IF NOT EXISTS artifacts_sha ON artifacts (sha256);
+"""
+
+_TABLES = ("runs", "ops", "provenance", "artifacts")
+
+
+def connect(path: Optional[Path] = None) -> sqlite3.Connection:
+    path = path or RUNS_ROOT / CATALOG_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(str(path), timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(_SCHEMA)
+    return db
+
+
+def _read_json(p: Path) -> Any:
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def index_run(db: sqlite3.Connection, run_dir: Path) -> bool:
+    """Replace one run's rows from its files on disk; False if it has no manifest."""
+    manifest = _read_json(run_dir / "run_manifest.json")
+    if not isinstance(manifest, dict):
+        return False
+    run_id = manifest.get("run_id") or run_dir.name
+    prov = _read_json(run_dir / "provenance.json")
+    prov = prov if isinstance(prov, list) else []
+
+    with db:
+        for table in _TABLES:
+            db.execute(f"DELETE FROM {table} WHERE run_id=?", (run_id,))
+        db.execute(
+            "INSERT INTO runs (run_id, workflow, status, started_at, finished_at, indexed_at) VALUES (?,?,?,?,?,?)",
+            (run_id, manifest.get("workflow"), manifest.get("status"), manifest.get("started_at"),
+             manifest.get("finished_at"), time.time()),
+        )
+        db.executemany(
+            "INSERT INTO ops (run_id, seq, idx, step_id, op) VALUES (?,?,?,?,?)",
+            [(run_id, i, o.get("idx"), o.get("id"), o.get("op")) for i, o in enumerate(manifest.get("ops", []))],
+        )
+        artifacts: Dict[str, str] = {}
+        rows = []
+        for i, r in enumerate(prov):
+            if not isinstance(r, dict):
+                continue
+            model = r.get("model") or {}
+            rows.append(
+                (run_id, i, r.get("role"), model.get("name"), model.get("provider"), model.get("version"),
+                 r.get("prompt_id"), r.get("seed"), r.get("started"), r.get("ended"), r.get("notes"))
+            )
+            artifacts.update(r.get("hashes") or {})
+        db.executemany("INSERT INTO provenance VALUES (?,?,?,?,?,?,?,?,?,?,?)", rows)
+        db.executemany(
+            "INSERT INTO artifacts (run_id, path, sha256) VALUES (?,?,?)",
+            [(run_id, p, h) for p, h in sorted(artifacts.items())],
+        )
+    return True
+
+
+def record_run(run_dir: Path, path: Optional[Path] = None) -> None:
+    """Runner hook: (re)catalog one run."""
+    db = connect(path)
+    try:
+        index_run(db, run_dir)
+    finally:
+        db.close()
+
+
+def rebuild(db: sqlite3.Connection, runs_root: Path) -> int:
+    with db:
+        for table in _TABLES:
+            db.execute(f"DELETE FROM {table}")
+    n = 0
+    for rd in sorted(p for p in runs_root.glob("run_*") if p.is_dir()):
+        n += index_run(db, rd)
+    return n
+
+
+def query(
+    db: sqlite3.Connection,
+    *,
+    status: Optional[str] = None,
+    model: Optional[str] = None,
+    seed: Optional[int] = None,
+    prompt_id: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Runs matching every given filter, newest first."""
+    where: List[str] = []
+    params: List[Any] = []
+    if status:
+        where.append("r.status = ?")
+        params.append(status)
+    if since:
+        where.append("r.started_at >= ?")
+        params.append(since)
+    prov: List[str] = []
+    if model:
+        prov.append("p.model_name = ?")
+        params.append(model)
+    if seed is not None:
+        prov.append("p.seed = ?")
+        params.append(seed)
+    if prompt_id:
+        prov.append("p.prompt_id = ?")
+        params.append(prompt_id)
+    if prov:
+        where.append(f"r.run_id IN (SELECT p.run_id FROM provenance p WHERE {' AND '.join(prov)})")
+    sql = "SELECT run_id, workflow, status, started_at, finished_at FROM runs r"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY r.started_at DESC, r.run_id DESC LIMIT ?"
+    params.append(limit)
+    cols = ("run_id", "workflow", "status", "started_at", "finished_at")
+    return [dict(zip(cols, row)) for row in db.execute(sql, params)]
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description="Query or rebuild the run catalog")
+    ap.add_argument("--catalog", default=str(RUNS_ROOT / CATALOG_NAME))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("rebuild", help=f"Rebuild the catalog from {RUNS_ROOT}")
+    q = sub.add_parser("query", help="List runs matching all filters (newest first)")
+    q.add_argument("--status")
+    q.add_argument("--model")
+    q.add_argument("--seed", type=int)
+    q.add_argument("--prompt-id")
+    q.add_argument("--since", help="RFC3339 lower bound on started_at")
+    q.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    db = connect(Path(args.catalog))
+    try:
+        if args.cmd == "rebuild":
+            t0 = time.perf_counter()
+            n = rebuild(db, RUNS_ROOT)
+            print(f"[run_catalog] indexed {n} run(s) in {time.perf_counter() - t0:.2f}s")
+            return 0
+        for row in query(db, status=args.status, model=args.model, seed=args.seed, prompt_id=args.prompt_id,
+                         since=args.since, limit=args.limit):
+            print(json.dumps(row, ensure_ascii=False))
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""
+Shared, in-process schema registry for AWO scripts.
+
+Each schema file under schemas/ is read once, checked once, and compiled
+into a jsonschema validator that is cached by the SHA-256 of the schema
+content. Callers validate through the cached validator instead of
+jsonschema.validate(), which re-checks the schema and builds a fresh
+validator on every call.
+
+Lookups are keyed by (name, root) and touch no files once a schema is bound;
+the file's mtime/size is re-checked only by preload() (once per run in
+awo_run.py), reload() and clear(), so an edited schema is picked up at the
+next of those, not mid-run.
+
+    from schema_registry import get_validator
+    get_validator("run_manifest.schema.json").validate(manifest)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+REPO_ROOT = Path(os.getenv("GITHUB_WORKSPACE", Path.cwd())).resolve()
+SCHEMAS_ROOT = (REPO_ROOT / "schemas").resolve()
+
+# path -> (mtime_ns, size, sha256, schema)
+_SCHEMAS: Dict[Path, Tuple[int, int, str, Dict[str, Any]]] = {}
+# (name, root) -> (sha256, schema); the lookup hot path, no filesystem calls
+_BOUND: Dict[Tuple[str, Optional[Path]], Tuple[str, Dict[str, Any]]] = {}
+# (sha256, format_checking) -> compiled validator
+_VALIDATORS: Dict[Tuple[str, bool], Any] = {}
+
+
+def _schema_path(name: str, root: Optional[Path]) -> Path:
+    return ((root or SCHEMAS_ROOT) / name).resolve()
+
+
+def _load(path: Path) -> Tuple[str, Dict[str, Any]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Schema not found: {path}")
+    hit = _SCHEMAS.get(path)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2], hit[3]
+    raw = path.read_bytes()
+    try:
+        schema = json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        raise RuntimeError(f"Invalid JSON in schema {path}: {e}")
+    digest = hashlib.sha256(raw).hexdigest()
+    _SCHEMAS[path] = (st.st_mtime_ns, st.st_size, digest, schema)
+    return digest, schema
+
+
+def _bound(name: str, root: Optional[Path]) -> Tuple[str, Dict[str, Any]]:
+    key = (name, root)
+    hit = _BOUND.get(key)
+    if hit is None:
+        hit = _BOUND[key] = _load(_schema_path(name, root))
+    return hit
+
+
+def load_schema(name: str, *, root: Optional[Path] = None) -> Dict[str, Any]:
+    """Return the parsed schema (cached)."""
+    return _bound(name, root)[1]
+
+
+def schema_digest(name: str, *, root: Optional[Path] = None) -> str:
+    """SHA-256 of the schema file content (the validator cache key)."""
+    return _bound(name, root)[0]
+
+
+def get_validator(name: str, *, root: Optional[Path] = None, format_checking: bool = False) -> Any:
+    """Return a compiled validator for schemas/<name>, built at most once per content."""
+    digest, schema = _bound(name, root)
+    key = (digest, format_checking)
+    v = _VALIDATORS.get(key)
+    if v is None:
+        from jsonschema import validators
+
+        cls = validators.validator_for(schema)
+        cls.check_schema(schema)
+        v = cls(schema, format_checker=cls.FORMAT_CHECKER if format_checking else None)
+        _VALIDATORS[key] = v
+    return v
+
+
+def preload(*names: str, root: Optional[Path] = None, format_checking: bool = False) -> None:
+    """Warm the cache, e.g. before forking workers; re-checks these schemas' files."""
+    for name in names:
+        _BOUND.pop((name, root), None)
+        get_validator(name, root=root, format_checking=format_checking)
+
+
+def reload() -> None:
+    """Re-check every schema file at its next lookup; unchanged files are not re-read."""
+    _BOUND.clear()
+
+
+def clear() -> None:
+    _SCHEMAS.clear()
+    _BOUND.clear()
+    _VALIDATORS.clear()
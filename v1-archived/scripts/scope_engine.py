@@ -0,0 +1,296 @@
+"""
+Scope validation engine for the scope_validate op.
+
+Claims come from args.claim (inline) and args.claims_glob (files under the
+repo root, taken in sorted path order). File claims are parsed and checked
+in a process pool once the corpus is large enough to pay for it; with
+args.schema, each claim is also validated against schemas/claim.schema.json
+(or the named schema) through one compiled validator per worker process.
+
+scope/summary.json keeps its original layout and key order.
+scope/claims/<id>.json holds the bytes of the source file rather than a
+re-serialized copy. It is reflinked when the file system allows and copied
+otherwise, never hardlinked, so later edits to the source cannot change a
+recorded artifact. Inline claims are serialized as before.
+
+Results for claim files are remembered in a persistent index (by default
+runs/.scope_index) keyed by file content hash, check version and schema
+digest, so unchanged claims are not re-validated. Each summary detail says
+whether its result is "fresh" or "cached", and the summary records the
+digest of the index that was trusted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import schema_registry
+
+REQUIRED_CLAIM_FIELDS = ["id", "statement"]
+DEFAULT_CLAIM_SCHEMA = "claim.schema.json"
+
+# Below this many claim files the pool costs more than it saves.
+POOL_MIN_FILES = 64
+
+_FICLONE = 0x40049409  # linux/fs.h
+
+# Bump when problems_for_claim/check_claim change, so cached results are not reused.
+CHECKS_VERSION = 1
+SCOPE_INDEX_MAX_ENTRIES = int(os.getenv("AWO_SCOPE_INDEX_MAX_ENTRIES", "200000"))
+
+# (claim id, problems) or, for an unreadable file, (None, [error])
+Result = Tuple[Optional[str], List[str]]
+
+
+def problems_for_claim(claim: Dict[str, Any]) -> List[str]:
+    probs: List[str] = []
+    for f in REQUIRED_CLAIM_FIELDS:
+        if f not in claim or claim[f] in (None, "", []):
+            probs.append(f"missing field: {f}")
+    preds = claim.get("predictions", [])
+    tests = claim.get("falsification_tests", [])
+    if not preds and not tests:
+        probs.append("claim is not testable: no predictions and no falsification_tests")
+    for i, p in enumerate(preds or []):
+        tol = (p or {}).get("tolerance")
+        if not tol:
+            probs.append(f"prediction[{i}] missing tolerance")
+    for i, t in enumerate(tests or []):
+        if not isinstance(t, dict) or not any(k in t for k in ("must_pass", "fail_if")):
+            probs.append(f"falsification_tests[{i}] missing must_pass/fail_if")
+    return probs
+
+
+def schema_problems(claim: Any, validator: Any) -> List[str]:
+    errs = sorted(validator.iter_errors(claim), key=lambda e: [str(x) for x in e.absolute_path])
+    return [f"schema: /{'/'.join(str(x) for x in e.absolute_path)}: {e.message}" for e in errs]
+
+
+def claim_id(claim: Dict[str, Any]) -> str:
+    return claim.get("id") or f"claim-{hashlib.sha256(json.dumps(claim, ensure_ascii=False).encode('utf-8')).hexdigest()[:12]}"
+
+
+def check_claim(claim: Any, validator: Any = None) -> Result:
+    if not isinstance(claim, dict):
+        return None, [f"claim is not a JSON object: {type(claim).__name__}"]
+    probs = problems_for_claim(claim)
+    if validator is not None:
+        probs += schema_problems(claim, validator)
+    return claim_id(claim), probs
+
+
+# ------------------------------ worker side ----------------------------------
+_WORKER_VALIDATOR: Any = None
+
+
+def _init_worker(schema: Optional[str], schemas_root: Optional[str]) -> None:
+    global _WORKER_VALIDATOR
+    _WORKER_VALIDATOR = (
+        schema_registry.get_validator(schema, root=Path(schemas_root) if schemas_root else None) if schema else None
+    )
+
+
+def _check_file(path: str) -> Result:
+    try:
+        with open(path, "rb") as f:
+            claim = json.loads(f.read().decode("utf-8"))
+    except Exception as e:
+        return None, [f"failed to parse {path}: {e}"]
+    return check_claim(claim, _WORKER_VALIDATOR)
+
+
+def _check_files(
+    paths: List[str], *, schema: Optional[str], schemas_root: Optional[str], workers: Optional[int]
+) -> Iterator[Result]:
+    """Results in input order; parallel for large inputs."""
+    _init_worker(schema, schemas_root)  # warm the registry before forking, and for the inline path
+    if len(paths) < POOL_MIN_FILES or workers == 1:
+        yield from map(_check_file, paths)
+        return
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema, schemas_root)) as pool:
+        yield from pool.map(_check_file, paths, chunksize=chunk)
+
+
+# ------------------------------ parent side ----------------------------------
+def clone_file(src: Path, dst: Path) -> None:
+    """Reflink src to dst where the file system supports it, else copy (replacing dst).
+
+    Both give dst its own data: unlike a hardlink, editing src afterwards
+    leaves dst unchanged.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        import fcntl
+
+        with open(src, "rb") as s, open(tmp, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    except (ImportError, OSError):
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class ScopeIndex:
+    """
+    Persistent claim-content-hash -> result map shared by runs.
+
+    Entries: key -> [claim id, problems, last used (unix seconds)]. Saved
+    atomically and trimmed to the most recently used entries.
+    """
+
+    def __init__(self, path: Path, *, max_entries: int = SCOPE_INDEX_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: Dict[str, List[Any]] = {}
+        self.digest: Optional[str] = None  # sha256 of the index as loaded
+        self.hits = 0
+        self.misses = 0
+        try:
+            raw = path.read_bytes()
+            data = json.loads(raw.decode("utf-8"))
+            if data.get("version") == 1:
+                self.entries = dict(data["entries"])
+                self.digest = hashlib.sha256(raw).hexdigest()
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    @staticmethod
+    def key(content_sha: str, schema_digest: Optional[str]) -> str:
+        return f"{content_sha}:{schema_digest or '-'}:v{CHECKS_VERSION}"
+
+    def get(self, key: str) -> Optional[Result]:
+        e = self.entries.get(key)
+        if e is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        e[2] = int(time.time())
+        return e[0], list(e[1])
+
+    def put(self, key: str, cid: str, problems: List[str]) -> None:
+        self.entries[key] = [cid, problems, int(time.time())]
+
+    def save(self) -> None:
+        if len(self.entries) > self.max_entries:
+            keep = sorted(self.entries.items(), key=lambda kv: kv[1][2], reverse=True)[: self.max_entries]
+            self.entries = dict(keep)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"version": 1, "entries": self.entries}, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def _claim_paths(repo_root: Path, glob: Optional[str]) -> List[Path]:
+    return sorted(p for p in repo_root.glob(glob) if p.is_file()) if glob else []
+
+
+def validate_claims(
+    args: Dict[str, Any],
+    *,
+    repo_root: Path,
+    scope_dir: Path,
+    schemas_root: Optional[Path] = None,
+    write_json: Optional[Callable[[Path, Any], bytes]] = None,
+    copy_claim: Optional[Callable[[Path, Path], None]] = None,
+    index_path: Optional[Path] = None,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Run scope validation for one step; returns (summary, sha256 of summary.json).
+
+    write_json(path, obj) writes inline claims and summary.json and returns
+    the bytes written; copy_claim(src, dst) places a claim file (default:
+    clone_file). The runner passes its step buffer for both, so
+    nothing reaches the run directory before the step is committed.
+    index_path enables the result index unless args.index is false.
+    """
+    write_json = write_json or _write_json
+    copy_claim = copy_claim or clone_file
+    schema = args.get("schema")
+    if schema is True:
+        schema = DEFAULT_CLAIM_SCHEMA
+    root_s = str(schemas_root) if schemas_root else None
+    claims_dir = scope_dir / "claims"
+
+    details: List[Dict[str, Any]] = []
+    notes: List[str] = []
+    overall_ok = True
+
+    index = ScopeIndex(index_path) if index_path is not None and args.get("index", True) else None
+    schema_digest = schema_registry.schema_digest(schema, root=schemas_root) if schema else None
+
+    def _add(cid: str, problems: List[str], result: str = "fresh") -> None:
+        nonlocal overall_ok
+        ok = not problems
+        overall_ok = overall_ok and ok
+        details.append({"id": cid, "ok": ok, "problems": problems, "result": result})
+
+    inline = args.get("claim")
+    if isinstance(inline, dict):
+        validator = schema_registry.get_validator(schema, root=schemas_root) if schema else None
+        cid, problems = check_claim(inline, validator)
+        write_json(claims_dir / f"{cid}.json", inline)
+        _add(cid, problems)
+
+    paths = _claim_paths(repo_root, args.get("claims_glob"))
+    keys: List[Optional[str]] = [None] * len(paths)
+    cached: List[Optional[Result]] = [None] * len(paths)
+    if index is not None:
+        for i, p in enumerate(paths):
+            try:
+                keys[i] = ScopeIndex.key(hashlib.sha256(p.read_bytes()).hexdigest(), schema_digest)
+            except OSError:
+                continue  # let the checker report it
+            cached[i] = index.get(keys[i])
+    fresh: Iterator[Result] = iter(
+        _check_files(
+            [str(p) for p, c in zip(paths, cached) if c is None],
+            schema=schema,
+            schemas_root=root_s,
+            workers=args.get("workers"),
+        )
+    )
+    for p, key, hit in zip(paths, keys, cached):
+        cid, problems = hit if hit is not None else next(fresh)
+        if cid is None:
+            notes.extend(problems)
+            continue
+        if hit is None and index is not None and key is not None:
+            index.put(key, cid, problems)
+        copy_claim(p, claims_dir / f"{cid}.json")
+        _add(cid, problems, "cached" if hit is not None else "fresh")
+    if index is not None:
+        index.save()
+
+    summary: Dict[str, Any] = {
+        "claims_checked": len(details),
+        "overall_ok": overall_ok,
+        "details": details,
+        "notes": notes,
+        "ts": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    if index is not None:
+        summary["scope_index"] = {
+            "digest": f"sha256:{index.digest}" if index.digest else None,
+            "cached": sum(d["result"] == "cached" for d in details),
+            "fresh": sum(d["result"] == "fresh" for d in details),
+        }
+    data = write_json(scope_dir / "summary.json", summary)
+    return summary, hashlib.sha256(data).hexdigest()
+
+
+def _write_json(path: Path, obj: Any) -> bytes:
+    data = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return data
@@ -0,0 +1,133 @@
+"""
+Dependency inference and level scheduling for workflow steps.
+
+Edges come from the fields the runner already reads:
+  - inputs_from            (consensus_vote; str or list)
+  - args.from_step         (write_text, assert_contains)
+  - depends_on             (any step; list of ids, per workflow_schema.json)
+plus two implicit rules taken from the op registry's hooks (op_registry):
+  - a barrier op (audit_gate) depends on every earlier step and every later
+    step depends on it;
+  - steps writing the same resource (scope/summary.json, the same write_text
+    path, a sweep artifact) run in list order.
+Without a registry only the explicit edges apply.
+
+A reference only counts if it names an earlier step, which keeps list-order
+semantics (a forward reference still fails at run time, as it always has).
+Steps are (step_idx, step) pairs, as enumerated by awo_run.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# op_registry is shared with the package (core/op_registry.py)
+_CORE = str(Path(__file__).resolve().parents[1] / "core")
+if _CORE not in sys.path:
+    sys.path.append(_CORE)
+
+from op_registry import OpRegistry  # noqa: E402
+
+Step = Tuple[int, Dict[str, Any]]
+
+
+def step_id(idx: int, step: Dict[str, Any]) -> str:
+    return step.get("id", f"step_{idx}")
+
+
+def _refs(step: Dict[str, Any]) -> List[str]:
+    out: List[str] = []
+    src = step.get("inputs_from")
+    if isinstance(src, str):
+        out.append(src)
+    elif isinstance(src, list):
+        out.extend(s for s in src if isinstance(s, str))
+    args = step.get("args") or {}
+    if isinstance(args, dict) and isinstance(args.get("from_step"), str):
+        out.append(args["from_step"])
+    out.extend(d for d in step.get("depends_on") or [] if isinstance(d, str))
+    return out
+
+
+def dependencies(steps: List[Step], ops: Optional[OpRegistry] = None) -> Dict[int, Set[int]]:
+    """step_idx -> indices of earlier steps it must wait for."""
+    deps: Dict[int, Set[int]] = {}
+    by_id: Dict[str, int] = {}
+    by_resource: Dict[str, int] = {}
+    seen: List[int] = []
+    barrier: Optional[int] = None
+    for idx, step in steps:
+        d: Set[int] = set()
+        for ref in _refs(step):
+            if ref in by_id:
+                d.add(by_id[ref])
+        res = ops.resource(step) if ops is not None else None
+        if res is not None and res in by_resource:
+            d.add(by_resource[res])
+        if barrier is not None:
+            d.add(barrier)
+        if ops is not None and ops.is_barrier(step):
+            d.update(seen)
+            barrier = idx
+        deps[idx] = d
+        by_id[step_id(idx, step)] = idx
+        if res is not None:
+            by_resource[res] = idx
+        seen.append(idx)
+    return deps
+
+
+def levels(
+    steps: List[Step], deps: Optional[Dict[int, Set[int]]] = None, ops: Optional[OpRegistry] = None
+) -> List[List[Step]]:
+    """Group steps into levels; every step's dependencies sit in earlier levels."""
+    deps = dependencies(steps, ops) if deps is None else deps
+    level_of: Dict[int, int] = {}
+    out: List[List[Step]] = []
+    for idx, step in steps:  # list order is a topological order (deps point backwards)
+        lv = 1 + max((level_of[d] for d in deps[idx]), default=-1)
+        level_of[idx] = lv
+        while len(out) <= lv:
+            out.append([])
+        out[lv].append((idx, step))
+    return out
+
+
+def critical_path(
+    steps: List[Step], deps: Optional[Dict[int, Set[int]]] = None, ops: Optional[OpRegistry] = None
+) -> List[int]:
+    """Longest dependency chain (by step count), ties broken toward lower indices."""
+    deps = dependencies(steps, ops) if deps is None else deps
+    best: Dict[int, Tuple[int, Optional[int]]] = {}
+    for idx, _ in steps:
+        length, prev = 1, None
+        for d in sorted(deps[idx]):
+            if best[d][0] + 1 > length:
+                length, prev = best[d][0] + 1, d
+        best[idx] = (length, prev)
+    if not best:
+        return []
+    tail = max(best, key=lambda i: (best[i][0], -i))
+    path: List[int] = []
+    cur: Optional[int] = tail
+    while cur is not None:
+        path.append(cur)
+        cur = best[cur][1]
+    return path[::-1]
+
+
+def format_plan(steps: List[Step], ops: Optional[OpRegistry] = None) -> List[str]:
+    deps = dependencies(steps, ops)
+    lv = levels(steps, deps)
+    ids = {idx: step_id(idx, step) for idx, step in steps}
+    lines = [f"{len(steps)} step(s), {len(lv)} level(s), widest level: {max((len(l) for l in lv), default=0)}"]
+    for n, level in enumerate(lv, 1):
+        lines.append(f"L{n}:")
+        for idx, step in level:
+            after = ", ".join(ids[d] for d in sorted(deps[idx]))
+            lines.append(f"  [{idx:02d}] {ids[idx]} ({step.get('op')})" + (f" <- {after}" if after else ""))
+    cp = critical_path(steps, deps)
+    lines.append(f"critical path ({len(cp)}): " + " -> ".join(ids[i] for i in cp))
+    return lines
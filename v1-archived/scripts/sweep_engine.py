@@ -0,0 +1,237 @@
+"""
+Grid expansion, batched dispatch and the output artifact for sweep_generate.
+
+A sweep is prompts x models x params:
+
+  prompts  every `templates` entry rendered with every combination of `vars`
+           (str.format placeholders; templates are used verbatim without vars)
+  models   backend aliases
+  params   `params` (base dict) overlaid with every combination of `grid`
+
+Cells are ordered prompt-major, then model, then params. Generations are
+grouped by (model, params) into chunks of `batch_size` prompts, each sent to
+the backend's generate_batch() in one call; chunks run on a bounded thread
+pool. executor="async" instead awaits agenerate() per cell on one event loop.
+
+The artifact is dictionary-encoded JSONL: a header line holding the column
+names and the prompt/model/params tables, then one array per generation
+referencing them by index, so a 1000-cell sweep does not repeat its prompts
+a thousand times and can be read back row by row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# backend_calls is shared with the package (core/backend_calls.py)
+_CORE = str(Path(__file__).resolve().parents[1] / "core")
+if _CORE not in sys.path:
+    sys.path.append(_CORE)
+
+import backend_calls  # noqa: E402
+import deadline_pool  # noqa: E402
+
+SWEEP_FORMAT = "awo.sweep.v1"
+COLUMNS = ["prompt", "model", "params", "text", "meta", "cached"]
+DEFAULT_BATCH_SIZE = 32
+
+Cell = Tuple[int, int, int]  # (prompt index, model index, params index)
+Generated = Tuple[Dict[str, Any], str, str]  # (output, started, ended)
+
+
+class SweepError(ValueError):
+    pass
+
+
+class SweepTimeout(RuntimeError):
+    def __init__(self, model: str, timeout_s: float) -> None:
+        super().__init__(f"model '{model}' timed out after {timeout_s}s")
+        self.model = model
+        self.timeout_s = timeout_s
+
+
+def _ts() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _combinations(grid: Dict[str, Any], what: str) -> List[Dict[str, Any]]:
+    for k, v in grid.items():
+        if not isinstance(v, list) or not v:
+            raise SweepError(f"{what} '{k}' must be a non-empty list")
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def render_prompts(templates: Sequence[str], variables: Optional[Dict[str, Any]]) -> List[str]:
+    if not templates:
+        raise SweepError("no templates")
+    if not variables:
+        return [str(t) for t in templates]
+    out: List[str] = []
+    for i, t in enumerate(templates):
+        for combo in _combinations(variables, "vars"):
+            try:
+                out.append(str(t).format_map(combo))
+            except (KeyError, IndexError, ValueError) as e:
+                raise SweepError(f"templates[{i}]: cannot render ({type(e).__name__}: {e})")
+    return out
+
+
+def param_grid(base: Optional[Dict[str, Any]], grid: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    if not grid:
+        return [dict(base or {})]
+    return [{**(base or {}), **combo} for combo in _combinations(grid, "grid")]
+
+
+def cells(n_prompts: int, n_models: int, n_params: int) -> List[Cell]:
+    return list(itertools.product(range(n_prompts), range(n_models), range(n_params)))
+
+
+# --------------------------------- dispatch ----------------------------------
+def _generate_chunk(backend: Any, prompts: List[str], params: Dict[str, Any]) -> List[Generated]:
+    started = _ts()
+    fn = getattr(backend, "generate_batch", None)
+    outs = fn(prompts, params=params) if fn is not None else [backend.generate(p, params=params) for p in prompts]
+    if len(outs) != len(prompts):
+        raise SweepError(f"generate_batch returned {len(outs)} outputs for {len(prompts)} prompts")
+    ended = _ts()
+    return [(o, started, ended) for o in outs]
+
+
+async def _dispatch_async(
+    backends: Dict[str, Any],
+    calls: List[Tuple[str, str, Dict[str, Any]]],
+    *,
+    max_concurrency: int,
+    timeout_s: Optional[float],
+) -> List[Generated]:
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(model: str, prompt: str, params: Dict[str, Any]) -> Generated:
+        async with sem:
+            started = _ts()
+            try:
+                out = await asyncio.wait_for(backend_calls.agenerate(backends[model], prompt, params=params), timeout_s)
+            except asyncio.TimeoutError:
+                raise SweepTimeout(model, timeout_s or 0.0)
+            return out, started, _ts()
+
+    return list(await asyncio.gather(*(_one(*c) for c in calls)))
+
+
+def dispatch(
+    backends: Dict[str, Any],
+    calls: List[Tuple[str, str, Dict[str, Any]]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = 1,
+    executor: str = "thread",
+    timeout_s: Optional[float] = None,
+) -> List[Generated]:
+    """
+    Generate every (model, prompt, params) call; results in `calls` order.
+
+    Calls sharing a model and params (compared by canonical JSON) are sent
+    as batches of up to batch_size prompts. timeout_s bounds each batch
+    from the moment a worker starts it (thread) or each call (async).
+    """
+    if not calls:
+        return []
+    if executor == "async":
+        return asyncio.run(_dispatch_async(backends, calls, max_concurrency=max_concurrency, timeout_s=timeout_s))
+    if executor != "thread":
+        raise SweepError(f"unsupported executor '{executor}' (expected 'thread' or 'async')")
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, (model, _, params) in enumerate(calls):
+        groups.setdefault((model, json.dumps(params, sort_keys=True)), []).append(i)
+    chunks = [
+        idx[k:k + max(1, batch_size)]
+        for idx in groups.values()
+        for k in range(0, len(idx), max(1, batch_size))
+    ]
+
+    def _run(chunk: List[int]) -> List[Generated]:
+        model, _, params = calls[chunk[0]]
+        return _generate_chunk(backends[model], [calls[i][1] for i in chunk], params)
+
+    results: List[Optional[Generated]] = [None] * len(calls)
+    if max_concurrency <= 1 and timeout_s is None:
+        for chunk in chunks:
+            for i, g in zip(chunk, _run(chunk)):
+                results[i] = g
+        return results  # type: ignore[return-value]
+
+    try:
+        batches = deadline_pool.map_with_deadlines(
+            _run,
+            chunks,
+            max_workers=min(max_concurrency, len(chunks)),
+            timeout_for=lambda i: timeout_s,
+            thread_name_prefix="awo-sweep",
+        )
+    except deadline_pool.DeadlineExceeded as e:
+        raise SweepTimeout(calls[chunks[e.index][0]][0], e.timeout_s)
+    for chunk, generated in zip(chunks, batches):
+        for i, g in zip(chunk, generated):
+            results[i] = g
+    return results  # type: ignore[return-value]
+
+
+# --------------------------------- artifact ----------------------------------
+def encode_rows(
+    prompts: Sequence[str],
+    models: Sequence[str],
+    params_list: Sequence[Dict[str, Any]],
+    rows: Sequence[Tuple[Cell, Dict[str, Any], bool]],
+) -> bytes:
+    """Header line, then [prompt, model, params, text, meta, cached] per generation (indices into the header)."""
+    header = {
+        "format": SWEEP_FORMAT,
+        "columns": COLUMNS,
+        "prompts": list(prompts),
+        "models": list(models),
+        "params": list(params_list),
+        "rows": len(rows),
+    }
+    lines = [json.dumps(header, ensure_ascii=False)]
+    for (p, m, q), out, cached in rows:
+        lines.append(json.dumps([p, m, q, out.get("text", ""), out.get("meta", {}), cached], ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _decode(lines: Iterator[str]) -> Iterator[Tuple[Dict[str, Any], List[Any]]]:
+    """(header, [prompt, model, params, text, meta, cached]) per row, indices not yet resolved."""
+    header = json.loads(next(lines))
+    if header.get("format") != SWEEP_FORMAT:
+        raise SweepError(f"not a {SWEEP_FORMAT} artifact")
+    for line in lines:
+        if line.strip():
+            yield header, json.loads(line)
+
+
+def read_rows(lines: Iterator[str]) -> Iterator[Dict[str, Any]]:
+    """Decode an artifact back into {"prompt", "model", "params", "text", "meta", "cached"} dicts."""
+    for header, (p, m, q, text, meta, cached) in _decode(lines):
+        yield {
+            "prompt": header["prompts"][p],
+            "model": header["models"][m],
+            "params": header["params"][q],
+            "text": text,
+            "meta": meta,
+            "cached": cached,
+        }
+
+
+def read_outputs(lines: Iterator[str]) -> List[Dict[str, Any]]:
+    """The outputs sweep_generate hands to later steps, rebuilt from its artifact (resume)."""
+    return [
+        {"model": header["models"][m], "text": text, "meta": meta, "prompt_index": p, "params_index": q}
+        for header, (p, m, q, text, meta, _) in _decode(lines)
+    ]
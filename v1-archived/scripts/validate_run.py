@@ -21,22 +21,26 @@ def main():
         die(f"Run dir not found: {run_dir}")
 
     try:
-        from jsonschema import Draft202012Validator as Validator
+        import jsonschema  # noqa: F401
     except Exception:
         die("jsonschema not installed. Add 'pip install jsonschema' before running.")
+    from schema_registry import get_validator
 
     man = load_json(run_dir / "run_manifest.json")
     prov = load_json(run_dir / "provenance.json")
-    man_schema = load_json(schemas / "run_manifest.schema.json")
-    prov_schema = load_json(schemas / "provenance.schema.json")
+    try:
+        man_validator = get_validator("run_manifest.schema.json", root=schemas)
+        prov_validator = get_validator("provenance.schema.json", root=schemas)
+    except Exception as e:
+        die(f"Failed to load schemas from {schemas}: {e}")
 
-    Validator(man_schema).validate(man)
+    man_validator.validate(man)
     if not isinstance(prov, list):
         die("provenance.json must be a list")
 
     for i, rec in enumerate(prov):
         try:
-            Validator(prov_schema).validate(rec)
+            prov_validator.validate(rec)
         except Exception as e:
             die(f"Provenance record {i} invalid: {e}")
 
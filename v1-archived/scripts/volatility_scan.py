@@ -0,0 +1,159 @@
+"""
+Volatility / timestamp-normalization scanner for run documents.
+
+Walks a JSON document iteratively (explicit stack, no recursion) and reports
+the same problems, in the same order, as the recursive scan() that
+awo_validate.py used to define inline:
+
+  volatile:<path>       a volatile key (pid, hostname, ...) with a non-empty value
+  bad_ts:<path>=<val>   a string under a *time/*timestamp/*at/*started/*finished
+                        key that is not an RFC 3339 UTC timestamp
+
+Paths (`a.b[3].c`) are only built for problems; the clean path allocates
+nothing per key. Key-suffix matches are decided once per distinct key.
+
+scan_file() streams the file through ijson when it is installed, so large
+step records are never fully materialized; otherwise it falls back to
+json.load plus the iterative walk.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:  # optional: streaming parse of large step documents
+    import ijson
+except ImportError:  # pragma: no cover - exercised when ijson is absent
+    ijson = None
+
+VOLATILE_KEYS = frozenset({"pid", "hostname", "container_id", "pod_uid", "instance_id"})
+TS_KEY_SUFFIXES = ("time", "timestamp", "at", "started", "finished")
+TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?Z$")
+
+_KEY_MEMO_MAX = 65536
+_CONTAINER_START = frozenset({"start_map", "start_array"})
+
+
+def _format_path(labels: Iterable[Any]) -> str:
+    path = ""
+    for label in labels:
+        if isinstance(label, int):
+            path = f"{path}[{label}]"
+        else:
+            path = f"{path}.{label}" if path else label
+    return path
+
+
+class VolatilityScanner:
+    def __init__(
+        self,
+        volatile_keys: Iterable[str] = VOLATILE_KEYS,
+        ts_suffixes: Tuple[str, ...] = TS_KEY_SUFFIXES,
+        ts_re: "re.Pattern[str]" = TS_RE,
+    ) -> None:
+        self.volatile_keys = frozenset(volatile_keys)
+        self.ts_suffixes = tuple(ts_suffixes)
+        self._ts_match = ts_re.match
+        self._ts_key_memo: Dict[str, bool] = {}
+
+    def _is_ts_key(self, key: str) -> bool:
+        hit = self._ts_key_memo.get(key)
+        if hit is None:
+            hit = key.lower().endswith(self.ts_suffixes)
+            if len(self._ts_key_memo) < _KEY_MEMO_MAX:
+                self._ts_key_memo[key] = hit
+        return hit
+
+    # ------------------------------ in-memory --------------------------------
+    def scan(self, obj: Any) -> Iterator[str]:
+        """Problems in a parsed document, depth-first in document order."""
+        if not isinstance(obj, (dict, list)):
+            return
+        vol = self.volatile_keys
+        is_ts_key = self._is_ts_key
+        ts_match = self._ts_match
+        # frame: [is_dict, child iterator, current label]; labels form the path on demand
+        stack: List[List[Any]] = [[isinstance(obj, dict), iter(obj.items() if isinstance(obj, dict) else enumerate(obj)), None]]
+        while stack:
+            frame = stack[-1]
+            if frame[0]:
+                for label, v in frame[1]:
+                    if label in vol and v is not None and v != "":
+                        frame[2] = label
+                        yield f"volatile:{_format_path(f[2] for f in stack)}"
+                    if isinstance(v, str):
+                        if is_ts_key(label) and not ts_match(v):
+                            frame[2] = label
+                            yield f"bad_ts:{_format_path(f[2] for f in stack)}={v}"
+                    elif isinstance(v, dict):
+                        if v:
+                            frame[2] = label
+                            stack.append([True, iter(v.items()), None])
+                            break
+                    elif isinstance(v, list) and v:
+                        frame[2] = label
+                        stack.append([False, enumerate(v), None])
+                        break
+                else:
+                    stack.pop()
+            else:
+                # list elements carry no keys: only descend into non-empty containers
+                for label, v in frame[1]:
+                    if v and isinstance(v, (dict, list)):
+                        frame[2] = label
+                        stack.append([isinstance(v, dict), iter(v.items()) if isinstance(v, dict) else enumerate(v), None])
+                        break
+                else:
+                    stack.pop()
+
+    # ------------------------------ streaming --------------------------------
+    def scan_events(self, events: Iterable[Tuple[str, Any]]) -> Iterator[str]:
+        """Problems from ijson.basic_parse-style (event, value) pairs."""
+        vol = self.volatile_keys
+        is_ts_key = self._is_ts_key
+        ts_match = self._ts_match
+        # frame: [is_dict, current key or index]
+        stack: List[List[Any]] = []
+        for ev, val in events:
+            if ev == "map_key":
+                stack[-1][1] = val
+                continue
+            if ev == "end_map" or ev == "end_array":
+                stack.pop()
+                continue
+            if stack:
+                top = stack[-1]
+                if top[0]:
+                    k = top[1]
+                    if k in vol and (ev in _CONTAINER_START or (val is not None and val != "")):
+                        yield f"volatile:{_format_path(f[1] for f in stack)}"
+                    if ev == "string" and is_ts_key(k) and not ts_match(val):
+                        yield f"bad_ts:{_format_path(f[1] for f in stack)}={val}"
+                else:
+                    top[1] += 1
+            if ev == "start_map":
+                stack.append([True, None])
+            elif ev == "start_array":
+                stack.append([False, -1])
+
+    def scan_file(self, path: Path) -> Iterator[str]:
+        """Problems in a JSON file; parse errors propagate to the caller."""
+        if ijson is None:
+            with path.open("r", encoding="utf-8") as f:
+                yield from self.scan(json.load(f))
+            return
+        with path.open("rb") as f:
+            yield from self.scan_events(ijson.basic_parse(f))
+
+
+_DEFAULT: Optional[VolatilityScanner] = None
+
+
+def default_scanner() -> VolatilityScanner:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = VolatilityScanner()
+    return _DEFAULT
@@ -0,0 +1,34 @@
+"""
+Shared test setup.
+
+The runner scripts import each other as top-level modules (they are run as
+`python scripts/<name>.py`), so the tests put scripts/ on sys.path the same
+way (plus core/, for op_registry); REPO is the package root (schemas/, workflows/).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "scripts"))
+sys.path.append(str(REPO / "core"))  # op_registry
+
+
+@pytest.fixture
+def awo_ws(tmp_path, monkeypatch):
+    """An awo_run workspace: runs/ and workflows under tmp_path, the repo's schemas."""
+    import awo_run
+
+    monkeypatch.setattr(awo_run, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(awo_run, "RUNS_ROOT", tmp_path / "runs")
+    monkeypatch.setattr(awo_run, "SCHEMAS_ROOT", REPO / "schemas")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_workflow(ws: Path, steps, name: str = "wf.json") -> str:
+    (ws / name).write_text(json.dumps({"steps": steps}), encoding="utf-8")
+    return name
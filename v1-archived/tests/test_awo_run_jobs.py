@@ -0,0 +1,95 @@
+"""awo_run --jobs: step-ordered commits, and no trace of steps dropped after a failure."""
+
+import json
+
+import awo_run
+from conftest import write_workflow
+
+GEN = {"id": "gen", "op": "fanout_generate", "prompt": "hello world", "models": ["echo", "upper"]}
+FAILING_CHECK = {"id": "check", "op": "assert_contains", "args": {"from_step": "gen", "must_include": ["absent-token"]}}
+
+
+def _run(ws, steps, *, jobs):
+    run_dir = awo_run.ensure_run_dir()
+    code = awo_run.run(write_workflow(ws, steps), cache_mode="off", jobs=jobs, run_dir=run_dir)
+    awo_run.release_writer(run_dir)
+    return code, run_dir
+
+
+def _files(run_dir):
+    return sorted(str(p.relative_to(run_dir)) for p in run_dir.rglob("*") if p.is_file())
+
+
+def _load(run_dir, name):
+    return json.loads((run_dir / name).read_text(encoding="utf-8"))
+
+
+def test_failure_drops_uncommitted_artifacts(awo_ws):
+    # `note` is independent of `gen`, so with --jobs it runs in the first level,
+    # before `check` fails; it must not leave anything behind.
+    steps = [GEN, FAILING_CHECK, {"id": "note", "op": "write_text", "args": {"path": "out.txt", "text": "independent"}}]
+    code, run_dir = _run(awo_ws, steps, jobs=4)
+
+    assert code == int(awo_run.ExitCode.ERROR)
+    assert not (run_dir / "artifacts" / "out.txt").exists()
+    assert not list((run_dir / "steps").glob("*_note.json"))
+    assert [op["id"] for op in _load(run_dir, "run_manifest.json")["ops"]][-2:] == ["check", "check"]
+    prov = _load(run_dir, "provenance.json")
+    assert all("artifacts/out.txt" not in " ".join(r["artifacts"]) for r in prov)
+    assert _load(run_dir, "steps/05_check.json")["error"] == "fatal"
+
+
+def test_failure_drops_uncommitted_scope_output(awo_ws):
+    claim = {"id": "c1", "statement": "s", "predictions": [{"name": "p"}]}
+    steps = [GEN, FAILING_CHECK, {"id": "scope", "op": "scope_validate", "args": {"claim": claim, "index": False}}]
+    code, run_dir = _run(awo_ws, steps, jobs=4)
+
+    assert code == int(awo_run.ExitCode.ERROR)
+    assert not (run_dir / "scope").exists()
+    assert not list((run_dir / "steps").glob("*_scope.json"))
+
+
+def test_jobs_match_sequential_run(awo_ws):
+    steps = [
+        {"id": "a", "op": "fanout_generate", "prompt": "alpha", "models": ["echo", "upper", "reverse"]},
+        {"id": "b", "op": "fanout_generate", "prompt": "beta", "models": ["echo", "echo"]},
+        {"id": "vote_a", "op": "consensus_vote", "inputs_from": "a"},
+        {"id": "vote_b", "op": "consensus_vote", "inputs_from": "b"},
+        {"id": "out_a", "op": "write_text", "args": {"path": "a.txt", "from_step": "vote_a"}},
+        {"id": "out_b", "op": "write_text", "args": {"path": "b.txt", "from_step": "vote_b"}},
+        {"id": "check", "op": "assert_contains", "args": {"from_step": "b", "must_include": ["beta"]}},
+    ]
+    results = {jobs: _run(awo_ws, steps, jobs=jobs) for jobs in (1, 4)}
+    (c1, seq), (c4, par) = results[1], results[4]
+
+    assert c1 == c4 == int(awo_run.ExitCode.OK)
+    assert _files(seq) == _files(par)
+    assert _load(seq, "run_manifest.json")["ops"] == _load(par, "run_manifest.json")["ops"]
+
+    def prov(rd):
+        # artifact paths carry the run id; compare the hashes
+        return [(r["role"], r["model"]["name"], r.get("notes"), sorted(r["hashes"].values())) for r in _load(rd, "provenance.json")]
+
+    assert prov(seq) == prov(par)
+    for name in ("artifacts/a.txt", "artifacts/b.txt"):
+        assert (seq / name).read_bytes() == (par / name).read_bytes()
+
+    def sections(rd):
+        return [ln for ln in (rd / "report.md").read_text(encoding="utf-8").splitlines() if ln.startswith("## ")]
+
+    assert sections(seq) == sections(par)
+
+
+def test_uncommitted_dependency_ctx_is_visible(awo_ws):
+    # Levels: [x, d], [e, b]. `d` finishes in the first level but is only
+    # committed after `e`; `b` must still see its outputs.
+    steps = [
+        {"id": "x", "op": "fanout_generate", "prompt": "xray", "models": ["echo", "upper"]},
+        {"id": "e", "op": "consensus_vote", "inputs_from": "x"},
+        {"id": "d", "op": "fanout_generate", "prompt": "delta", "models": ["echo", "echo"]},
+        {"id": "b", "op": "consensus_vote", "inputs_from": "d"},
+    ]
+    assert _run(awo_ws, steps, jobs=1)[0] == int(awo_run.ExitCode.OK)
+    code, run_dir = _run(awo_ws, steps, jobs=2)
+    assert code == int(awo_run.ExitCode.OK)
+    assert [op["id"] for op in _load(run_dir, "run_manifest.json")["ops"]][-4:] == ["x", "e", "d", "b"]
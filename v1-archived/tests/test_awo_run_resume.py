@@ -0,0 +1,46 @@
+"""awo_run resume: ctx of steps before an audit_gate is rebuilt from the run directory."""
+
+import awo_run
+import sweep_engine
+from conftest import write_workflow
+
+STEPS = [
+    {"id": "sweep", "op": "sweep_generate", "templates": ["say {w}"], "vars": {"w": ["hi", "yo"]}, "models": ["echo", "upper"]},
+    {"id": "gate", "op": "audit_gate"},
+    {"id": "vote", "op": "consensus_vote", "inputs_from": "sweep"},
+    {"id": "out", "op": "write_text", "args": {"path": "sweep.txt", "from_step": "sweep"}},
+]
+
+
+def _pause(ws):
+    run_dir = awo_run.ensure_run_dir()
+    code = awo_run.run(write_workflow(ws, STEPS), cache_mode="off", run_dir=run_dir)
+    awo_run.release_writer(run_dir)
+    assert code == int(awo_run.ExitCode.PENDING)
+    (run_dir / "gate_decision.yml").write_text("status: approved\nreviewer: test\n", encoding="utf-8")
+    return run_dir
+
+
+def _resume(run_dir):
+    code = awo_run.resume(run_dir.name, cache_mode="off")
+    awo_run.release_writer(run_dir)
+    return code
+
+
+def test_resume_past_a_sweep(awo_ws):
+    run_dir = _pause(awo_ws)
+    assert _resume(run_dir) == int(awo_run.ExitCode.OK)
+    with (run_dir / "artifacts" / "sweeps" / "sweep.jsonl").open(encoding="utf-8") as f:
+        rows = list(sweep_engine.read_rows(f))
+    assert len(rows) == 4
+    text = (run_dir / "artifacts" / "sweep.txt").read_text(encoding="utf-8")
+    assert text == "\n\n".join(r["text"] for r in rows)
+    assert awo_run.run_status(run_dir) == "succeeded"
+
+
+def test_resume_refuses_a_changed_sweep_artifact(awo_ws):
+    run_dir = _pause(awo_ws)
+    art = run_dir / "artifacts" / "sweeps" / "sweep.jsonl"
+    art.write_text(art.read_text(encoding="utf-8").replace("SAY HI", "EDITED"), encoding="utf-8")
+    assert _resume(run_dir) == int(awo_run.ExitCode.ERROR)
+    assert not (run_dir / "artifacts" / "sweep.txt").exists()
@@ -0,0 +1,117 @@
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+import awo_run
+import awo_serve
+from conftest import write_workflow
+
+STEPS = [{"id": "note", "op": "write_text", "args": {"path": "note.txt", "text": "hello"}}]
+
+
+@pytest.fixture
+def queue(awo_ws, monkeypatch):
+    # awo_serve binds REPO_ROOT/RUNS_ROOT at import
+    monkeypatch.setattr(awo_serve, "REPO_ROOT", awo_ws)
+    monkeypatch.setattr(awo_serve, "RUNS_ROOT", awo_ws / "runs")
+    db = awo_serve.connect()
+    yield db
+    db.close()
+
+
+def _dead_pid():
+    p = subprocess.Popen([sys.executable, "-c", "pass"])
+    p.wait()
+    return p.pid
+
+
+def _running(db, owner):
+    job_id = db.execute(
+        "INSERT INTO jobs (workflow, cache_mode, jobs, status, submitted_at, owner) VALUES ('wf.json','use',1,'running','t',?)",
+        (owner,),
+    ).lastrowid
+    return job_id
+
+
+def test_submit_claim_finish_cancel_list(awo_ws, queue):
+    wf = write_workflow(awo_ws, STEPS)
+    first = awo_serve.submit(queue, wf)
+    second = awo_serve.submit(queue, wf, cache_mode="off", jobs=2)
+    with pytest.raises(FileNotFoundError):
+        awo_serve.submit(queue, "missing.json")
+
+    assert awo_serve.cancel(queue, second)
+    assert not awo_serve.cancel(queue, second)  # already cancelled
+    assert awo_serve.get(queue, second)["status"] == "cancelled"
+
+    job = awo_serve._claim(queue, "host:1")
+    assert job["job_id"] == first
+    row = awo_serve.get(queue, first)
+    assert (row["status"], row["owner"]) == ("running", "host:1")
+    assert not awo_serve.cancel(queue, first)  # a running job finishes its run
+    assert awo_serve._claim(queue, "host:1") is None  # nothing else queued
+
+    awo_serve._finish(queue, first, "succeeded", 0, None)
+    assert awo_serve.get(queue, first)["exit_code"] == 0
+    assert [j["job_id"] for j in awo_serve.list_jobs(queue)] == [second, first]
+    assert [j["job_id"] for j in awo_serve.list_jobs(queue, status="succeeded")] == [first]
+    assert awo_serve.get(queue, 999) is None
+
+
+def test_recover_only_fails_jobs_whose_owner_is_gone(queue):
+    host = socket.gethostname()
+    live = _running(queue, f"{host}:{os.getppid()}")
+    dead = _running(queue, f"{host}:{_dead_pid()}")
+    mine = _running(queue, awo_serve.owner_id())  # a previous daemon with this pid
+    legacy = _running(queue, None)
+    remote = _running(queue, "elsewhere.example:1")
+
+    assert awo_serve._recover(queue) == 3
+    status = {j["job_id"]: j["status"] for j in awo_serve.list_jobs(queue)}
+    assert status == {live: "running", dead: "error", mine: "error", legacy: "error", remote: "running"}
+
+
+def test_connect_adds_owner_to_an_old_queue(awo_ws, monkeypatch):
+    import sqlite3
+
+    path = awo_ws / "old.sqlite"
+    old = sqlite3.connect(str(path))
+    old.executescript(awo_serve._SCHEMA.replace(",\n    owner TEXT", ""))
+    old.close()
+    db = awo_serve.connect(path)
+    try:
+        assert "owner" in {r["name"] for r in db.execute("PRAGMA table_info(jobs)")}
+    finally:
+        db.close()
+
+
+def test_serve_drains_the_queue(awo_ws, queue):
+    wf = write_workflow(awo_ws, STEPS)
+    job_id = awo_serve.submit(queue, wf, cache_mode="off")
+    assert awo_serve.serve(workers=1, poll_s=0.05, drain=True) == 0
+    job = awo_serve.get(queue, job_id)
+    assert (job["status"], job["exit_code"]) == ("succeeded", 0)
+    assert job["owner"] == awo_serve.owner_id()
+    assert awo_run.run_status(awo_ws / "runs" / job["run_id"]) == "succeeded"
+
+
+def _crash_or_execute(workflow, cache_mode, jobs, run_dir):
+    if workflow.startswith("crash"):
+        os._exit(1)  # a worker killed mid-run
+    return _real_execute(workflow, cache_mode, jobs, run_dir)
+
+
+_real_execute = awo_serve._execute
+
+
+def test_broken_pool_is_rebuilt(awo_ws, queue, monkeypatch):
+    monkeypatch.setattr(awo_serve, "_execute", _crash_or_execute)  # workers are forked with the patch
+    crash = awo_serve.submit(queue, write_workflow(awo_ws, STEPS, name="crash.json"), cache_mode="off")
+    ok = awo_serve.submit(queue, write_workflow(awo_ws, STEPS), cache_mode="off")
+    assert awo_serve.serve(workers=1, poll_s=0.05, drain=True) == 0
+    crashed = awo_serve.get(queue, crash)
+    assert crashed["status"] == "error" and "worker process died" in crashed["error"]
+    assert awo_serve.get(queue, ok)["status"] == "succeeded"
@@ -0,0 +1,81 @@
+import json
+import sys
+
+import pytest
+
+from conftest import REPO
+
+sys.path.insert(0, str(REPO / "benchmarks"))
+from _awo_pkg import load_awo  # noqa: E402
+
+awo = load_awo()
+from awo import cli  # noqa: E402
+from awo.core import engine  # noqa: E402
+
+
+class _Echo:
+    name = "echo"
+
+    def generate(self, prompt, params=None):
+        return {"text": prompt}
+
+
+def _gated(tmp_path):
+    wf = tmp_path / "wf.json"
+    wf.write_text(json.dumps({"steps": [
+        {"id": "s1", "op": "llm_map", "prompt": "hi"},
+        {"id": "review", "op": "audit_gate"},
+        {"id": "after", "op": "llm_map", "prompt": "never"},
+    ]}), encoding="utf-8")
+    return wf
+
+
+def test_pause_is_a_plain_exception(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(awo.RunPaused) as ei:
+        engine.run(str(_gated(tmp_path)), backend=_Echo())
+    assert not isinstance(ei.value, SystemExit)
+    assert ei.value.gate["gate_id"] == "review"
+    steps = (tmp_path / ei.value.run_dir / "steps.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(s)["id"] for s in steps] == ["s1", "review"]
+
+
+def test_cli_maps_pause_to_exit_78(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert cli.main(["run", str(_gated(tmp_path)), "--runner", "core"]) == cli.GATE_EXIT_CODE == 78
+
+
+def test_cli_default_runner_runs_core_workflows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    wf = tmp_path / "wf.json"
+    wf.write_text(json.dumps({"steps": [
+        {"id": "s1", "op": "llm_map", "prompt": "hi"},
+        {"id": "out", "op": "write_text", "args": {"path": "o.txt", "from_step": "s1"}},
+    ]}), encoding="utf-8")
+    assert cli.main(["run", str(wf)]) == 0
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    assert (run_dir / "artifacts" / "o.txt").read_text(encoding="utf-8") == "[ECHO] hi"
+
+
+def test_write_text_and_audit_gate_are_shared():
+    import awo_run
+
+    # both engines register the ops from core/common_ops.py (as awo.core.common_ops / common_ops)
+    for ops in (engine.OPS, awo_run.OPS):
+        assert ops.spec("write_text").resource.__module__.endswith("common_ops")
+        assert ops.spec("audit_gate").barrier
+    assert awo_run._StepFailed.__module__ == "common_ops"
+
+
+def test_cli_ci_records_unhandled_errors_in_its_own_run(awo_ws, monkeypatch):
+    import awo_run
+
+    def boom(*a, **kw):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(awo_run, "run", boom)
+    wf = awo_ws / "wf.json"
+    wf.write_text(json.dumps({"steps": []}), encoding="utf-8")
+    assert cli.main(["run", str(wf), "--runner", "ci"]) == 1
+    (run_dir,) = [p for p in (awo_ws / "runs").iterdir() if p.is_dir()]
+    assert json.loads((run_dir / "steps" / "00_unhandled_error.json").read_text(encoding="utf-8"))["message"] == "boom"
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+import awo_run
+import deadline_pool
+import sweep_engine
+
+
+def _sleeper(delays):
+    def fn(i):
+        time.sleep(delays[i])
+        return i
+    return fn
+
+
+def test_results_in_item_order():
+    out = deadline_pool.map_with_deadlines(
+        _sleeper([0.05, 0.0, 0.02]), [0, 1, 2], max_workers=3, timeout_for=lambda i: None
+    )
+    assert out == [0, 1, 2]
+
+
+def test_queue_time_is_not_charged():
+    # One worker: each call waits for the previous ones, but only its own run time counts.
+    out = deadline_pool.map_with_deadlines(
+        _sleeper([0.15, 0.15, 0.15]), [0, 1, 2], max_workers=1, timeout_for=lambda i: 0.3
+    )
+    assert out == [0, 1, 2]
+
+
+def test_hung_call_fails_at_its_own_deadline():
+    # Call 0 finishes just inside its budget; call 1 hangs. The old sequential
+    # collection only started call 1's clock after call 0 returned.
+    t0 = time.monotonic()
+    with pytest.raises(deadline_pool.DeadlineExceeded) as ei:
+        deadline_pool.map_with_deadlines(
+            _sleeper([0.25, 2.0]), [0, 1], max_workers=2, timeout_for=lambda i: 0.3
+        )
+    assert ei.value.index == 1
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_failure_waits_for_in_flight_calls_and_cancels_queued():
+    finished = threading.Event()
+    ran = []
+
+    def fn(i):
+        ran.append(i)
+        if i == 0:
+            raise ValueError("boom")
+        time.sleep(0.1)
+        finished.set()
+        return i
+
+    with pytest.raises(ValueError):
+        deadline_pool.map_with_deadlines(fn, [0, 1, 2, 3, 4], max_workers=2, timeout_for=lambda i: 1.0)
+    assert finished.is_set()  # call 1 was in flight and ran to completion
+    assert len(ran) < 5
+
+
+class _Backend:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def generate(self, prompt, params=None):
+        time.sleep(self.delay)
+        return {"text": prompt, "meta": {}}
+
+
+def test_fanout_timeout_names_the_hung_model():
+    backends = {"fast": _Backend(0.25), "hung": _Backend(2.0)}
+    t0 = time.monotonic()
+    with pytest.raises(awo_run.FanoutTimeout) as ei:
+        awo_run._fanout_dispatch(backends, ["fast", "hung"], "p", {}, max_concurrency=2, timeout_s=0.3)
+    assert ei.value.model == "hung"
+    assert time.monotonic() - t0 < 0.5
+
+
+class _BatchBackend(_Backend):
+    def generate_batch(self, prompts, params=None):
+        time.sleep(self.delay)
+        return [{"text": p, "meta": {}} for p in prompts]
+
+
+def test_sweep_timeout_is_per_batch_from_its_start():
+    backends = {"fast": _BatchBackend(0.25), "hung": _BatchBackend(2.0)}
+    calls = [("fast", "a", {}), ("hung", "b", {})]
+    t0 = time.monotonic()
+    with pytest.raises(sweep_engine.SweepTimeout) as ei:
+        sweep_engine.dispatch(backends, calls, max_concurrency=2, timeout_s=0.3)
+    assert ei.value.model == "hung"
+    assert time.monotonic() - t0 < 0.5
+
+    # Queued batches are not charged for waiting on the single worker.
+    slow = {"m": _BatchBackend(0.15)}
+    calls = [("m", str(i), {}) for i in range(3)]
+    out = sweep_engine.dispatch(slow, calls, batch_size=1, max_concurrency=1, timeout_s=0.3)
+    assert [o["text"] for o, _, _ in out] == ["0", "1", "2"]
+
+
+class _SyncOnly(awo_run._Fallback):
+    """Implements only generate(); agenerate() is the inherited default."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def generate(self, prompt, params=None):
+        time.sleep(self.delay)
+        return {"text": prompt, "meta": {}}
+
+
+@pytest.mark.parametrize("cls", [_SyncOnly, _Backend])
+def test_async_executor_runs_sync_backends_off_the_loop(cls):
+    backends = {m: cls(0.2) for m in ("a", "b", "c")}
+    t0 = time.monotonic()
+    out = awo_run._fanout_dispatch(backends, ["a", "b", "c"], "p", {}, max_concurrency=3, executor="async")
+    assert [o["text"] for o, _, _ in out] == ["p", "p", "p"]
+    assert time.monotonic() - t0 < 0.5  # overlapped, not 3 x 0.2s in a row
+
+    backends = {"fast": cls(0.05), "hung": cls(2.0)}
+    t0 = time.monotonic()
+    with pytest.raises(awo_run.FanoutTimeout) as ei:
+        awo_run._fanout_dispatch(backends, ["fast", "hung"], "p", {}, max_concurrency=2, timeout_s=0.3, executor="async")
+    assert ei.value.model == "hung"
+    assert time.monotonic() - t0 < 0.5
+
+    t0 = time.monotonic()
+    with pytest.raises(sweep_engine.SweepTimeout):
+        sweep_engine.dispatch(backends, [("fast", "a", {}), ("hung", "b", {})], max_concurrency=2, executor="async", timeout_s=0.3)
+    assert time.monotonic() - t0 < 0.5
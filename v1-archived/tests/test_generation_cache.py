@@ -0,0 +1,95 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from generation_cache import GenerationCache, generation_key
+
+
+class _Backend:
+    name = "echo"
+
+
+def _barrier_put(cache, barrier, digest, key, out):
+    barrier.wait()
+    cache.put(digest, key, out)
+
+
+def test_put_get_roundtrip(tmp_path):
+    cache = GenerationCache(tmp_path)
+    digest, key = generation_key("echo", _Backend(), "hello", {"seed": 0})
+    assert cache.get(digest) is None
+    cache.put(digest, key, {"text": "hello", "meta": {}})
+    assert cache.get(digest) == {"text": "hello", "meta": {}}
+    assert cache.stats() == {"mode": "use", "hits": 1, "misses": 1}
+
+
+def test_same_key_from_many_threads(tmp_path):
+    # Every thread writes the same entry at the same moment: each rename must
+    # find its own temp file, and the entry must be complete afterwards.
+    cache = GenerationCache(tmp_path)
+    digest, key = generation_key("echo", _Backend(), "p" * 4096, {"seed": 1})
+    out = {"text": "x" * 65536, "meta": {"n": 1}}
+    n = 32
+    barrier = threading.Barrier(n)
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(_barrier_put, cache, barrier, digest, key, out) for _ in range(n)]
+        for f in futures:
+            f.result()  # FileNotFoundError here if two threads shared a temp path
+    assert cache.get(digest) == out
+    assert [p.name for p in (tmp_path / "gen").rglob("*") if p.is_file()] == [f"{digest}.json"]
+
+
+def test_concurrent_put_and_get_of_distinct_keys(tmp_path):
+    cache = GenerationCache(tmp_path)
+    keys = [generation_key("echo", _Backend(), f"prompt {i}", {"seed": i}) for i in range(200)]
+
+    def work(i):
+        digest, key = keys[i]
+        cache.put(digest, key, {"text": str(i), "meta": {}})
+        return cache.get(digest)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(work, range(len(keys))))
+    assert [r["text"] for r in results] == [str(i) for i in range(len(keys))]
+
+
+def test_cache_only_and_off_modes_never_write(tmp_path):
+    digest, key = generation_key("echo", _Backend(), "hello", {})
+    for mode in ("only", "off"):
+        GenerationCache(tmp_path, mode=mode).put(digest, key, {"text": "t", "meta": {}})
+    assert not (tmp_path / "gen").exists()
+    assert GenerationCache(tmp_path, mode="off").get(digest) is None
+
+
+def test_malformed_entry_is_a_miss(tmp_path):
+    cache = GenerationCache(tmp_path)
+    digest, key = generation_key("echo", _Backend(), "hello", {})
+    cache.put(digest, key, {"text": "t", "meta": {}})
+    for bad in ('{"key": {}}', "[]", "{not json"):
+        cache._path(digest).write_text(bad, encoding="utf-8")
+        assert cache.get(digest) is None
+    assert cache.stats()["misses"] == 3
+
+
+def _fill(cache, n, start=0):
+    for i in range(start, start + n):
+        digest, key = generation_key("echo", _Backend(), f"prompt {i}", {})
+        cache.put(digest, key, {"text": "x" * 100, "meta": {}})
+
+
+def test_prune_scans_only_when_the_budget_is_crossed(tmp_path, monkeypatch):
+    scans = []
+    real_glob = Path.glob
+    monkeypatch.setattr(Path, "glob", lambda self, pat: scans.append(pat) or real_glob(self, pat))
+
+    first = GenerationCache(tmp_path, max_entries=10)
+    _fill(first, 4)
+    assert first.prune() == 0 and len(scans) == 1  # no usage file yet: one baseline scan
+    _fill(first, 4, start=4)
+    assert first.prune() == 0 and len(scans) == 1
+
+    second = GenerationCache(tmp_path, max_entries=10)  # another run sees the first one's usage
+    _fill(second, 4, start=8)
+    assert second.prune() == 2 and len(scans) == 2
+    assert len(list(real_glob(tmp_path / "gen", "*/*.json"))) == 10
+    assert second._read_usage()[1] == 10
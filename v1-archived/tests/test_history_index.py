@@ -0,0 +1,56 @@
+import json
+import sqlite3
+
+import history_index
+
+OUTS = [
+    {"model": "m", "text": "alpha beta gamma"},
+    {"model": "m", "text": "completely different words here"},
+]
+
+
+def _index(tmp_path):
+    return history_index.HistoryIndex(tmp_path / history_index.INDEX_NAME)
+
+
+def test_same_model_twice_keeps_both_outputs(tmp_path):
+    with _index(tmp_path) as idx:
+        assert idx.add("r1", "gen", OUTS) == 2
+        assert idx.add("r1", "gen", OUTS) == 0  # re-adding a step is a no-op
+        hits = idx.query("completely different words here", threshold=0.9)
+        assert [(h["run_id"], h["model"]) for h in hits] == [("r1", "m")]
+        assert idx.count() == 2
+
+
+def test_rebuild_uses_the_same_key(tmp_path):
+    steps = tmp_path / "runs" / "run_x" / "steps"
+    steps.mkdir(parents=True)
+    (steps / "04_gen.json").write_text(json.dumps({"id": "gen", "op": "fanout_generate", "outputs": OUTS}))
+    with _index(tmp_path) as idx:
+        assert history_index.rebuild(idx, tmp_path / "runs") == 2
+        assert history_index.rebuild(idx, tmp_path / "runs") == 0
+        idx.add("run_x", "gen", OUTS)
+        assert idx.count() == 2
+
+
+def test_old_index_is_rekeyed(tmp_path):
+    # an index written when outputs were unique per (run, step, model)
+    path = tmp_path / history_index.INDEX_NAME
+    old = sqlite3.connect(str(path))
+    old.executescript(
+        history_index._SCHEMA.replace("    position INTEGER NOT NULL,\n", "").replace(
+            "UNIQUE (run_id, step_id, position)", "UNIQUE (run_id, step_id, model)")
+    )
+    sig = history_index.signature(OUTS[0]["text"])
+    old.execute(
+        "INSERT INTO outputs (id, run_id, step_id, model, text_sha256, sig, preview) VALUES (1,'r1','gen','m','x',?,'p')",
+        (history_index._SIG.pack(*sig),),
+    )
+    old.executemany("INSERT INTO bands VALUES (?,?,1)", history_index._band_keys(sig))
+    old.commit()
+    old.close()
+
+    with history_index.HistoryIndex(path) as idx:
+        assert idx.add("r1", "gen", OUTS) == 1  # position 0 was already indexed
+        assert idx.count() == 2
+        assert idx.query(OUTS[0]["text"], threshold=0.9)[0]["run_id"] == "r1"
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import schema_registry
+
+
+@pytest.fixture
+def root(tmp_path):
+    schema_registry.clear()
+    yield tmp_path
+    schema_registry.clear()
+
+
+def _write(root, required):
+    (root / "s.json").write_text(json.dumps({"type": "object", "required": required}), encoding="utf-8")
+
+
+def test_lookups_do_not_touch_the_file(root, monkeypatch):
+    _write(root, ["a"])
+    v = schema_registry.get_validator("s.json", root=root)
+
+    def no_stat(*a, **kw):
+        raise AssertionError("hot path touched the filesystem")
+
+    monkeypatch.setattr(schema_registry, "_load", no_stat)
+    assert schema_registry.get_validator("s.json", root=root) is v
+    assert schema_registry.schema_digest("s.json", root=root)
+
+
+def test_changed_schema_is_picked_up_by_preload_and_reload(root):
+    _write(root, ["a"])
+    assert not schema_registry.get_validator("s.json", root=root).is_valid({})
+    _write(root, [])
+    assert not schema_registry.get_validator("s.json", root=root).is_valid({})  # still bound
+    schema_registry.preload("s.json", root=root)
+    assert schema_registry.get_validator("s.json", root=root).is_valid({})
+
+    _write(root, ["bb"])  # a different size, whatever the mtime granularity
+    schema_registry.reload()
+    assert not schema_registry.get_validator("s.json", root=root).is_valid({})
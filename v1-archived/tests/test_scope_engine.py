@@ -0,0 +1,62 @@
+import hashlib
+import json
+
+import scope_engine
+
+
+def _claim(cid, testable=True):
+    c = {"id": cid, "statement": f"statement {cid}"}
+    if testable:
+        c["predictions"] = [{"name": "p", "function": "f"}]
+    return c
+
+
+def _corpus(root, n=3):
+    d = root / "claims"
+    d.mkdir()
+    for i in range(n):
+        (d / f"c{i}.json").write_text(json.dumps(_claim(f"c{i}", testable=i != 1)), encoding="utf-8")
+    return d
+
+
+def test_summary_key_order_and_digest(tmp_path):
+    _corpus(tmp_path)
+    scope_dir = tmp_path / "run" / "scope"
+    summary, digest = scope_engine.validate_claims(
+        {"claims_glob": "claims/*.json", "claim": _claim("inline")},
+        repo_root=tmp_path,
+        scope_dir=scope_dir,
+    )
+    raw = (scope_dir / "summary.json").read_bytes()
+    on_disk = json.loads(raw)
+    assert list(on_disk) == ["claims_checked", "overall_ok", "details", "notes", "ts"]
+    assert on_disk == summary
+    assert summary["claims_checked"] == 4 and summary["overall_ok"] is False
+    assert [d["id"] for d in summary["details"]] == ["inline", "c0", "c1", "c2"]
+    assert digest == hashlib.sha256(raw).hexdigest()
+
+
+def test_claim_artifacts_do_not_follow_source_edits(tmp_path):
+    src_dir = _corpus(tmp_path, n=1)
+    scope_dir = tmp_path / "run" / "scope"
+    scope_engine.validate_claims({"claims_glob": "claims/*.json"}, repo_root=tmp_path, scope_dir=scope_dir)
+    src, recorded = src_dir / "c0.json", scope_dir / "claims" / "c0.json"
+    before = recorded.read_bytes()
+    assert before == src.read_bytes()
+    assert recorded.stat().st_ino != src.stat().st_ino
+
+    with open(src, "r+b") as f:  # edit in place, as an editor saving over the file would
+        f.write(b"{}")
+    assert recorded.read_bytes() == before
+
+
+def test_index_marks_cached_results(tmp_path):
+    _corpus(tmp_path)
+    args = {"claims_glob": "claims/*.json"}
+    index = tmp_path / ".scope_index"
+    first, _ = scope_engine.validate_claims(args, repo_root=tmp_path, scope_dir=tmp_path / "r1", index_path=index)
+    second, _ = scope_engine.validate_claims(args, repo_root=tmp_path, scope_dir=tmp_path / "r2", index_path=index)
+    assert {d["result"] for d in first["details"]} == {"fresh"}
+    assert {d["result"] for d in second["details"]} == {"cached"}
+    assert [(d["id"], d["ok"]) for d in first["details"]] == [(d["id"], d["ok"]) for d in second["details"]]
+    assert list(second)[-1] == "scope_index" and second["scope_index"]["digest"].startswith("sha256:")
@@ -0,0 +1,82 @@
+import step_scheduler
+from op_registry import OpRegistry
+
+
+def _ops():
+    ops = OpRegistry()
+    for name in ("fanout_generate", "consensus_vote", "assert_contains"):
+        ops.register(name, lambda *a: None)
+    ops.register("write_text", lambda *a: None, resource=lambda s: f"artifacts/{s['args']['path']}")
+    ops.register("scope_validate", lambda *a: None, parallel=False, resource=lambda s: "scope/summary.json")
+    ops.register("audit_gate", lambda *a: None, barrier=True)
+    return ops
+
+
+def _steps(*specs):
+    return list(enumerate(specs, start=4))
+
+
+def _ids(level_list):
+    return [[s["id"] for _, s in lv] for lv in level_list]
+
+
+def test_explicit_edges_and_levels():
+    steps = _steps(
+        {"id": "a", "op": "fanout_generate"},
+        {"id": "b", "op": "fanout_generate"},
+        {"id": "vote", "op": "consensus_vote", "inputs_from": "a"},
+        {"id": "check", "op": "assert_contains", "args": {"from_step": "vote"}},
+        {"id": "late", "op": "fanout_generate", "depends_on": ["b"]},
+    )
+    deps = step_scheduler.dependencies(steps, _ops())
+    assert deps == {4: set(), 5: set(), 6: {4}, 7: {6}, 8: {5}}
+    assert _ids(step_scheduler.levels(steps, ops=_ops())) == [["a", "b"], ["vote", "late"], ["check"]]
+    assert step_scheduler.critical_path(steps, ops=_ops()) == [4, 6, 7]
+
+
+def test_forward_references_do_not_create_edges():
+    steps = _steps(
+        {"id": "vote", "op": "consensus_vote", "inputs_from": "gen"},
+        {"id": "gen", "op": "fanout_generate"},
+    )
+    assert step_scheduler.dependencies(steps, _ops()) == {4: set(), 5: set()}
+
+
+def test_barrier_and_shared_resources_keep_list_order():
+    steps = _steps(
+        {"id": "w1", "op": "write_text", "args": {"path": "x.txt"}},
+        {"id": "w2", "op": "write_text", "args": {"path": "y.txt"}},
+        {"id": "w3", "op": "write_text", "args": {"path": "x.txt"}},
+        {"id": "gate", "op": "audit_gate"},
+        {"id": "after", "op": "fanout_generate"},
+    )
+    deps = step_scheduler.dependencies(steps, _ops())
+    assert deps[6] == {4}  # same path as w1
+    assert deps[7] == {4, 5, 6}  # barrier waits for everything before it
+    assert deps[8] == {7}  # and everything after waits for it
+    assert _ids(step_scheduler.levels(steps, ops=_ops())) == [["w1", "w2"], ["w3"], ["gate"], ["after"]]
+
+
+def test_without_registry_only_explicit_edges_apply():
+    steps = _steps(
+        {"id": "w1", "op": "write_text", "args": {"path": "x.txt"}},
+        {"id": "gate", "op": "audit_gate"},
+        {"id": "w2", "op": "write_text", "args": {"path": "x.txt"}},
+    )
+    assert _ids(step_scheduler.levels(steps)) == [["w1", "gate", "w2"]]
+
+
+def test_levels_preserve_list_order_within_a_level():
+    steps = _steps(*({"id": f"s{i}", "op": "fanout_generate"} for i in range(6)))
+    assert _ids(step_scheduler.levels(steps, ops=_ops())) == [[f"s{i}" for i in range(6)]]
+
+
+def test_format_plan():
+    steps = _steps(
+        {"id": "a", "op": "fanout_generate"},
+        {"id": "vote", "op": "consensus_vote", "inputs_from": "a"},
+    )
+    lines = step_scheduler.format_plan(steps, ops=_ops())
+    assert lines[0] == "2 step(s), 2 level(s), widest level: 1"
+    assert "  [05] vote (consensus_vote) <- a" in lines
+    assert lines[-1] == "critical path (2): a -> vote"
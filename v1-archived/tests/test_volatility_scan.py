@@ -0,0 +1,118 @@
+"""volatility_scan must report exactly what the recursive scan in awo_validate.py used to."""
+
+import json
+import random
+import re
+import sys
+
+from volatility_scan import VolatilityScanner
+
+TS_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?Z$")
+VOL_KEYS = {"pid", "hostname", "container_id", "pod_uid", "instance_id"}
+
+
+def recursive_scan(obj, path=""):
+    """The scan() awo_validate.py defined inline before volatility_scan.py (verbatim logic)."""
+    out = []
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            p = f"{path}.{k}" if path else k
+            if k in VOL_KEYS and v not in (None, ""):
+                out.append(f"volatile:{p}")
+            if isinstance(v, str) and k.lower().endswith(("time", "timestamp", "at", "started", "finished")):
+                if not TS_RE.match(v):
+                    out.append(f"bad_ts:{p}={v}")
+            out.extend(recursive_scan(v, p))
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            out.extend(recursive_scan(v, f"{path}[{i}]"))
+    return out
+
+
+def basic_parse(obj):
+    """ijson.basic_parse-style events for a parsed document (ijson is optional)."""
+    if isinstance(obj, dict):
+        yield "start_map", None
+        for k, v in obj.items():
+            yield "map_key", k
+            yield from basic_parse(v)
+        yield "end_map", None
+    elif isinstance(obj, list):
+        yield "start_array", None
+        for v in obj:
+            yield from basic_parse(v)
+        yield "end_array", None
+    elif obj is None:
+        yield "null", None
+    elif isinstance(obj, bool):
+        yield "boolean", obj
+    elif isinstance(obj, str):
+        yield "string", obj
+    else:
+        yield "number", obj
+
+
+KEYS = ["id", "pid", "hostname", "pod_uid", "started", "finished_at", "createdAt", "Timestamp",
+        "ts", "format", "notes", "model", "chat", "pid_file", "run_time"]
+SCALARS = [None, "", "x", 0, 1, True, False, 3.5, "2025-01-01T00:00:00Z", "2025-01-01T00:00:00.123Z",
+           "2025-01-01 00:00:00", "yesterday"]
+
+
+def _random_doc(rng, depth=0):
+    roll = rng.random()
+    if depth > 5 or roll < 0.35:
+        return rng.choice(SCALARS)
+    if roll < 0.7:
+        return {rng.choice(KEYS): _random_doc(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+    return [_random_doc(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def test_matches_recursive_scan_on_random_documents():
+    rng = random.Random(1234)
+    scanner = VolatilityScanner()
+    for _ in range(3000):
+        doc = _random_doc(rng)
+        expected = recursive_scan(doc)
+        assert list(scanner.scan(doc)) == expected, doc
+        if isinstance(doc, (dict, list)):
+            assert list(scanner.scan_events(basic_parse(doc))) == expected, doc
+
+
+def test_matches_recursive_scan_on_run_documents():
+    doc = {
+        "run_id": "run_x",
+        "started_at": "2025-01-01T00:00:00Z",
+        "finished_at": "not a time",
+        "env": {"hostname": "box", "pid": 0, "container_id": ""},
+        "ops": [{"idx": 4, "ts": "t", "meta": {"generated_at": "2025-01-01"}}, [], {}],
+        "pod_uid": {},
+    }
+    expected = recursive_scan(doc)
+    assert expected == [
+        "bad_ts:finished_at=not a time",
+        "volatile:env.hostname",
+        "volatile:env.pid",
+        "bad_ts:ops[0].meta.generated_at=2025-01-01",
+        "volatile:pod_uid",
+    ]
+    scanner = VolatilityScanner()
+    assert list(scanner.scan(doc)) == expected
+    assert list(scanner.scan_events(basic_parse(doc))) == expected
+
+
+def test_scan_file(tmp_path):
+    doc = {"steps": [{"pid": 7, "ended_at": "later"}]}
+    p = tmp_path / "step.json"
+    p.write_text(json.dumps(doc), encoding="utf-8")
+    assert list(VolatilityScanner().scan_file(p)) == recursive_scan(doc)
+
+
+def test_deep_documents_do_not_hit_the_recursion_limit():
+    depth = sys.getrecursionlimit() * 3
+    doc = leaf = {}
+    for _ in range(depth):
+        leaf["next"] = {}
+        leaf = leaf["next"]
+    leaf["hostname"] = "h"
+    problems = list(VolatilityScanner().scan(doc))
+    assert problems == ["volatile:" + ".".join(["next"] * depth + ["hostname"])]